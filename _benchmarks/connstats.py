@@ -0,0 +1,54 @@
+# Small script to measure memory usage of (not finalized) Connection objects.
+# Usage: nrniv (or special) -python connstats.py
+
+import numpy
+import os
+
+from neurodamus.connection import Connection
+from neurodamus.io.synapse_reader import SynapseParameters
+
+
+def get_mem_usage():
+    """
+    Return memory usage information in KB.
+    """
+    with open("/proc/self/statm") as fd:
+        _, data_size, _ = fd.read().split(maxsplit=2)
+    usage_kb = float(data_size) * os.sysconf("SC_PAGE_SIZE") / 1024
+
+    return usage_kb
+
+
+# Dummy target manager, placing all synapses in the same section
+class TargetManager:
+    class SectionRef:
+        def exists(self):
+            return True
+
+    cell_sections = type("CellSections", (), {"isec2sec": [SectionRef()]})
+
+    def gid_to_sections(self, gid):
+        return self.cell_sections
+
+    def locations_to_points(self, gid, isec, ipt, offset):
+        return [self.cell_sections.isec2sec[0]] * len(isec), numpy.full(len(isec), 0.5)
+
+
+n_inst = 1000000
+syns_per_conn = 4
+
+target_manager = TargetManager()
+params = SynapseParameters.create_array(n_inst * syns_per_conn)
+params.isec = 0
+
+mem = get_mem_usage()
+conns = [Connection(i, 1) for i in range(n_inst)]
+mem2 = get_mem_usage()
+print('Memory usage per empty Connection: %f KB' % ((mem2 - mem) / n_inst))
+
+for i, conn in enumerate(conns):
+    offset = i * syns_per_conn
+    conn.add_synapses(target_manager, params[offset:offset + syns_per_conn], offset)
+mem3 = get_mem_usage()
+print('Memory usage per Connection synapses (%d): %f KB' % (syns_per_conn,
+                                                            (mem3 - mem2) / n_inst))
@@ -24,6 +24,7 @@ from .core.nodeset import NodeSet
 from .io import cell_readers
 from .lfp_manager import LFPManager
 from .metype import Cell_V6, EmptyCell, PointCell
+from .morphio_wrapper import MorphIOWrapper
 from .target_manager import TargetSpec
 from .utils import compat
 from .utils.logging import log_verbose, log_all
@@ -292,10 +293,16 @@ class CellManagerBase(_CellManager):
         logging.info(" > Instantiating cells... (%d in Rank 0)", len(self._local_nodes))
         cell_offset = self._local_nodes.offset
 
-        if GlobalConfig.verbosity >= LogLevel.DEBUG:
-            gid_info_items = self._local_nodes.items()
-        else:
-            gid_info_items = ProgressBar.iter(self._local_nodes.items(), len(self._local_nodes))
+        gid_info_items = self._local_nodes.items()
+        morphology_file = getattr(CellType, "morphology_file", None)
+        if SimConfig.cli_options.prefetch_morphologies and morphology_file:
+            # Morphologies are read in the background while cells are built in the simulator
+            circuit_conf = self._circuit_conf
+            gid_info_items = MorphIOWrapper.prefetch_iter(
+                gid_info_items, lambda item: morphology_file(item[1], circuit_conf))
+
+        if GlobalConfig.verbosity < LogLevel.DEBUG:
+            gid_info_items = ProgressBar.iter(gid_info_items, len(self._local_nodes))
 
         for gid, cell_info in gid_info_items:
             cell = CellType(gid, cell_info, self._circuit_conf)
@@ -62,6 +62,27 @@ def neurodamus(args=None):
         --model-stats           Show model stats in CoreNEURON simulations [default: False]
         --dry-run               Dry-run simulation to estimate memory usage [default: False]
         --crash-test            Run the simulation with single section cells and single synapses
+        --prefetch-edges        Read the next block of edge data in a background thread, while
+                                connections are created [default: False]
+        --prefetch-morphologies Read the upcoming morphologies in background threads, while
+                                cells are instantiated [default: False]
+        --compact-synapse-params
+                                Hold synapse ids and types as integers and the kinetics in
+                                single precision, reducing memory at the cost of precision
+                                [default: False]
+        --edges-index-cache=<PATH>
+                                Directory where to cache the index of edge files, which is
+                                then memory-mapped by later runs of the same circuit
+        --spikes-cache=<PATH>   Directory where to write the binary sidecar of ascii replay
+                                spike files. Default: next to the spike file
+        --morphology-store=<PATH>
+                                Binary store of preprocessed morphologies created by hocify
+                                --store-from. Cells take their h5 morphologies from it
+        --node-shared-reads     Read edge data in a single rank per node, sharing it with the
+                                other node ranks via MPI shared memory [default: False]
+        --streaming-replay      Feed replay spikes to the simulation in windows of the report
+                                flush interval, instead of queuing them all upfront. SONATA
+                                spikes are read per window (NEURON only) [default: False]
         --num-target-ranks=<number>  Number of ranks to target for dry-run load balancing
         --coreneuron-direct-mode     Run CoreNeuron in direct memory mode transfered from Neuron,
                                      without writing model data to disk.
@@ -113,6 +134,8 @@ def hocify(args=None):
         -v --verbose            Increase verbosity level.
         --nframe=<number>       NEURON_NFRAME value [default: 1000].
         --output-dir=<PATH>     Output directory for hoc files.
+        --store-from=<FOLDER>   Also create a binary store of the h5 morphologies in this
+                                subfolder (e.g. h5v1), for neurodamus --morphology-store.
     """
     options = docopt_sanitize(docopt(hocify.__doc__, args))
     morph_path = abspath(options.pop("MorphologyPath"))
@@ -135,8 +158,12 @@ def hocify(args=None):
         return 0
 
     # otherwise it is a directory, use multiprocessing
+    store_from = options.pop("store_from")
     try:
-        Hocify(morph_path, neuron_nframe, log_level, **options).convert()
+        hocify_obj = Hocify(morph_path, neuron_nframe, log_level, **options)
+        hocify_obj.convert()
+        if store_from:
+            hocify_obj.create_store(store_from)
     except Exception as e:
         logging.critical(str(e), exc_info=True)
         return 1
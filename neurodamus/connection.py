@@ -1,8 +1,10 @@
 """
 Implementation of the core Connection classes
 """
+import hashlib
 import logging
 import numpy
+import operator
 import re
 from enum import Enum
 from .core import NeurodamusCore as Nd
@@ -179,7 +181,8 @@ class Connection(ConnectionBase):
     synapses are placed (stored in TPointList)
     """
     __slots__ = ("minis_spont_rate", "_spont_minis", "_replay", "_mod_override", "_synapse_ids",
-                 "_configurations", "_conductances_bk", "_synapse_sections", "_synapse_points_x")
+                 "_configurations", "_conductances_bk", "_synapse_sections", "_synapse_points_x",
+                 "_cell_sections")
 
     _AMPANMDA_Helper = None
     _GABAAB_Helper = None
@@ -219,10 +222,14 @@ class Connection(ConnectionBase):
         super().__init__(sgid, tgid, src_pop_id, dst_pop_id, weight_factor, **kwargs)
         self.minis_spont_rate = minis_spont_rate
         self._mod_override = mod_override
-        self._synapse_sections = []
-        self._synapse_points_x = compat.array("d")
-        self._synapse_ids = compat.array("i")  # replaced by np.array for bulk add syn
-        self._configurations = [configuration] if configuration is not None else []
+        # Synapses added in bulk dont own containers: sections are taken from the (shared)
+        # cell sections by isec, x from the location in the synapse params. Otherwise we
+        # create lists of sections and points, see add_synapse()
+        self._cell_sections = None
+        self._synapse_sections = None
+        self._synapse_points_x = None
+        self._synapse_ids = None  # A range, or np.array if some synapses were skipped
+        self._configurations = [configuration] if configuration is not None else None
         self._conductances_bk = None  # Store for re-enabling
         # Artificial stimulus sources
         self._spont_minis = None
@@ -233,7 +240,11 @@ class Connection(ConnectionBase):
         """Add a synapse configuration command to the list.
         All commands are executed on synapse creation
         """
-        if configuration is not None:
+        if configuration is None:
+            return
+        if self._configurations is None:
+            self._configurations = [configuration]
+        else:
             self._configurations.append(configuration)
 
     def override_mod(self, mod_override):
@@ -245,13 +256,29 @@ class Connection(ConnectionBase):
         """Generator over all sections containing synapses, yielding pairs
         (section_index, section)
         """
-        for syn_i, sc in enumerate(self._synapse_sections):
+        if self._synapse_sections is not None:
+            sections = self._synapse_sections
+        elif self._cell_sections is not None:
+            isec2sec = self._cell_sections.isec2sec
+            sections = (isec2sec[isec] for isec in self._synapse_params['isec'].tolist())
+        else:
+            return
+        for syn_i, sc in enumerate(sections):
             # All locations, on and off node should be in this list, but
             # only synapses/netcons on-node should be returned
             if not sc.exists():
                 continue
             yield syn_i, sc.sec
 
+    @property
+    def synapse_points_x(self):
+        """The x position of each synapse in its section"""
+        if self._synapse_points_x is not None:
+            return self._synapse_points_x
+        if self._synapse_params is None:
+            return ()
+        return self._synapse_params['location']
+
     # -
     def add_synapses(self, target_manager, synapses_params, base_id=0):
         """Adds synapses in bulk.
@@ -263,28 +290,30 @@ class Connection(ConnectionBase):
         """
 
         n_synapses = len(synapses_params)
-        synapse_ids = numpy.arange(base_id, base_id+n_synapses, dtype="uint64")
-        mask = numpy.full(n_synapses, True)  # We may need to skip invalid synapses (e.g. on Axon)
-        for i, syn_params in enumerate(synapses_params):
-            syn_point = target_manager.location_to_point(
-                self.tgid, syn_params['isec'], syn_params['ipt'], syn_params['offset'])
-            syn_params['location'] = syn_point.x[0]
-            section = syn_point.sclst[0]
-
-            if section is None or not section.exists():
-                target_point_str = "({0.isec:.0f} {0.ipt:.0f} {0.offset:.4f})".format(syn_params)
-                logging.warning("SKIPPED Synapse %s on gid %d. Src gid: %d. Deleted TPoint %s",
-                                base_id + i, self.tgid, self.sgid, target_point_str)
-                mask[i] = False
-                continue
-
-            # These are normal lists/arrays, so we cant use masks
-            self._synapse_sections.append(section)
-            self._synapse_points_x.append(syn_point.x[0])
+        synapse_ids = range(base_id, base_id + n_synapses)
+        # Resolve all the synapse locations at once
+        sections, locations = target_manager.locations_to_points(
+            self.tgid, synapses_params['isec'], synapses_params['ipt'], synapses_params['offset'])
+        # We may need to skip invalid synapses (e.g. on Axon)
+        mask = numpy.fromiter((sec is not None for sec in sections), dtype=bool, count=n_synapses)
+        synapses_params['location'] = numpy.where(mask, locations, -1)
+
+        for i in numpy.flatnonzero(~mask):
+            syn_params = synapses_params[i]
+            target_point_str = "({0.isec:.0f} {0.ipt:.0f} {0.offset:.4f})".format(syn_params)
+            logging.warning("SKIPPED Synapse %s on gid %d. Src gid: %d. Deleted TPoint %s",
+                            base_id + i, self.tgid, self.sgid, target_point_str)
+
+        if self._synapse_sections is not None:
+            # Synapses were added individually before. These are normal lists, so no masks
+            self._synapse_sections.extend(sec for sec in sections if sec is not None)
+            self._synapse_points_x.extend(locations[mask])
+        else:
+            self._cell_sections = target_manager.gid_to_sections(self.tgid)
 
         if not mask.all():
             synapses_params = synapses_params[mask]
-            synapse_ids = synapse_ids[mask]
+            synapse_ids = numpy.arange(base_id, base_id + n_synapses, dtype="uint64")[mask]
 
         if self._synapse_params is None or len(self._synapse_params) == 0:  # None or empty
             self._synapse_params = synapses_params
@@ -311,6 +340,7 @@ class Connection(ConnectionBase):
         # - synapse_points_x
         # - synapse_params (slow!)
         # - synapse_ids
+        self._init_synapse_lists()
 
         for i, sc in enumerate(syn_tpoints.sclst):
             self._synapse_sections.append(sc)
@@ -323,9 +353,25 @@ class Connection(ConnectionBase):
             syn_id = len(self._synapse_sections)
         self._synapse_ids.append(syn_id)
 
+    def _init_synapse_lists(self):
+        """Creates the lists of sections, points and ids for individually added synapses"""
+        if self._synapse_sections is not None:
+            return
+        if self._synapse_params is not None and len(self._synapse_params):
+            # Convert synapses previously added in bulk
+            isec2sec = self._cell_sections.isec2sec
+            self._synapse_sections = [isec2sec[i] for i in self._synapse_params['isec'].tolist()]
+            self._synapse_points_x = compat.array("d", self._synapse_params['location'])
+            self._synapse_ids = compat.array("i", self._synapse_ids)
+        else:
+            self._synapse_sections = []
+            self._synapse_points_x = compat.array("d")
+            self._synapse_ids = compat.array("i")
+
     def add_single(self, cell_manager, syn_params, syn_id):
         """Add synapse config in target cell"""
         soma = Nd.SectionRef(sec=cell_manager.get_cell(self.tgid).soma[0])
+        self._init_synapse_lists()
         self._synapse_ids.append(syn_id)
         self._synapse_sections.append(soma)
         self._synapse_points_x.append(0.5)
@@ -335,22 +381,30 @@ class Connection(ConnectionBase):
             self._synapse_params.append(syn_params)
 
     # -
-    def replay(self, tvec, start_delay=.0):
+    def replay(self, tvec, start_delay=.0, sources=None):
         """ The synapses connecting these gids are to be activated using
         predetermined timings.
 
         Args:
             tvec: time for spike events from the sgid
             start_delay: When the events may start to be delivered
+            sources: A ReplaySources pool to share the replay stims with
+                other connections from the same sgid (Default: None - not shared).
+                Streaming pools feed the spikes themselves, tvec is usually empty
         """
         assert self._netcons is None, "Replay must be setup prior to finalize()"
-        hoc_tvec = Nd.Vector(tvec[tvec >= start_delay])
-        logging.debug("Replaying %d spikes on %d - %d", hoc_tvec.size(), self.sgid, self.tgid)
-        logging.debug(" > First replay event for connection at %f", hoc_tvec.x[0])
+        tvec = tvec[tvec >= start_delay]
+        logging.debug("Replaying %d spikes on %d - %d", len(tvec), self.sgid, self.tgid)
+        if len(tvec):
+            logging.debug(" > First replay event for connection at %f", tvec.min())
 
         if self._replay is None:
-            self._replay = ReplayStim()
-        self._replay.add_spikes(hoc_tvec)
+            self._replay = ReplayStim(sources)
+        elif sources is not self._replay._sources and any(
+                getattr(pool, "streaming", False) for pool in (sources, self._replay._sources)):
+            raise ConfigurationError("Connection %d-%d cannot be replayed by several streams"
+                                     % (self.sgid, self.tgid))
+        self._replay.add_spikes(tvec)
         return len(self._replay)
 
     # -
@@ -376,21 +430,24 @@ class Connection(ConnectionBase):
         self._netcons = []
         self._init_artificial_stims(cell, replay_mode)
         n_syns = 0
+        helpers = None  # Resolved once, for the first synapse
+        created_syn_i = []
+        points_x = self.synapse_points_x
         for syn_i, sec in self.sections_with_synapses:
-            x = self._synapse_points_x[syn_i]
+            x = points_x[syn_i]
             syn_params = self._synapse_params[syn_i]
+            if helpers is None:
+                helpers = self._synapse_helpers()
 
             with Nd.section_in_stack(sec):
-                syn_obj = self._create_synapse(cell, syn_params, x,
-                                               self._synapse_ids[syn_i], base_seed)
+                syn_obj = self._create_synapse(cell, syn_params, x, self._synapse_ids[syn_i],
+                                               base_seed, helpers)
                 n_syns += 1
 
             self._synapses.append(syn_obj)
+            created_syn_i.append(syn_i)
             # syn_obj.verboseLevel = self.tgid  # debugging purposes
 
-            if attach_src_cell:
-                self._attach_source_cell(syn_obj, syn_params)
-
             if self._spont_minis is not None:
                 self._spont_minis.create_on(self, sec, x, syn_obj, syn_params, base_seed)
 
@@ -409,6 +466,9 @@ class Connection(ConnectionBase):
 
                 syn_obj.setup_delay_vecs(self._delay_vec, self._delayweight_vec)
 
+        if attach_src_cell and n_syns:
+            self._attach_source_cells(self._synapses, created_syn_i)
+
         # Apply configurations to the synapses
         # Set global options in mod overrides
         for mod_override in self._mod_overrides:
@@ -449,18 +509,58 @@ class Connection(ConnectionBase):
             self._delay_vec = Nd.Vector(total_delays).index(self._delay_vec, sort_indx)
             self._delayweight_vec = Nd.Vector(total_delays).index(self._delayweight_vec, sort_indx)
 
-    def _attach_source_cell(self, syn_obj, syn_params):
-        # See `neurodamus-core.Connection` for explanation. Also pc.gid_connect
-        nc = self._pc.gid_connect(self.sgid, syn_obj)
-        self.netcon_set_type(nc, syn_obj, NetConType.NC_PRESYN)
-        nc.delay = self.syndelay_override or syn_params.delay
-        nc.weight[0] = syn_params.weight * self.weight_factor
-        nc.threshold = SimConfig.spike_threshold
-        self._netcons.append(nc)
-        return nc
+    def _attach_source_cells(self, syn_objs, syn_indices):
+        """Connects the synapses to the source cell (see `neurodamus-core.Connection`),
+        computing the delays and weights of all the netcons in bulk.
+        """
+        syn_params = self._synapse_params
+        if isinstance(syn_params, numpy.ndarray):
+            syn_params = syn_params[syn_indices]
+        else:
+            syn_params = numpy.array([syn_params[i] for i in syn_indices])
+        weights = (syn_params['weight'].astype(float) * self.weight_factor).tolist()
+        delays = ([self.syndelay_override] * len(weights) if self.syndelay_override
+                  else syn_params['delay'].tolist())
+        threshold = SimConfig.spike_threshold
+        gid_connect = self._pc.gid_connect
+        for syn_obj, delay, weight in zip(syn_objs, delays, weights):
+            nc = gid_connect(self.sgid, syn_obj)
+            self.netcon_set_type(nc, syn_obj, NetConType.NC_PRESYN)
+            nc.delay = delay
+            nc.weight[0] = weight
+            nc.threshold = threshold
+            self._netcons.append(nc)
 
     # -
-    def _create_synapse(self, cell, params_obj, x, syn_id, base_seed):
+    def _synapse_helpers(self):
+        """Resolves the synapse creation helpers of this connection, which are the same
+        for all its synapses.
+
+        Returns: A tuple (mod_override, inhibitory_helper, excitatory_helper, extra_args).
+            Helpers are tuples (name, hoc template)
+        """
+        if self._mod_override is not None:
+            mod_override = self._mod_override.get("ModOverride").s
+            self._mod_overrides.add(mod_override)
+            helper_name = mod_override + "Helper"
+            helper = (helper_name, getattr(Nd.h, helper_name))
+            add_params = (self._src_pop_id, self._dst_pop_id, self._mod_override)
+            return mod_override, helper, helper, add_params
+        add_params = (self._src_pop_id, self._dst_pop_id)
+        return (None, ("GABAABHelper", self._GABAAB_Helper),
+                ("AMPANMDAHelper", self._AMPANMDA_Helper), add_params)
+
+    @classmethod
+    def clear_cache(cls):
+        """Clears the class caches of synapse helpers, e.g. when the model is cleared"""
+        cls._synapse_has_conductance_cache.clear()
+
+    # Whether synapses have a "conductance" field, per helper template name.
+    # Checking it on every synapse is slow, so we cache globally until clear_cache()
+    _synapse_has_conductance_cache = {}
+
+    # -
+    def _create_synapse(self, cell, params_obj, x, syn_id, base_seed, helpers=None):
         """Instantiate synapses (GABBAB inhibitory, AMPANMDA excitatory, etc)
         passing the creation helper the synapse params.
 
@@ -476,34 +576,34 @@ class Connection(ConnectionBase):
             syn_id: Synapse id (NRN: determined by row number)
             base_seed: base seed to adjust synapse RNG - added to
                 MCellRan4's low index parameter
+            helpers: The result of _synapse_helpers(), if already available
 
         """
-        is_inh = params_obj['synType'] < 100
-        if self._mod_override is not None:
-            mod_override = self._mod_override.get("ModOverride").s
-            self._mod_overrides.add(mod_override)
-            override_helper = mod_override + "Helper"
-            helper_cls = getattr(Nd.h, override_helper)
-            add_params = (self._src_pop_id, self._dst_pop_id, self._mod_override)
-        else:
-            helper_cls = self._GABAAB_Helper if is_inh else self._AMPANMDA_Helper
-            add_params = (self._src_pop_id, self._dst_pop_id)
+        is_inh = bool(params_obj['synType'] < 100)
+        mod_override, inh_helper, exc_helper, add_params = helpers or self._synapse_helpers()
+        helper_name, helper = inh_helper if is_inh else exc_helper
 
-        syn_helper = helper_cls(self.tgid, params_obj, x, syn_id, base_seed, *add_params)
+        syn_helper = helper(self.tgid, params_obj, x, syn_id, base_seed, *add_params)
+        synapse = syn_helper.synapse
 
         # set the synapse conductance obtained from the synapse file
         # this variable is exclusively used for delay connections
-        if hasattr(syn_helper.synapse, "conductance"):
-            syn_helper.synapse.conductance = params_obj['weight']
+        has_conductance = self._synapse_has_conductance_cache.get(helper_name)
+        if has_conductance is None:
+            has_conductance = hasattr(synapse, "conductance")
+            self._synapse_has_conductance_cache[helper_name] = has_conductance
+        if has_conductance:
+            synapse.conductance = params_obj['weight']
 
         # set the default value of synapse NMDA_ratio/GABAB_ratio from circuit
         conductance_ratio = float(params_obj['conductance_ratio'])
-        if conductance_ratio >= .0 and self._mod_override is None:
-            self._update_conductance_ratio(syn_helper.synapse, is_inh, conductance_ratio)
+        if conductance_ratio >= .0 and mod_override is None:
+            self._update_conductance_ratio(synapse, is_inh, conductance_ratio)
 
-        cell.CellRef.synHelperList.append(syn_helper)
-        cell.CellRef.synlist.append(syn_helper.synapse)
-        return syn_helper.synapse
+        cell_ref = cell.CellRef
+        cell_ref.synHelperList.append(syn_helper)
+        cell_ref.synlist.append(synapse)
+        return synapse
 
     # -
     def finalize_gap_junctions(self, cell, offset, end_offset):
@@ -518,8 +618,9 @@ class Connection(ConnectionBase):
         self._synapses = compat.List()
         self._netcons = []
 
+        points_x = self.synapse_points_x
         for syn_i, sec in self.sections_with_synapses:
-            x = self._synapse_points_x[syn_i]
+            x = points_x[syn_i]
             active_params = self._synapse_params[syn_i]
             gap_junction = Nd.Gap(x, sec=sec)
 
@@ -567,23 +668,62 @@ class Connection(ConnectionBase):
         else:
             syn_obj.NMDA_ratio = value
 
+    # SynapseConfigure statements are mostly plain attribute assignments, which we can apply
+    # from Python instead of having hoc to interpret the statement for every single synapse
+    _config_statement = re.compile(
+        r"\s*%s\.(\w+)\s*([-+*/]?=)\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*;?\s*")
+    """Regex to match a simple statement, e.g. `%s.attr = 1.0` or `%s.attr *= 2`"""
+
+    _config_operators = {"=": None, "*=": operator.mul, "/=": operator.truediv,
+                         "+=": operator.add, "-=": operator.sub}
+    _compiled_configurations = {}
+
+    @classmethod
+    def _compile_configuration(cls, configuration):
+        """Parses a SynapseConfigure string into a list of (attribute, operator, value).
+        Returns None for configurations not made only of simple statements (use hoc).
+        """
+        if configuration in cls._compiled_configurations:
+            return cls._compiled_configurations[configuration]
+        statements = []
+        pos = 0
+        while pos < len(configuration):
+            match = cls._config_statement.match(configuration, pos)
+            if match is None:
+                statements = None
+                break
+            attr, op, value = match.groups()
+            statements.append((attr, cls._config_operators[op], float(value)))
+            pos = match.end()
+        cls._compiled_configurations[configuration] = statements
+        return statements
+
     def _configure(self, synapses, configuration):
-        res = self.ConnUtils.executeConfigure(synapses, configuration)
-        if res > 0:
-            raise ConfigurationError(f"Errors found in configuration: {configuration}")
+        statements = self._compile_configuration(configuration)
+        if statements is None:
+            res = self.ConnUtils.executeConfigure(synapses, configuration)
+            if res > 0:
+                raise ConfigurationError(f"Errors found in configuration: {configuration}")
+            return
+        try:
+            for syn in synapses:
+                for attr, op, value in statements:
+                    setattr(syn, attr, value if op is None else op(getattr(syn, attr), value))
+        except (AttributeError, LookupError) as e:
+            raise ConfigurationError(f"Errors found in configuration: {configuration}") from e
 
     def _configure_cell(self, cell):
         """ Internal helper to apply all the configuration statements on
         a given cell synapses
         """
-        for config in self._configurations:
+        for config in self._configurations or ():
             self._configure(cell.CellRef.synlist, config)
 
     def _configure_synapses(self):
         """ Internal helper to apply all the configuration statements to
         the created synapses
         """
-        for config in self._configurations:
+        for config in self._configurations or ():
             self.configure_synapses(config)
 
     def configure_synapses(self, configuration):
@@ -774,28 +914,45 @@ class InhExcSpontMinis(SpontMinis):
 
 
 class ReplayStim(ArtificialStim):
-    """A class creating/holding replays of a connection
+    """A class creating/holding replays of a connection.
+    A single VecStim drives all the connection synapses. When a ReplaySources pool is given
+    the VecStim (and its time Vector) is shared with all connections from the same sgid
+    replaying the same spikes.
     """
-    __slots__ = ("time_vec")
+    __slots__ = ("_spikes", "_tvec", "_sources", "_vecstim")
 
-    def __init__(self):
+    def __init__(self, sources=None):
         super().__init__()
-        self.time_vec = None
+        self._spikes = None  # sorted numpy array, until the VecStim is created
+        self._tvec = None  # the time Vector played by the VecStim
+        self._sources = sources
+        self._vecstim = None
+
+    @property
+    def time_vec(self):
+        """The replay times: the played time Vector once created, the numpy array before"""
+        return self._tvec if self._tvec is not None else self._spikes
 
     def create_on(self, conn, sec, syn_obj, syn_params):
         """Inserts a replay stim into the given synapse
         """
-        vecstim = None
-        if self.has_data():
-            vecstim = Nd.VecStim(sec=sec)
-            vecstim.play(self.time_vec)
-
         if GlobalConfig.debug_conn in ([conn.tgid], [conn.sgid, conn.tgid]):
             log_all(logging.DEBUG, "Creating Replay on %d-%d, times: %s",
-                    conn.sgid, conn.tgid, self.time_vec.as_numpy() if self.has_data() else "N/A")
+                    conn.sgid, conn.tgid, self.time_vec if self.has_data() else "N/A")
+
+        if self._vecstim is None and self._spikes is not None:
+            if self._sources is not None:
+                self._vecstim, self._tvec = self._sources.get_source(conn.sgid, self._spikes, sec)
+            else:
+                # VecStim only keeps a pointer to the Vector, we must hold it
+                self._tvec = Nd.Vector(self._spikes)
+                self._vecstim = Nd.VecStim(sec=sec)
+                self._vecstim.play(self._tvec)
+                self._store(self._vecstim, None)
+            self._spikes = None  # times are now held by the Vector
 
         nc = Nd.NetCon(
-            vecstim,
+            self._vecstim,
             syn_obj,
             10,
             conn.syndelay_override or syn_params.delay,
@@ -804,20 +961,83 @@ class ReplayStim(ArtificialStim):
         )
         nc.weight[0] = syn_params.weight * conn.weight_factor
         conn.netcon_set_type(nc, syn_obj, NetConType.NC_REPLAY)
-        self._store(vecstim, nc)
+        self._store(None, nc)
         return nc
 
-    def add_spikes(self, hoc_tvec):
-        """Appends replay spikes from a time vector to the main replay vector
+    def add_spikes(self, tvec):
+        """Appends replay spikes from a time array to the main replay times
         """
-        if self.time_vec is None:
-            self.time_vec = hoc_tvec
+        assert self._vecstim is None, "Replay spikes must be added before creating the stims"
+        if self._spikes is None:
+            self._spikes = numpy.sort(tvec)
         else:
-            self.time_vec.append(hoc_tvec)
-        self.time_vec.sort()
+            self._spikes = numpy.sort(numpy.concatenate((self._spikes, tvec)))
 
     def has_data(self):
-        return self.time_vec is not None
+        return self._spikes is not None or self._tvec is not None
+
+    def __len__(self):
+        return len(self.time_vec) if self.has_data() else -1
+
+
+class ReplaySources:
+    """A pool of replay sources (VecStim playing a time Vector), shared by all the
+    connections from the same source gid with the same replay spikes.
+
+    In streaming mode there is a single source per sgid, whose time Vector only holds
+    the spikes of the current time window, see play_window()
+    """
+
+    def __init__(self, streaming=False):
+        self._vecstims = {}  # (sgid, spike times digest) or sgid -> (VecStim, time Vector)
+        self._streaming = streaming
+
+    streaming = property(lambda self: self._streaming)
+
+    def get_source(self, sgid, time_vec, sec=None):
+        """Retrieves the VecStim replaying the given times for sgid, and its time Vector.
+        They are created if needed.
+
+        Args:
+            sgid: The source gid
+            time_vec: The (sorted) numpy array of spike times. Ignored when streaming
+            sec: A section to hold the VecStim, when created
+        """
+        if self._streaming:
+            key = sgid
+        else:
+            # A digest of the times, not to hold yet another copy of them
+            key = (sgid, len(time_vec), hashlib.sha1(numpy.ascontiguousarray(time_vec)).digest())
+        vecstim_tvec = self._vecstims.get(key)
+        if vecstim_tvec is None:
+            hoc_tvec = Nd.Vector() if self._streaming else Nd.Vector(time_vec)
+            vecstim = Nd.VecStim(sec=sec)
+            vecstim.play(hoc_tvec)
+            ArtificialStim._bbss.ignore(vecstim)
+            vecstim_tvec = self._vecstims[key] = (vecstim, hoc_tvec)
+        return vecstim_tvec
+
+    def play_window(self, spike_manager, tstart, tstop, sgid_offset=0):
+        """Streaming: Sets the sources to play the spikes within [tstart, tstop) only.
+        To be called at tstart, once the events of the previous window were delivered.
+
+        Args:
+            spike_manager: The SpikeManager holding the spikes of the (raw) source gids
+            tstart: The window start time, usually the current time
+            tstop: The window end time
+            sgid_offset: The offset of the source population, subtracted from sgids
+        """
+        assert self._streaming, "play_window requires a streaming ReplaySources"
+        for sgid, (vecstim, hoc_tvec) in self._vecstims.items():
+            times = spike_manager.get_window(sgid - sgid_offset, tstart, tstop)
+            if not len(times) and not hoc_tvec.size():
+                continue
+            hoc_tvec.from_python(times)
+            vecstim.restartEvent()
+
+    def restart_events(self):
+        for vecstim, _ in self._vecstims.values():
+            vecstim.restartEvent()
 
     def __len__(self):
-        return self.time_vec.size() if self.time_vec else -1
+        return len(self._vecstims)
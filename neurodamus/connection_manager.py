@@ -14,7 +14,7 @@ from .core import NeurodamusCore as Nd
 from .core import ProgressBarRank0 as ProgressBar, MPI
 from .core import run_only_rank0
 from .core.configuration import GlobalConfig, SimConfig, ConfigurationError, find_input_file
-from .connection import Connection, ReplayMode
+from .connection import Connection, ReplayMode, ReplaySources
 from .io.sonata_config import ConnectionTypes
 from .io.synapse_reader import SynapseReader
 from .target_manager import TargetManager, TargetSpec
@@ -25,10 +25,88 @@ from .utils.timeit import timeit
 from .utils.pyutils import gen_ranges
 
 
+class _PendingConnections:
+    """A table of connections to a tgid, as arrays, whose Connection objects (and synapses)
+    are only created when accessed. See ConnectionSet.add_pending_connections
+    """
+    __slots__ = ("sgids", "starts", "ends", "weight_factors", "synapses_offsets",
+                 "syns_params", "add_synapses_f", "syn_type_restrict", "locked",
+                 "conn_kwargs", "configurations")
+
+    def __init__(self, sgids, starts, ends, syns_params, add_synapses_f, syn_type_restrict,
+                 synapses_offsets, locked, weight_factor, conn_kwargs):
+        self.sgids = sgids
+        self.starts = starts
+        self.ends = ends
+        self.weight_factors = numpy.full(len(sgids), weight_factor, dtype="float64")
+        self.synapses_offsets = synapses_offsets
+        self.syns_params = syns_params
+        self.add_synapses_f = add_synapses_f
+        self.syn_type_restrict = syn_type_restrict
+        self.locked = locked
+        self.conn_kwargs = conn_kwargs
+        self.configurations = []  # Tuples (rows mask, attributes, setup_f)
+
+    def __len__(self):
+        return len(self.sgids)
+
+    def configure(self, rows, attributes, setup_f=None):
+        """Records a configuration of the given rows, to be applied on creation.
+        The weight_factor is set straight away in its column.
+        """
+        attributes = dict(attributes)
+        if "weight_factor" in attributes:
+            self.weight_factors[rows] = attributes.pop("weight_factor")
+        if attributes or setup_f is not None:
+            mask = numpy.zeros(len(self.sgids), dtype=bool)
+            mask[rows] = True
+            self.configurations.append((mask, attributes, setup_f))
+
+    def remove(self, rows):
+        """Removes the given rows from the table"""
+        keep = numpy.ones(len(self.sgids), dtype=bool)
+        keep[rows] = False
+        self.sgids = self.sgids[keep]
+        self.starts = self.starts[keep]
+        self.ends = self.ends[keep]
+        self.weight_factors = self.weight_factors[keep]
+        if self.synapses_offsets is not None:
+            self.synapses_offsets = self.synapses_offsets[keep]
+        self.configurations = [(mask[keep], attributes, setup_f)
+                               for mask, attributes, setup_f in self.configurations]
+
+    def create_connections(self, rows, conn_factory, tgid, src_id, dst_id):
+        """Creates the connections of the given rows, adding their synapses and applying
+        the recorded configurations
+        """
+        conns = []
+        for i in rows.tolist():
+            conn_kwargs = self.conn_kwargs
+            if self.synapses_offsets is not None:
+                conn_kwargs = dict(conn_kwargs, synapses_offset=self.synapses_offsets[i])
+            conn = conn_factory(int(self.sgids[i]), tgid, src_id, dst_id,
+                                weight_factor=float(self.weight_factors[i]), **conn_kwargs)
+            start = int(self.starts[i])
+            self.add_synapses_f(conn, self.syns_params[start:self.ends[i]],
+                                self.syn_type_restrict, start)
+            conn.locked = self.locked
+            for mask, attributes, setup_f in self.configurations:
+                if mask[i]:
+                    for key, val in attributes.items():
+                        setattr(conn, key, val)
+                    if setup_f is not None:
+                        setup_f(conn)
+            conns.append(conn)
+        return conns
+
+
 class ConnectionSet(object):
     """
     A dataset of connections.
     Several populations may exist with different seeds
+
+    Connections added in bulk (see add_pending_connections) are kept as tables of arrays
+    and their Connection objects are only created when accessed.
     """
 
     def __init__(self, src_id, dst_id, conn_factory=Connection):
@@ -40,29 +118,106 @@ class ConnectionSet(object):
         self.virtual_source = False
         self._conn_factory = conn_factory
         self._connections_map = defaultdict(list)
+        self._pending_map = {}  # Tables of connections yet to be created, by post-gid
+        self._sgids_map = {}  # Lazily built arrays with the sgids of each tgid connections
+        self._sgid_index = None  # Lazily built reverse index (sorted runs), see _get_sgid_index
         self._conn_count = 0
 
     def __contains__(self, item):
-        return item in self._connections_map
+        return item in self._connections_map or item in self._pending_map
 
     def __getitem__(self, item):
+        self._materialize(item)
         return self._connections_map[item]
 
     def get(self, item):
+        self._materialize(item)
         return self._connections_map.get(item)
 
     def items(self):
         """Iterate over the population as tuples (dst_gid, [connections])"""
+        self._materialize(None)
         return self._connections_map.items()
 
     def target_gids(self):
         """Get the list of all targets gids in this Population"""
+        if self._pending_map:
+            return self._connections_map.keys() | self._pending_map.keys()
         return self._connections_map.keys()
 
     def all_connections(self):
         """Get an iterator over all the connections."""
+        self._materialize(None)
         return chain.from_iterable(self._connections_map.values())
 
+    def _tgid_sgids(self, tgid):
+        """Retrieves the (sorted) sgids of the connections to a tgid, as an array.
+        The array is cached until the tgid connections are modified
+        """
+        sgids = self._sgids_map.get(tgid)
+        if sgids is None:
+            conns = self._connections_map.get(tgid, ())
+            sgids = numpy.fromiter((c.sgid for c in conns), dtype="int64", count=len(conns))
+            self._sgids_map[tgid] = sgids
+        return sgids
+
+    def _conns_modified(self, tgid):
+        """Drops the cached sgid arrays/indexes after removing connections of tgid"""
+        self._sgids_map.pop(tgid, None)
+        self._sgid_index = None
+
+    def _conns_added(self, tgid, new_conns, update_index=True):
+        """Drops the cached sgid array of tgid and adds the new connections to the reverse
+        index, if already built. The index is thus not rebuilt when connections get created
+        """
+        self._sgids_map.pop(tgid, None)
+        if update_index:
+            self._index_add(new_conns)
+
+    def _index_add(self, new_conns):
+        """Adds new connections to the reverse index (if built) as a sorted run"""
+        if self._sgid_index is None or not new_conns:
+            return
+        runs = self._sgid_index
+        runs.append(self._sorted_index_run(new_conns))
+        # Merge runs as a binary counter: there are O(log N) runs, and each connection
+        # is re-sorted O(log N) times at most
+        while len(runs) > 1 and len(runs[-2][0]) <= len(runs[-1][0]):
+            last = runs.pop()
+            prev = runs.pop()
+            runs.append(self._sorted_index_run(prev[2] + last[2],
+                                               numpy.concatenate((prev[0], last[0])),
+                                               numpy.concatenate((prev[1], last[1]))))
+
+    @staticmethod
+    def _sorted_index_run(conns, sgids=None, tgids=None):
+        """Sorts connections by sgid and then tgid, as a tuple (sgids, tgids, connections)"""
+        if sgids is None:
+            sgids = numpy.fromiter((c.sgid for c in conns), dtype="int64", count=len(conns))
+            tgids = numpy.fromiter((c.tgid for c in conns), dtype="int64", count=len(conns))
+        order = numpy.lexsort((tgids, sgids))
+        return sgids[order], tgids[order], [conns[i] for i in order.tolist()]
+
+    def _get_sgid_index(self):
+        """Retrieves the reverse index of the (created) connections by sgid, built on first use.
+        It is a list of runs (sgids, tgids, connections), each sorted by sgid and then tgid.
+        Connections created later are added as new runs, see _conns_added.
+        """
+        if self._sgid_index is None:
+            conns = list(chain.from_iterable(self._connections_map.values()))
+            self._sgid_index = [self._sorted_index_run(conns)] if conns else []
+        return self._sgid_index
+
+    def source_gids(self):
+        """Get the (sorted, unique) source gids of all the connections, as an array"""
+        sgids = numpy.concatenate([numpy.empty(0, dtype="int64")]
+                                  + [run[0] for run in self._get_sgid_index()])
+        if self._pending_map:
+            sgids = numpy.concatenate([sgids] + [table.sgids
+                                                 for tables in self._pending_map.values()
+                                                 for table in tables])
+        return numpy.unique(sgids)
+
     def _find_connection(self, sgid, tgid, exact=True):
         """Finds a connection, given its source and destination gids.
 
@@ -87,6 +242,7 @@ class ConnectionSet(object):
         Returns:
             Connection: A connection object if it exists. None otherwise
         """
+        self._materialize(tgid, sgid)
         conn_lst, idx = self._find_connection(sgid, tgid)
         return None if idx is None else conn_lst[idx]
 
@@ -98,6 +254,7 @@ class ConnectionSet(object):
         Args:
             conn: The connection object to be stored
         """
+        self._materialize(conn.tgid, conn.sgid)
         cell_conns, pos = self._find_connection(conn.sgid, conn.tgid, exact=False)
         if cell_conns and pos < len(cell_conns) and cell_conns[pos].sgid == conn.sgid:
             logging.error("Attempt to store existing connection: %d->%d",
@@ -105,10 +262,12 @@ class ConnectionSet(object):
             return
         self._conn_count += 1
         cell_conns.insert(pos, conn)
+        self._conns_added(conn.tgid, [conn])
 
     # -
     def get_or_create_connection(self, sgid, tgid, **kwargs):
         """Returns a connection by pre-post gid, creating if required."""
+        self._materialize(tgid, sgid)
         conns = self._connections_map[tgid]
         pos = 0
         if conns:
@@ -125,18 +284,178 @@ class ConnectionSet(object):
         # Not found. Create & insert
         cur_conn = self._conn_factory(sgid, tgid, self.src_id, self.dst_id, **kwargs)
         conns.insert(pos, cur_conn)
+        self._conns_added(tgid, [cur_conn])
         self._conn_count += 1
         return cur_conn
 
+    # -
+    def get_or_create_connections(self, sgids, tgid, per_conn_kwargs=None, **kwargs):
+        """Returns the connections to a tgid from each of the given sgids, creating the
+        missing ones in bulk.
+
+        Args:
+            sgids: An array of source gids. Repeated sgids map to the same connection
+            tgid: The target gid
+            per_conn_kwargs: A dict of arrays (aligned with sgids) of connection kwargs
+            kwargs: Further kwargs for creating connections
+        """
+        sgids = numpy.asarray(sgids, dtype="int64")
+        self._materialize(tgid, sgids)
+        existing = self._tgid_sgids(tgid)
+        new_sgids, new_idx = numpy.unique(sgids, return_index=True)
+        is_new = ~self._sgids_in(new_sgids, existing)
+        new_sgids, new_idx = new_sgids[is_new], new_idx[is_new]
+
+        if len(new_sgids):
+            per_conn_kwargs = per_conn_kwargs or {}
+            new_conns = [
+                self._conn_factory(sgid, tgid, self.src_id, self.dst_id, **kwargs,
+                                   **{name: values[i] for name, values in per_conn_kwargs.items()})
+                for sgid, i in zip(new_sgids.tolist(), new_idx.tolist())
+            ]
+            self._insert_connections(tgid, new_conns)
+            self._conn_count += len(new_conns)
+            existing = self._tgid_sgids(tgid)
+
+        conns = self._connections_map[tgid]
+        return [conns[i] for i in numpy.searchsorted(existing, sgids).tolist()]
+
+    def _insert_connections(self, tgid, new_conns, update_index=True):
+        """Merges new connections (sorted by sgid, none existing) into those of tgid,
+        keeping the sgid order. Unless update_index is False, they are added to the reverse
+        index right away
+        """
+        conns = self._connections_map[tgid]
+        new_sgids = numpy.fromiter((c.sgid for c in new_conns), dtype="int64",
+                                   count=len(new_conns))
+        merged = []
+        prev_pos = 0
+        for pos, conn in zip(numpy.searchsorted(self._tgid_sgids(tgid), new_sgids).tolist(),
+                             new_conns):
+            merged.extend(conns[prev_pos:pos])
+            merged.append(conn)
+            prev_pos = pos
+        merged.extend(conns[prev_pos:])
+        conns[:] = merged
+        self._conns_added(tgid, new_conns, update_index)
+
+    # -
+    def add_pending_connections(self, tgid, sgids, starts, ends, syns_params, add_synapses_f,
+                                syn_type_restrict=None, synapses_offsets=None, lock=False,
+                                weight_factor=1.0, **conn_kwargs):
+        """Adds the connections to a tgid from each of the given sgids, with synapses
+        syns_params[starts[i]:ends[i]]. The connections are stored as a table and only
+        created, along with their synapses, when accessed.
+        Synapses from sgids already connected to tgid are added right away.
+
+        Args:
+            tgid: The target gid
+            sgids: An array with the source gid of each connection
+            starts: An array with the start of each connection synapses in syns_params
+            ends: An array with the end of each connection synapses in syns_params
+            syns_params: The synapse parameters of all the connections
+            add_synapses_f: The function adding synapses to a connection, with the
+                signature of ConnectionManagerBase._add_synapses
+            syn_type_restrict: (Optional) The synType of synapses not to be added
+            synapses_offsets: (Optional) An array with the offset of each connection synapses
+            lock: Lock the connections once their synapses are added. Synapses are not
+                added to existing locked connections.
+            weight_factor: The weight factor of the connections
+            conn_kwargs: Further kwargs for creating connections
+        """
+        sgids = numpy.asarray(sgids, dtype="int64")
+        starts = numpy.asarray(starts)
+        ends = numpy.asarray(ends)
+        # Existing connections, as well as repeated or unsorted sgids, are handled right away
+        eager = self._sgids_in(sgids, self._tgid_sgids(tgid))
+        for table in self._pending_map.get(tgid, ()):
+            eager |= self._sgids_in(sgids, table.sgids)
+        if len(sgids) > 1 and not (numpy.diff(sgids) > 0).all():
+            eager[:] = True
+
+        if eager.any():
+            idx = numpy.flatnonzero(eager)
+            per_conn_kwargs = synapses_offsets is not None and {
+                "synapses_offset": synapses_offsets[idx]}
+            conns = self.get_or_create_connections(sgids[idx], tgid, per_conn_kwargs,
+                                                   weight_factor=weight_factor, **conn_kwargs)
+            for conn, start, end in zip(conns, starts[idx].tolist(), ends[idx].tolist()):
+                if lock and conn.locked:
+                    continue
+                add_synapses_f(conn, syns_params[start:end], syn_type_restrict, start)
+                if lock:
+                    conn.locked = True
+            keep = ~eager
+            sgids, starts, ends = sgids[keep], starts[keep], ends[keep]
+            if synapses_offsets is not None:
+                synapses_offsets = synapses_offsets[keep]
+
+        if len(sgids):
+            table = _PendingConnections(sgids, starts, ends, syns_params, add_synapses_f,
+                                        syn_type_restrict, synapses_offsets, lock,
+                                        weight_factor, conn_kwargs)
+            self._pending_map.setdefault(tgid, []).append(table)
+            self._conn_count += len(sgids)
+
+    def _find_pending(self, post_gids, pre_gids=None):
+        """Get the rows of the pending connections between groups of gids (None: all)
+
+        Returns: A list of tuples (tgid, table, rows)
+        """
+        if not self._pending_map:
+            return []
+        tgids = (list(self._pending_map) if post_gids is None
+                 else (post_gids,) if isinstance(post_gids, (int, numpy.integer))
+                 else post_gids)
+        if pre_gids is not None:
+            pre_gids = numpy.unique(numpy.asarray(
+                [pre_gids] if isinstance(pre_gids, (int, numpy.integer)) else pre_gids,
+                dtype="int64"))
+        found = []
+        for tgid in tgids:
+            for table in self._pending_map.get(tgid, ()):
+                rows = (numpy.arange(len(table)) if pre_gids is None
+                        else numpy.flatnonzero(self._sgids_in(table.sgids, pre_gids)))
+                if len(rows):
+                    found.append((tgid, table, rows))
+        return found
+
+    def _remove_pending(self, tgid, table, rows):
+        """Removes rows from a table of pending connections, dropping it when empty"""
+        table.remove(rows)
+        if not len(table):
+            tables = self._pending_map[tgid]
+            tables.remove(table)
+            if not tables:
+                del self._pending_map[tgid]
+
+    def _materialize(self, post_gids, pre_gids=None):
+        """Creates the pending connections between groups of gids (None: all)"""
+        new_conns = defaultdict(list)
+        for tgid, table, rows in self._find_pending(post_gids, pre_gids):
+            new_conns[tgid].extend(table.create_connections(
+                rows, self._conn_factory, tgid, self.src_id, self.dst_id))
+            self._remove_pending(tgid, table, rows)
+        for tgid, conns in new_conns.items():
+            conns.sort(key=lambda conn: conn.sgid)
+            self._insert_connections(tgid, conns, update_index=False)
+        # A single index run for all the created connections
+        self._index_add(list(chain.from_iterable(new_conns.values())))
+
     # -
     def get_connections(self, post_gids, pre_gids=None):
         """Get all connections between groups of gids."""
+        self._materialize(post_gids, pre_gids)
+        return self._get_connections(post_gids, pre_gids)
+
+    def _get_connections(self, post_gids, pre_gids=None):
+        """Get the (created) connections between groups of gids."""
         if isinstance(post_gids, int):
             if pre_gids is None:
                 return self._connections_map[post_gids]
             elif isinstance(pre_gids, int):
-                elem = self.get_connection(pre_gids, post_gids)
-                return (elem,) if elem is not None else ()
+                conn_lst, idx = self._find_connection(pre_gids, post_gids)
+                return (conn_lst[idx],) if idx is not None else ()
 
         post_gid_conn_lists = (
             self._connections_map.values() if post_gids is None
@@ -151,32 +470,110 @@ class ConnectionSet(object):
                     for posi in (bin_search(conns, pre_gids, lambda x: x.sgid),)
                     if posi < len(conns) and conns[posi].sgid == pre_gids)
         else:
-            # Generic case. Looks through all conns in selected tgids
-            pre_gids = set(pre_gids)
-            return (c for conns in post_gid_conn_lists
-                    for c in conns
-                    if c.sgid in pre_gids)
+            # Generic case. Match the sgids of each tgid against the (sorted) pre_gids
+            pre_gids = numpy.unique(numpy.asarray(pre_gids, dtype="int64"))
+            tgids = (self._connections_map.keys() if post_gids is None
+                     else (post_gids,) if isinstance(post_gids, int)
+                     else post_gids)
+            return (conns[i] for tgid in tgids
+                    for conns in (self._connections_map[tgid],)
+                    for i in numpy.flatnonzero(self._sgids_in(self._tgid_sgids(tgid), pre_gids)))
+
+    def get_connections_from(self, pre_gids, post_gids=None):
+        """Get the connections from the given pre_gids, optionally restricted to post_gids.
+        Only the matching connections are visited, using the reverse index by sgid.
+        Connections are returned in the same order as get_connections (by tgid, then sgid).
+        """
+        self._materialize(post_gids, pre_gids)
+        pre_gids = numpy.unique(numpy.asarray(pre_gids, dtype="int64"))
+        if post_gids is not None:
+            post_gids = numpy.unique(numpy.asarray(post_gids, dtype="int64"))
+        found_sgids, found_tgids, found_conns = [], [], []
+        for sgids, tgids, conns in self._get_sgid_index():
+            starts = numpy.searchsorted(sgids, pre_gids, side="left")
+            lengths = numpy.searchsorted(sgids, pre_gids, side="right") - starts
+            # The indices of all the ranges [start, start + length)
+            range_offsets = numpy.cumsum(lengths) - lengths
+            indices = numpy.arange(lengths.sum()) + numpy.repeat(starts - range_offsets, lengths)
+            if post_gids is not None:
+                indices = indices[self._sgids_in(tgids[indices], post_gids)]
+            found_sgids.append(sgids[indices])
+            found_tgids.append(tgids[indices])
+            found_conns.extend(conns[i] for i in indices.tolist())
+        if not found_conns:
+            return []
+        order = numpy.lexsort((numpy.concatenate(found_sgids), numpy.concatenate(found_tgids)))
+        return [found_conns[i] for i in order.tolist()]
+
+    @staticmethod
+    def _sgids_in(sgids, sorted_gids):
+        """Vectorized membership test of sgids in an array of sorted gids"""
+        if not len(sorted_gids):
+            return numpy.zeros(len(sgids), dtype=bool)
+        pos = numpy.searchsorted(sorted_gids, sgids)
+        pos[pos == len(sorted_gids)] = 0
+        return sorted_gids[pos] == sgids
+
+    def configure(self, post_gids, pre_gids=None, attributes=None, setup_f=None):
+        """Configures the connections between groups of gids, setting attributes and calling
+        setup_f(conn) for each of them. For connections yet to be created the configuration
+        is recorded, and applied on creation.
+
+        Returns: The number of configured connections
+        """
+        attributes = attributes or {}
+        n_configured = 0
+        for _, table, rows in self._find_pending(post_gids, pre_gids):
+            table.configure(rows, attributes, setup_f)
+            n_configured += len(rows)
+        for conn in self._get_connections(post_gids, pre_gids):
+            for key, val in attributes.items():
+                setattr(conn, key, val)
+            if setup_f is not None:
+                setup_f(conn)
+            n_configured += 1
+        return n_configured
+
+    def unlock_all(self):
+        """Unlock all connections, so that synapses may be appended to them"""
+        for table in chain.from_iterable(self._pending_map.values()):
+            table.locked = False
+        for conn in chain.from_iterable(self._connections_map.values()):
+            conn.locked = False
 
     def get_synapse_params_gid(self, target_gid):
         """Get an iterator over all the synapse parameters of a target
         cell connections.
         """
+        self._materialize(target_gid)
         conns = self._connections_map[target_gid]
         return chain.from_iterable(c.synapse_params for c in conns)
 
     def delete(self, sgid, tgid):
         """Removes a given connection from the population."""
+        for _, table, rows in self._find_pending(tgid, sgid):
+            self._remove_pending(tgid, table, rows)
+            self._conn_count -= len(rows)
+            return
         conn_lst, idx = self._find_connection(sgid, tgid)
         if idx is None:
             logging.error("Non-existing connection to delete: %d->%d", sgid, tgid)
             return
         self._conn_count -= 1
         del conn_lst[idx]
+        self._conns_modified(tgid)
 
     def delete_group(self, post_gids, pre_gids=None):
         """Removes a set of connections from the population."""
+        for tgid, table, rows in self._find_pending(post_gids, pre_gids):
+            self._remove_pending(tgid, table, rows)
+            self._conn_count -= len(rows)
         for conns, indices in self._find_connections(post_gids, pre_gids):
+            if not len(indices):
+                continue
+            tgid = conns[0].tgid
             conns[:] = numpy.delete(conns, indices, axis=0).tolist()
+            self._conns_modified(tgid)
             self._conn_count -= len(indices)
 
     def count(self):
@@ -185,21 +582,19 @@ class ConnectionSet(object):
     # -
     def _find_connections(self, post_gids, pre_gids=None):
         """Get the indices of the connections between groups of gids"""
-        post_gid_conn_lists = (
-            self._connections_map.values() if post_gids is None
-            else (self._connections_map[post_gids],) if isinstance(post_gids, int)
-            else (self._connections_map[tgid] for tgid in post_gids)
-        )
+        tgids = (list(self._connections_map.keys()) if post_gids is None
+                 else (post_gids,) if isinstance(post_gids, int)
+                 else post_gids)
 
         if pre_gids is None:
-            return ((conns, range(len(conns))) for conns in post_gid_conn_lists)
+            return ((conns, range(len(conns)))
+                    for conns in (self._connections_map[tgid] for tgid in tgids))
 
-        sgids_interest = [pre_gids] if isinstance(pre_gids, int) else pre_gids
+        sgids_interest = numpy.unique([pre_gids] if isinstance(pre_gids, int) else pre_gids)
         return (
-            (conns, numpy.searchsorted(
-                numpy.fromiter((c.sgid for c in conns), dtype="int64", count=len(conns)),
-                sgids_interest))
-            for conns in post_gid_conn_lists
+            (self._connections_map[tgid],
+             numpy.flatnonzero(self._sgids_in(self._tgid_sgids(tgid), sgids_interest)))
+            for tgid in tgids
         )
 
     def ids_match(self, population_ids, dst_second=None):
@@ -284,8 +679,10 @@ class ConnectionManagerBase(object):
         self._load_offsets = kw.get("load_offsets", False)
         # An internal var to enable collection of synapse statistics to a Counter
         self._dry_run_stats: DryRunStats = kw.get("dry_run_stats")
-        # For each tgid track "connected" sgids (dry-run)
-        self._dry_run_conns = defaultdict(set)
+        # Track "connected" tgid-sgid pairs, as sorted (tgid << 32 | sgid) keys (dry-run)
+        self._dry_run_conns = numpy.empty(0, dtype="uint64")
+        # Replay VecStims, shared among the connections from the same source
+        self._replay_sources = ReplaySources()
 
     def __str__(self):
         return "<{:s} | {:s} -> {:s}>".format(
@@ -329,7 +726,10 @@ class ConnectionManagerBase(object):
     def _open_synapse_file(self, synapse_file, pop_name):
         logging.debug("Opening Synapse file %s, population: %s", synapse_file, pop_name)
         return self.SynapseReader.create(
-            synapse_file, pop_name, extracellular_calcium=SimConfig.extracellular_calcium
+            synapse_file, pop_name, extracellular_calcium=SimConfig.extracellular_calcium,
+            compact_parameters=SimConfig.cli_options.compact_synapse_params,
+            index_cache_dir=SimConfig.cli_options.edges_index_cache,
+            node_shared_reads=SimConfig.cli_options.node_shared_reads
         )
 
     def _init_conn_population(self, src_pop_name, pop_id_override):
@@ -413,6 +813,16 @@ class ConnectionManagerBase(object):
         return chain.from_iterable(
             pop.all_connections() for pop in self._populations.values())
 
+    def get_source_gids(self, raw_gids=True):
+        """Retrieves the (sorted, unique) source gids of the connections instantiated locally.
+
+        Args:
+            raw_gids: Whether to return the gids without the source population offset
+        """
+        sgids = [pop.source_gids() for pop in self._populations.values()]
+        sgids = numpy.unique(numpy.concatenate(sgids)) if sgids else numpy.empty(0, "int64")
+        return sgids - self.src_pop_offset if raw_gids else sgids
+
     @property
     def connection_count(self):
         return self._total_connections
@@ -542,16 +952,16 @@ class ConnectionManagerBase(object):
             self._dry_run_stats.synapse_counts[self.CONNECTIONS_TYPE] += syn_count
             return
 
-        conn_options = {'weight_factor': weight_factor}
         pop = self._cur_population
 
-        for sgid, tgid, syns_params, extra_params, offset in \
+        for tgid, sgids, starts, ends, syns_params, extra_fields in \
                 self._iterate_conn_params(self._src_target_filter, None, only_gids, True):
-            if self._load_offsets:
-                conn_options["synapses_offset"] = extra_params["synapse_index"][0]
-            # Create all synapses. No need to lock since the whole file is consumed
-            cur_conn = pop.get_or_create_connection(sgid, tgid, **conn_options)
-            self._add_synapses(cur_conn, syns_params, None, offset)
+            syn_offsets = extra_fields["synapse_index"][starts] if self._load_offsets else None
+            # Connections (and synapses) are created when accessed.
+            # No need to lock since the whole file is consumed
+            pop.add_pending_connections(tgid, sgids, starts, ends, syns_params,
+                                        self._add_synapses, synapses_offsets=syn_offsets,
+                                        weight_factor=weight_factor)
 
     # -
     def connect_group(self, conn_source, conn_destination, synapse_type_restrict=None,
@@ -564,7 +974,6 @@ class ConnectionManagerBase(object):
             synapse_type_restrict(int): Create only given synType synapses
             mod_override (str): ModOverride given for this connection group
         """
-        conn_kwargs = {}
         conn_pop = self._cur_population
         dst_pop_name = self.dst_node_population
         src_pop_name = self.src_node_population
@@ -585,18 +994,14 @@ class ConnectionManagerBase(object):
             self._dry_run_stats.synapse_counts[self.CONNECTIONS_TYPE] += syn_count
             return
 
-        for sgid, tgid, syns_params, extra_params, offset in \
+        for tgid, sgids, starts, ends, syns_params, extra_fields in \
                 self._iterate_conn_params(src_target, dst_target, mod_override=mod_override):
-            if sgid == tgid:
-                logging.warning("Making connection within same Gid: %d", sgid)
-            if self._load_offsets:
-                conn_kwargs["synapses_offset"] = extra_params["synapse_index"][0]
-
-            cur_conn = conn_pop.get_or_create_connection(sgid, tgid, **conn_kwargs)
-            if cur_conn.locked:
-                continue
-            self._add_synapses(cur_conn, syns_params, synapse_type_restrict, offset)
-            cur_conn.locked = True
+            if tgid in sgids:
+                logging.warning("Making connection within same Gid: %d", tgid)
+            syn_offsets = extra_fields["synapse_index"][starts] if self._load_offsets else None
+            conn_pop.add_pending_connections(tgid, sgids, starts, ends, syns_params,
+                                             self._add_synapses, synapse_type_restrict,
+                                             syn_offsets, lock=True)
 
     # -
     def _add_synapses(self, cur_conn: Connection, syns_params, syn_type_restrict=None, base_id=0):
@@ -632,7 +1037,10 @@ class ConnectionManagerBase(object):
     # -
     def _iterate_conn_params(self, src_target, dst_target, gids=None, show_progress=None,
                              mod_override=None):
-        """A generator which loads synapse data and yields tuples(sgid, tgid, synapses)
+        """A generator which loads synapse data and yields, for each tgid, all its
+        connections at once: tuples(tgid, sgids, starts, ends, synapses, extra_fields)
+
+        The connection i has source sgids[i] and synapses synapses[starts[i]:ends[i]]
 
         Args:
             src_target: the target to filter the source cells, or None
@@ -659,22 +1067,30 @@ class ConnectionManagerBase(object):
         tgid_offset = self.target_pop_offset
 
         self._synapse_reader.configure_override(mod_override)
-        self._synapse_reader.preload_data(gids, minimal_mode=SimConfig.cli_options.crash_test)
         extra_fields = {}  # Without extra fields, reuse this object
 
+        def windowed_gids():
+            # Synapse data is preloaded in memory-bounded windows, consumed before the next
+            for window_gids in self._synapse_reader.preload_windows(
+                    gids, minimal_mode=SimConfig.cli_options.crash_test,
+                    prefetch=SimConfig.cli_options.prefetch_edges):
+                yield from window_gids
+
         # NOTE: This routine is quite critical, sitting at the core of synapse processing
         # so it has been carefully optimized with numpy vectorized operations, even if
         # it might lose some readability.
-        # For each tgid we obtain the synapse parameters as a record array. We then split it,
-        # without copying, yielding ranges (views) of it.
+        # For each tgid we obtain the synapse parameters as a record array, and yield it
+        # together with the bounds of its connections ranges, which consumers slice (views).
 
         if show_progress is None:
             show_progress = len(gids) >= AUTO_PROGRESS_THRESHOLD
 
-        gids = ProgressBar.iter(gids, name="Loading") if show_progress else gids
+        gids_iter = windowed_gids()
+        if show_progress:
+            gids_iter = ProgressBar.iter(gids_iter, len(gids), name="Loading")
 
-        for base_tgid in gids:
-            tgid = base_tgid + tgid_offset
+        for base_tgid in gids_iter:
+            tgid = int(base_tgid + tgid_offset)
             syns_params = self._synapse_reader.get_synapse_parameters(base_tgid)
             logging.debug("GID %d Syn count: %d", tgid, len(syns_params))
 
@@ -689,32 +1105,25 @@ class ConnectionManagerBase(object):
             sgids = syns_params[syns_params.dtype.names[0]].astype("int64")  # src gid in field 0
             sgids_ranges = numpy.diff(sgids, prepend=numpy.nan, append=numpy.nan).nonzero()[0]
             conn_count = len(sgids_ranges) - 1
-            conn_debugger = self.ConnDebugger()
+            starts = sgids_ranges[:-1]
+            ends = sgids_ranges[1:]
+            conn_sgids = sgids[starts]
 
             if src_target:
-                # create a set with the gids that belong both to the synapses and the target
-                unique_sgids = sgids[sgids_ranges[:-1]]
-                allowed_sgids = set(unique_sgids[src_target.contains(unique_sgids, raw_gids=True)])
-                n_yielded_conns = len(allowed_sgids)
-                allowed_ranges = [(sgids_ranges[i], sgids_ranges[i+1]) for i in range(conn_count)
-                                  if sgids[sgids_ranges[i]] in allowed_sgids]
-            else:
-                n_yielded_conns = conn_count
-                allowed_ranges = [(sgids_ranges[i], sgids_ranges[i+1]) for i in range(conn_count)]
-
-            for range_start, range_end in allowed_ranges:
-                sgid = int(sgids[range_start])
-                final_sgid = sgid + sgid_offset
-                syn_params = syns_params[range_start:range_end]
-                extra_params = extra_fields and {  # reuse empty {}. Dont modify later!
-                    name: prop[range_start:range_end]
-                    for name, prop in extra_fields.items()
-                }
-                conn_debugger.register(sgid, base_tgid, syn_params)
-                yield final_sgid, tgid, syn_params, extra_params, range_start
+                # Keep the ranges of the sgids belonging to the target, in a single pass
+                allowed = numpy.asarray(src_target.contains(conn_sgids, raw_gids=True), bool)
+                starts, ends, conn_sgids = starts[allowed], ends[allowed], conn_sgids[allowed]
+
+            if GlobalConfig.debug_conn:
+                conn_debugger = self.ConnDebugger()
+                for sgid, range_start, range_end in zip(conn_sgids, starts, ends):
+                    conn_debugger.register(sgid, base_tgid, syns_params[range_start:range_end])
+                del conn_debugger
+
+            yield tgid, conn_sgids + sgid_offset, starts, ends, syns_params, extra_fields
 
             logging.debug(" > Yielded %d out of %d connections. (Filter by src Target: %s)",
-                          n_yielded_conns, conn_count, src_target and src_target.name)
+                          len(starts), conn_count, src_target and src_target.name)
 
         created_conns = self._cur_population.count() - created_conns_0
         self._total_connections += created_conns
@@ -746,69 +1155,61 @@ class ConnectionManagerBase(object):
             logging.debug("Skipping group: no cells!")
             return 0
 
-        total_estimate = 0
         gids_per_metype = self._dry_run_stats.pop_metype_gids[self.dst_node_population]
 
         # NOTE:
         #  - Estimation (and extrapolation) is performed per metype since properties can vary
         #  - Consider only the cells for the current target
+        #  - Process the first 100 cells from increasingly large blocks
+        #    - Takes advantage of data locality
+        #    - Blocks increase as a geometric progression for handling very large sets
+        # Samples of all metypes are read at once and accumulated with vectorized ops
+
+        metypes = []
+        metype_gid_counts = []
+        samples = []
+        samples_weight = []  # How many cells (block_len) each sampled cell stands for
+        samples_metype_i = []
 
         for metype, all_me_gids in gids_per_metype.items():
-            me_gids = set(all_me_gids).intersection(local_gids)
+            me_gids = numpy.intersect1d(all_me_gids, local_gids).astype("uint32")
             me_gids_count = len(me_gids)
             if not me_gids_count:
                 logging.debug("Skipping metype '%s': no cells!", metype)
                 continue
 
-            logging.debug("Metype %s", metype)
-            me_gids = numpy.fromiter(me_gids, dtype="uint32")
-
-            # NOTE:
-            # Process the first 100 cells from increasingly large blocks
-            #  - Takes advantage of data locality
-            #  - Blocks increase as a geometric progression for handling very large sets
-
-            metype_estimate = 0
-            sampled_gids_count = 0
-
             for start, stop, in gen_ranges(me_gids_count, BLOCK_BASE_SIZE, block_increase_rate=1.1):
-                logging.debug(" - Processing range %d:%d", start, stop)
-                block_len = stop - start
                 sample = me_gids[start:(start + SAMPLED_CELLS_PER_BLOCK)]
-                sample_len = len(sample)
-                if not sample_len:
-                    continue
+                samples.append(sample)
+                samples_weight.append(numpy.full(len(sample), (stop - start) / len(sample)))
+                samples_metype_i.append(numpy.full(len(sample), len(metypes)))
+            metypes.append(metype)
+            metype_gid_counts.append(me_gids_count)
 
-                sample_counts = self._synapse_reader.get_conn_counts(sample)
-                total_connections = 0
-                selected_conn_count = 0
-                new_conn_count = 0  # Let's count those which were not "created" before
-                new_syns_count = 0
-
-                for tgid, tgid_conn_counts in sample_counts.items():
-                    total_connections += len(tgid_conn_counts)
-                    if src_target:
-                        conn_sgids = numpy.fromiter(tgid_conn_counts.keys(), dtype="uint32")
-                        sgids_in_target = conn_sgids[src_target.contains(conn_sgids, raw_gids=True)]
-                    else:
-                        sgids_in_target = tgid_conn_counts.keys()
-
-                    selected_conn_count += len(sgids_in_target)
-                    tgid_connected_sgids = self._dry_run_conns[tgid]
-
-                    for sgid in sgids_in_target:
-                        if sgid not in tgid_connected_sgids:
-                            new_conn_count += 1
-                            new_syns_count += tgid_conn_counts[sgid]
-                            tgid_connected_sgids.add(int(sgid))
-
-                logging.debug(" - Connections (new/selected/total): %d / %d / %d ",
-                              new_conn_count, selected_conn_count, total_connections)
-                block_syns_per_cell = new_syns_count / sample_len
-                logging.debug(" - Synapses: %d (Avg: %.2f)", new_syns_count, block_syns_per_cell)
-                sampled_gids_count += sample_len
-                metype_estimate += block_syns_per_cell * block_len
+        if not metypes:
+            return 0
 
+        samples = numpy.concatenate(samples)
+        sgids, syn_counts, conn_counts = self._synapse_reader.get_conn_counts_arrays(samples)
+        conn_sample_i = numpy.repeat(numpy.arange(len(samples)), conn_counts)
+        selected = (numpy.asarray(src_target.contains(sgids, raw_gids=True), bool) if src_target
+                    else numpy.full(len(sgids), True))
+
+        # Let's count those which were not "created" before. Connections are keyed tgid:sgid
+        conn_keys = (samples[conn_sample_i].astype("uint64") << numpy.uint64(32)) | sgids
+        new_conns = selected & ~numpy.isin(conn_keys, self._dry_run_conns)
+        self._dry_run_conns = numpy.union1d(self._dry_run_conns, conn_keys[new_conns])
+        logging.debug(" - Connections (new/selected/total): %d / %d / %d ",
+                      new_conns.sum(), selected.sum(), len(sgids))
+
+        sample_syns = numpy.bincount(conn_sample_i[new_conns], weights=syn_counts[new_conns],
+                                     minlength=len(samples))
+        metype_estimates = numpy.bincount(numpy.concatenate(samples_metype_i),
+                                          weights=sample_syns * numpy.concatenate(samples_weight),
+                                          minlength=len(metypes))
+
+        for metype, me_gids_count, metype_estimate in zip(metypes, metype_gid_counts,
+                                                          metype_estimates):
             # Info on the whole metype (subject to selected target)
             # Due to the fact that the same metype might be target of several projections
             #   we have to sum the averages
@@ -816,7 +1217,7 @@ class ConnectionManagerBase(object):
             self._dry_run_stats.metype_cell_syn_average[metype] += average_syns_per_cell
             log_all(logging.DEBUG, "%s: Average syns/cell: %.1f, Estimated total: %d ",
                     metype, average_syns_per_cell, metype_estimate)
-            total_estimate += metype_estimate
+        total_estimate = metype_estimates.sum()
 
         return int(total_estimate)
 
@@ -824,12 +1225,29 @@ class ConnectionManagerBase(object):
     def get_target_connections(self, src_target_name,
                                      dst_target_name,
                                      selected_gids=None,
-                                     conn_population=None):
+                                     conn_population=None,
+                                     selected_sources=None):
         """Retrives the connections between src-dst cell targets
 
         Args:
              selected_gids: (optional) post gids to select (original, w/o offsetting)
              conn_population: restrict the set of connections to be returned
+             selected_sources: (optional) pre gids to select (original, w/o offsetting)
+        """
+        for population, tgids, src_gids in self._select_target_connections(
+                src_target_name, dst_target_name, selected_gids, conn_population,
+                selected_sources):
+            if src_gids is None:
+                yield from population.get_connections(tgids)
+            else:
+                yield from population.get_connections_from(src_gids, tgids)
+
+    def _select_target_connections(self, src_target_name, dst_target_name, selected_gids=None,
+                                   conn_population=None, selected_sources=None):
+        """Selects the connections between src-dst cell targets, see get_target_connections
+
+        Returns: A generator of tuples (population, tgids, src_gids), src_gids being None
+            when sources are not restricted
         """
         src_target_spec = TargetSpec(src_target_name)
         dst_target_spec = TargetSpec(dst_target_name)
@@ -845,8 +1263,12 @@ class ConnectionManagerBase(object):
         conn_populations: List[ConnectionSet] = (conn_population,) if conn_population is not None \
             else self._populations.values()
 
-        # temporary set for faster lookup
-        src_gids = src_target and set(src_target.get_gids())
+        # When sources are restricted, matching connections are found with the sgid reverse index
+        src_gids = src_target and numpy.unique(src_target.get_gids())
+        if selected_sources is not None:
+            selected_sources = numpy.unique(selected_sources).astype("int64") + self.src_pop_offset
+            src_gids = selected_sources if src_gids is None \
+                else numpy.intersect1d(src_gids, selected_sources)
 
         for population in conn_populations:
             logging.debug("Connections from population %s", population)
@@ -854,9 +1276,7 @@ class ConnectionManagerBase(object):
             tgids = numpy.intersect1d(tgids, dst_target.get_gids())
             if selected_gids:
                 tgids = numpy.intersect1d(tgids, selected_gids + tgid_offset)
-            for conn in population.get_connections(tgids):
-                if src_target is None or conn.sgid in src_gids:
-                    yield conn
+            yield population, tgids, src_gids
 
     # -
     def configure_group(self, conn_config, gidvec=None):
@@ -885,15 +1305,22 @@ class ConnectionManagerBase(object):
             assert hasattr(Nd.h, override_helper), \
                 "ModOverride helper doesn't define hoc template: " + override_helper
 
+        mod_override = "ModOverride" in conn_config and (
+            conn_config.get('hoc') or compat.PyMap(conn_config).hoc_map)
+        synapse_configure = conn_config.get("SynapseConfigure")
+
+        def setup_conn(conn):
+            if mod_override:
+                conn.override_mod(mod_override)
+            if synapse_configure is not None:
+                conn.add_synapse_configuration(synapse_configure)
+
+        setup_f = setup_conn if mod_override or synapse_configure is not None else None
+        # Connections yet to be created get the configuration applied on creation
         configured_conns = 0
-        for conn in self.get_target_connections(src_target, dst_target, gidvec):
-            for key, val in syn_params.items():
-                setattr(conn, key, val)
-            if "ModOverride" in conn_config:
-                conn.override_mod(conn_config.get('hoc') or compat.PyMap(conn_config).hoc_map)
-            if "SynapseConfigure" in conn_config:
-                conn.add_synapse_configuration(conn_config["SynapseConfigure"])
-            configured_conns += 1
+        for population, tgids, src_gids in self._select_target_connections(
+                src_target, dst_target, gidvec):
+            configured_conns += population.configure(tgids, src_gids, syn_params, setup_f)
         return configured_conns
 
     # -
@@ -943,6 +1370,7 @@ class ConnectionManagerBase(object):
     def restart_events(self):
         """After restore, restart the artificial events (replay and spont minis)
         """
+        self._replay_sources.restart_events()
         for conn in self.all_connections():
             conn.restart_events()
 
@@ -1072,8 +1500,8 @@ class ConnectionManagerBase(object):
 
     def _unlock_all_connections(self):
         """Unlock all, mainly when we load a new connectivity source"""
-        for conn in self.all_connections():
-            conn.locked = False
+        for pop in self._populations.values():
+            pop.unlock_all()
 
     def finalize(self, base_seed=0, sim_corenrn=False, *, _conn_type="synapses", **conn_params):
         """Instantiates the netcons and Synapses for all connections.
@@ -1225,6 +1653,8 @@ class SynapseRuleManager(ConnectionManagerBase):
     """
 
     CONNECTIONS_TYPE = ConnectionTypes.Synaptic
+    _NO_SPIKES = numpy.empty(0)
+    """Spikes of connections replayed by streaming sources, which are fed in time windows"""
 
     def __init__(self, circuit_conf, target_manager, cell_manager, src_cell_manager=None, **kw):
         """Initializes a Connection/Edge manager for standard METype synapses
@@ -1276,7 +1706,8 @@ class SynapseRuleManager(ConnectionManagerBase):
 
     # -
     @timeit(name="Replay inject")
-    def replay(self, spike_manager, src_target_name, dst_target_name, start_delay=.0):
+    def replay(self, spike_manager, src_target_name, dst_target_name, start_delay=.0,
+               stream=None):
         """Create special netcons to trigger timed spikes on those synapses.
 
         Args:
@@ -1284,6 +1715,8 @@ class SynapseRuleManager(ConnectionManagerBase):
             src_target_name: Source population:target of the replay connections
             dst_target_name: Target whose gids should be replayed
             start_delay: Dont deliver events before t=start_delay
+            stream: A streaming ReplaySources pool. If given, connections are attached
+                to its sources, whose spikes are then fed in time windows (play_window)
         """
         log_verbose("Applying replay map with %d src cells...", len(spike_manager))
         replayed_count = 0
@@ -1294,12 +1727,16 @@ class SynapseRuleManager(ConnectionManagerBase):
             log_verbose("Restore: Delivering events only after t=%.4f", start_delay)
 
         src_pop_offset = self.src_pop_offset
+        # Visit only the connections from cells having spikes
+        spiking_gids = spike_manager.get_map().keys()
 
-        for conn in self.get_target_connections(src_target_name, dst_target_name):
-            raw_sgid = conn.sgid - src_pop_offset
-            if raw_sgid not in spike_manager:
-                continue
-            conn.replay(spike_manager[raw_sgid], start_delay)
+        for conn in self.get_target_connections(src_target_name, dst_target_name,
+                                                selected_sources=spiking_gids):
+            if stream is not None:
+                conn.replay(self._NO_SPIKES, start_delay, sources=stream)
+            else:
+                conn.replay(spike_manager[conn.sgid - src_pop_offset], start_delay,
+                            sources=self._replay_sources)
             replayed_count += 1
 
         total_replays = MPI.allreduce(replayed_count, MPI.SUM)
@@ -117,3 +117,89 @@ class SHMUtil:
         factor = os.environ.get("NEURODAMUS_SHM_FACTOR")
         return 0.4 if not factor or not 0.0 <= float(factor) <= 1.0 \
                    else float(factor)
+
+
+class NodeSharedReader:
+    """Reads data once per node, sharing it with the other ranks via MPI-3 shared memory.
+
+    The first rank of each node (the leader) reads the union of the selections requested
+    by the node ranks (overlapping ranges only once) into a shared window. The other ranks
+    get their part, as a view when contiguous in the window.
+    All ranks of a node must therefore call read() the same number of times, in order.
+    """
+
+    def __init__(self, comm=None):
+        from mpi4py import MPI
+        self._MPI = MPI
+        comm = comm or MPI.COMM_WORLD
+        self._node_comm = comm.Split_type(MPI.COMM_TYPE_SHARED)
+        self.node_rank = self._node_comm.Get_rank()
+        self.is_leader = self.node_rank == 0
+        self._windows = []
+
+    @staticmethod
+    def _merge_ranges(ranges):
+        """Merges overlapping and adjacent [start, end) ranges
+
+        Returns: A tuple of the sorted merged ranges and their offsets in the merged data
+        """
+        ranges = ranges[np.argsort(ranges[:, 0], kind="stable")]
+        ends = np.maximum.accumulate(ranges[:, 1])
+        is_first = np.ones(len(ranges), dtype=bool)
+        is_first[1:] = ranges[1:, 0] > ends[:-1]
+        is_last = np.append(is_first[1:], True)
+        merged = np.stack((ranges[is_first, 0], ends[is_last]), axis=1)
+        lengths = merged[:, 1] - merged[:, 0]
+        return merged, np.cumsum(lengths) - lengths
+
+    def read(self, read_f, selection):
+        """Reads the data of a libsonata Selection with the given function (on the leader)
+
+        Returns: A read-only array view (of shared memory) with the data for the selection,
+            or a copy when the selection ranges are not contiguous in the shared data
+        """
+        import libsonata
+        node_comm = self._node_comm
+        ranges = np.array(selection.ranges, dtype="int64").reshape(-1, 2)
+        ranges = ranges[ranges[:, 1] > ranges[:, 0]]
+        all_ranges = node_comm.gather(ranges, root=0)
+
+        data_info = None
+        if self.is_leader:
+            merged, offsets = self._merge_ranges(np.concatenate(all_ranges))
+            data = read_f(libsonata.Selection(merged.tolist()))
+            data_info = (merged, offsets, data.dtype.str, data.shape[1:])
+        merged, offsets, dtype, item_shape = node_comm.bcast(data_info, root=0)
+
+        dtype = np.dtype(dtype)
+        total_len = int((merged[:, 1] - merged[:, 0]).sum())
+        if total_len == 0:
+            return np.empty((0,) + tuple(item_shape), dtype)
+        itemsize = dtype.itemsize * int(np.prod(item_shape, dtype="int64"))
+        window = self._MPI.Win.Allocate_shared(
+            total_len * itemsize if self.is_leader else 0, max(itemsize, 1), comm=node_comm)
+        self._windows.append(window)
+        buffer, _ = window.Shared_query(0)
+        shared_data = np.ndarray((total_len,) + tuple(item_shape), dtype, buffer)
+        if self.is_leader:
+            shared_data[:] = data
+        node_comm.Barrier()
+
+        if not len(ranges):
+            return np.empty((0,) + tuple(item_shape), dtype)
+        # Locate the ranges of this rank within the merged ones
+        merged_i = np.searchsorted(merged[:, 0], ranges[:, 0], side="right") - 1
+        positions = offsets[merged_i] + ranges[:, 0] - merged[merged_i, 0]
+        lengths = ranges[:, 1] - ranges[:, 0]
+        if (positions[1:] == positions[:-1] + lengths[:-1]).all():
+            view = shared_data[positions[0]:positions[0] + lengths.sum()]
+            view.flags.writeable = False
+            return view
+        range_offsets = np.cumsum(lengths) - lengths
+        return shared_data[np.arange(lengths.sum()) + np.repeat(positions - range_offsets, lengths)]
+
+    def free(self):
+        """Frees the shared windows. Collective, and no views must be in use anymore"""
+        for window in self._windows:
+            window.Free()
+        self._windows.clear()
@@ -66,7 +66,7 @@ endtemplate {cls_name}"""
         if morpho_path.endswith(('h5', 'H5')):
             if(export_commands):
                 from neurodamus.morphio_wrapper import MorphIOWrapper
-                self._commands = MorphIOWrapper(morpho_path).morph_as_hoc()
+                self._commands = MorphIOWrapper.load(morpho_path).morph_as_hoc()
             h.morphio_read(self.h, morpho_path)
             self._soma = self.h.soma[0]
 
@@ -44,6 +44,11 @@ class GlobalConfig:
     if debug_conn:
         debug_conn = [int(gid) for gid in os.getenv('ND_DEBUG_CONN', '').split(',')]
         verbosity = 3
+    # Max gap (in edges) between edge ranges merged in a single read. Default: FS block, capped
+    edges_read_gap = os.getenv('ND_EDGES_READ_GAP')
+    edges_read_gap = int(edges_read_gap) if edges_read_gap else None
+    # Max number of parsed morphologies kept in memory, for cells sharing them. 0 disables
+    morphology_cache_size = int(os.getenv('ND_MORPHOLOGY_CACHE_SIZE', 32))
 
     @classmethod
     def set_mpi(cls):
@@ -79,6 +84,14 @@ class CliOptions(ConfigT):
     keep_axon = False
     coreneuron_direct_mode = False
     crash_test = False
+    prefetch_edges = False
+    prefetch_morphologies = False
+    compact_synapse_params = False
+    edges_index_cache = None
+    spikes_cache = None
+    morphology_store = None
+    node_shared_reads = False
+    streaming_replay = False
 
     # Restricted Functionality support, mostly for testing
 
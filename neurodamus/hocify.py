@@ -4,10 +4,12 @@ import os
 from time import strftime
 
 from .core import Cell
+from .io.morphology_store import MorphologyStore
 from .utils.logging import setup_logging, log_stage, log_verbose
 from .utils.progressbar import ProgressBar
 
 FASTHOC_DIRNAME = "_fasthoc"
+STORE_FILENAME = "morphologies.ndmorph"
 
 
 def process_file(file_tuple):
@@ -27,6 +29,16 @@ def process_file(file_tuple):
     return src_file
 
 
+def process_store_file(src_file):
+    try:
+        from .morphio_wrapper import MorphIOWrapper
+        morph_name = os.path.splitext(os.path.basename(src_file))[0]
+        return morph_name, MorphIOWrapper(src_file).store_arrays()
+    except Exception as e:
+        e.args = ("Processing " + src_file, *e.args)
+        return e
+
+
 class Hocify(object):
     fasthoclogfile = "hocify-{}.log".format(strftime("%Y-%m-%d_%Hh%M"))
 
@@ -73,3 +85,31 @@ class Hocify(object):
                 return 1
             log_verbose("Done for: " + file)
         logging.info("Done")
+
+    def create_store(self, morpho_folder='h5v1'):
+        """Creates a MorphologyStore with the h5 morphologies of a folder.
+        Runs can then use it with --morphology-store, skipping morphology parsing
+        """
+        log_stage("Creating morphology store")
+        morphdir = os.path.join(self._morpho_path, morpho_folder)
+        if not os.path.isdir(morphdir):
+            logging.critical("Morphology directory does not exist:" + morphdir)
+            return 1
+
+        store_file = os.path.join(Hocify.fasthocdir, STORE_FILENAME)
+        logging.info("Storing morphologies from %s into %s", morphdir, store_file)
+        src_files = sorted(os.path.join(morphdir, f.name) for f in os.scandir(morphdir)
+                           if f.is_file() and f.name.endswith('.h5'))
+
+        def stored_morphologies(processed):
+            for result in ProgressBar.iter(processed, len(src_files)):
+                if isinstance(result, Exception):
+                    raise result
+                log_verbose("Stored: " + result[0])
+                yield result
+
+        with multiprocessing.Pool() as pool:
+            n_morphs = MorphologyStore.create(
+                store_file, stored_morphologies(pool.imap(process_store_file, src_files)),
+                morphdir)
+        logging.info("Done. Stored %d morphologies", n_morphs)
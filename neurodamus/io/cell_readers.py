@@ -160,7 +160,7 @@ def load_sonata(circuit_conf, all_gids, stride=1, stride_offset=0, *,
         # For Sonata and new emodel hoc template, we need additional attributes for building metype
         # TODO: validate it's really the emodel_templates var we should pass here, or etype
         add_params_list = None if not has_extra_data \
-            else _getNeededAttributes(node_pop, circuit_conf.METypePath, emodel_templates, gidvec-1)
+            else _getNeededAttributes(node_pop, circuit_conf.METypePath, emodel_templates, node_sel)
 
         meinfos.load_infoNP(gidvec, morpho_names, emodel_templates, mtypes, etypes,
                             threshold_currents, holding_currents,
@@ -205,24 +205,28 @@ def load_sonata(circuit_conf, all_gids, stride=1, stride_offset=0, *,
     return gidvec, meinfos, fullsize
 
 
-def _getNeededAttributes(node_reader, etype_path, emodels, gidvec):
+def _getNeededAttributes(node_reader, etype_path, emodels, node_sel):
     """
     Read additional attributes required by emodel templates global var <emodel>__NeededAttributes
+    Templates are loaded once per emodel, and each attribute read once for all the cells
     Args:
         node_reader: libsonata node population
         etype_path: Location of emodel hoc templates
         emodels: Array of emodel names
-        gidvec: Array of 0-based cell gids
+        node_sel: libsonata selection of the cells (matching emodels)
     """
-    add_params_list = []
-    for gid, emodel in zip(gidvec, emodels):
+    emodel_attr_names = {}
+    for emodel in dict.fromkeys(emodels):  # unique, keeping order
         Nd.h.load_file(ospath.join(etype_path, emodel) + ".hoc")  # hoc doesn't throw
         attr_names = getattr(Nd, emodel + "_NeededAttributes", None)  # format "attr1;attr2;attr3"
-        vals = []
-        if attr_names is not None:
-            vals = [node_reader.get_dynamics_attribute(name, gid) for name in attr_names.split(";")]
-        add_params_list.append(vals)
-    return add_params_list
+        emodel_attr_names[emodel] = attr_names.split(";") if attr_names is not None else []
+
+    needed_attrs = dict.fromkeys(name for attr_names in emodel_attr_names.values()
+                                 for name in attr_names)
+    attr_values = {name: np.asarray(node_reader.get_dynamics_attribute(name, node_sel)).tolist()
+                   for name in needed_attrs}
+    return [[attr_values[name][i] for name in emodel_attr_names[emodel]]
+            for i, emodel in enumerate(emodels)]
 
 
 def _get_rotations(node_reader, selection):
@@ -0,0 +1,150 @@
+"""
+A compact binary store of preprocessed morphologies, to be memory-mapped by simulations
+"""
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+class MorphologyStore:
+    """A single file holding many morphologies ready to be instantiated, as created by hocify.
+
+    The file starts with a magic string, the length of a json header (uint64) and the
+    header itself, followed by the (aligned) arrays. The arrays of all the morphologies
+    are concatenated, per group: sections, points and soma points. Each group has an array
+    with the offsets of every morphology, e.g. 'points_offsets'.
+    Arrays are memory-mapped, so that morphologies are views of the file data.
+    The header also records the folder of the source morphologies, so that only morphology
+    files from that folder are taken from the store (see get_file).
+    """
+
+    MAGIC = b"NDMORPH1"
+    ALIGNMENT = 64
+    GROUPS = {
+        "sections": (("section_types", "<i4"), ("section_parents", "<i4"),
+                     ("section_offsets", "<i8")),
+        "points": (("x", "<f8"), ("y", "<f8"), ("z", "<f8"), ("diameters", "<f8")),
+        "soma": (("soma_x", "<f8"), ("soma_y", "<f8"), ("soma_z", "<f8"),
+                 ("soma_diameters", "<f8")),
+    }
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            if f.read(len(self.MAGIC)) != self.MAGIC:
+                raise ValueError("Not a morphology store: " + filename)
+            header_len = int(np.frombuffer(f.read(8), "<u8")[0])
+            header = json.loads(f.read(header_len))
+        data = np.memmap(filename, "u1", "r")
+        data_start = self._align(len(self.MAGIC) + 8 + header_len)
+        self._arrays = {
+            name: data[data_start + offset:data_start + offset + count * np.dtype(dtype).itemsize]
+            .view(dtype)
+            for name, (dtype, offset, count) in header["arrays"].items()
+        }
+        self._names = {name: i for i, name in enumerate(header["names"])}
+        self.source_dir = header["source_dir"]
+        self._dir_matches = {}  # Whether morphology folders are the source folder
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def get(self, name):
+        """Retrieves the arrays of a morphology (views), or None if not in the store"""
+        morph_i = self._names.get(name)
+        if morph_i is None:
+            return None
+        morph_arrays = {}
+        for group, arrays in self.GROUPS.items():
+            start, end = self._arrays[group + "_offsets"][morph_i:morph_i + 2]
+            for array_name, _ in arrays:
+                morph_arrays[array_name] = self._arrays[array_name][start:end]
+        return morph_arrays
+
+    def get_file(self, morph_file):
+        """Retrieves the arrays of a morphology file (views), or None if the file is not
+        from the folder of the stored morphologies, or not in the store
+        """
+        morph_dir = os.path.dirname(morph_file)
+        dir_matches = self._dir_matches.get(morph_dir)
+        if dir_matches is None:
+            dir_matches = os.path.realpath(morph_dir) == self.source_dir
+            self._dir_matches[morph_dir] = dir_matches
+        if not dir_matches:
+            return None
+        return self.get(os.path.splitext(os.path.basename(morph_file))[0])
+
+    @classmethod
+    def _align(cls, offset):
+        return -(-offset // cls.ALIGNMENT) * cls.ALIGNMENT
+
+    @classmethod
+    def create(cls, filename, morphologies, source_dir):
+        """Writes a store with the given morphologies.
+
+        Arrays are streamed to temporary files, so that memory usage doesn't grow with the
+        number of morphologies. The store file is replaced atomically at the end.
+
+        Args:
+            filename: The store file to create
+            morphologies: An iterable of (name, arrays) pairs, the arrays being a dict as
+                in MorphIOWrapper.store_arrays()
+            source_dir: The folder of the morphology files
+        """
+        names = []
+        group_offsets = {group: [0] for group in cls.GROUPS}
+        all_arrays = [array for arrays in cls.GROUPS.values() for array in arrays]
+        out_dir = os.path.dirname(os.path.abspath(filename))
+
+        with tempfile.TemporaryDirectory(dir=out_dir) as tmp_dir:
+            array_files = {name: open(os.path.join(tmp_dir, name), "wb")
+                           for name, _ in all_arrays}
+            try:
+                for name, morph_arrays in morphologies:
+                    names.append(name)
+                    for group, arrays in cls.GROUPS.items():
+                        count = len(morph_arrays[arrays[0][0]])
+                        group_offsets[group].append(group_offsets[group][-1] + count)
+                        for array_name, dtype in arrays:
+                            data = np.ascontiguousarray(morph_arrays[array_name], dtype)
+                            assert len(data) == count, "Inconsistent lengths in " + name
+                            array_files[array_name].write(data.tobytes())
+            finally:
+                for f in array_files.values():
+                    f.close()
+
+            header_arrays = {}
+            offsets_arrays = {group + "_offsets": np.array(offsets, "<i8")
+                              for group, offsets in group_offsets.items()}
+            offset = 0
+            for array_name, offsets in offsets_arrays.items():
+                header_arrays[array_name] = ("<i8", offset, len(offsets))
+                offset = cls._align(offset + offsets.nbytes)
+            for array_name, dtype in all_arrays:
+                size = os.path.getsize(array_files[array_name].name)
+                header_arrays[array_name] = (dtype, offset, size // np.dtype(dtype).itemsize)
+                offset = cls._align(offset + size)
+            header = json.dumps({"names": names, "arrays": header_arrays,
+                                 "source_dir": os.path.realpath(source_dir)}).encode()
+
+            tmp_file = os.path.join(tmp_dir, "store")
+            with open(tmp_file, "wb") as out:
+                out.write(cls.MAGIC)
+                out.write(np.array(len(header), "<u8").tobytes())
+                out.write(header)
+                data_start = cls._align(out.tell())
+                for array_name, (dtype, offset, _) in header_arrays.items():
+                    out.write(b"\0" * (data_start + offset - out.tell()))
+                    if array_name in offsets_arrays:
+                        out.write(offsets_arrays[array_name].tobytes())
+                    else:
+                        with open(array_files[array_name].name, "rb") as f:
+                            shutil.copyfileobj(f, out)
+            os.replace(tmp_file, filename)
+        return len(names)
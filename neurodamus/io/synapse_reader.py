@@ -1,14 +1,21 @@
 """
 Module implementing interfaces to the several synapse readers (eg.: synapsetool, Hdf5Reader)
 """
+import hashlib
 import logging
+import os
+import tempfile
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 import libsonata
 import numpy as np
 
 from ..core import NeurodamusCore as Nd, MPI
 from ..core import ProgressBarRank0 as ProgressBar
+from ..core._shmutils import NodeSharedReader
+from ..core.configuration import GlobalConfig
 from ..utils.logging import log_verbose
 from ..utils.pyutils import gen_ranges
 
@@ -19,13 +26,66 @@ def _constrained_hill(K_half, y):
     return (K_half_fourth + 16) / 16 * y_fourth / (K_half_fourth + y_fourth)
 
 
+def _merge_ranges(ranges, max_gap):
+    """Merges the (possibly unsorted) ranges closer than max_gap.
+
+    Returns: a tuple (order, group_i, merged): the order sorting the ranges, the merged
+    range of each sorted range and the merged ranges themselves.
+    """
+    order = np.argsort(ranges[:, 0], kind="stable")
+    sorted_ranges = ranges[order]
+    gaps = sorted_ranges[1:, 0] - sorted_ranges[:-1, 1]
+    group_i = np.concatenate(([0], np.cumsum(gaps > max_gap)))
+    group_starts = np.flatnonzero(np.diff(group_i, prepend=-1))
+    merged = np.empty((len(group_starts), 2), dtype="int64")
+    merged[:, 0] = sorted_ranges[group_starts, 0]
+    merged[:, 1] = np.maximum.reduceat(sorted_ranges[:, 1], group_starts)
+    return order, group_i, merged
+
+
+def _merged_read_size(ranges, max_gap):
+    """The number of elements read by _merged_read for the given ranges"""
+    ranges = np.asarray(ranges, dtype="int64").reshape(-1, 2)
+    if len(ranges) <= 1:
+        return int((ranges[:, 1] - ranges[:, 0]).sum())
+    merged = _merge_ranges(ranges, max_gap)[2]
+    return int((merged[:, 1] - merged[:, 0]).sum())
+
+
+def _merged_read(read_f, selection, max_gap):
+    """Reads a selection, merging its ranges closer than max_gap into larger reads.
+
+    Requested data are then picked from the (larger) read data, respecting selection order.
+    Trades some extra data for much fewer I/O operations, worth in parallel filesystems.
+    """
+    ranges = np.array(selection.ranges, dtype="int64").reshape(-1, 2)
+    if len(ranges) <= 1:
+        return read_f(selection)
+    order, group_i, merged = _merge_ranges(ranges, max_gap)
+    if len(merged) == len(ranges):
+        return read_f(selection)  # nothing to merge
+    sorted_ranges = ranges[order]
+    data = read_f(libsonata.Selection(merged.tolist()))
+
+    # Position of each range in the merged data, then expanded to each edge
+    merged_offsets = np.cumsum(merged[:, 1] - merged[:, 0]) - (merged[:, 1] - merged[:, 0])
+    range_pos = np.empty(len(ranges), dtype="int64")
+    range_pos[order] = merged_offsets[group_i] + sorted_ranges[:, 0] - merged[group_i, 0]
+    lengths = ranges[:, 1] - ranges[:, 0]
+    edge_pos = (np.repeat(range_pos - (np.cumsum(lengths) - lengths), lengths)
+                + np.arange(lengths.sum()))
+    return data[edge_pos]
+
+
 class _SynParametersMeta(type):
     def __init__(cls, name, bases, attrs):
         type.__init__(cls, name, bases, attrs)
         # Init public properties of the class
         assert hasattr(cls, "_synapse_fields"), "Please define _synapse_fields class attr"
+        # Fields are double by default. Compact types can be set per-field in _field_dtypes
+        field_dtypes = getattr(cls, "_field_dtypes", {})
         cls.dtype = np.dtype({"names": cls._synapse_fields,
-                              "formats": ["f8"] * len(cls._synapse_fields)})
+                              "formats": [field_dtypes.get(f, "f8") for f in cls._synapse_fields]})
         cls.empty = np.recarray(0, cls.dtype)
         if not hasattr(cls, "_optional"):
             cls._optional = ()
@@ -72,6 +132,15 @@ class SynapseParameters(metaclass=_SynParametersMeta):
         return npa
 
 
+class CompactSynapseParameters(SynapseParameters):
+    """Synapse parameters holding ids and types as integers, and the synapse kinetics
+    in single precision
+    """
+    _field_dtypes = dict({"sgid": "i8", "isec": "i4", "ipt": "i4", "synType": "i2"},
+                         **dict.fromkeys(("weight", "U", "D", "F", "DTC", "u_hill_coefficient",
+                                          "conductance_ratio"), "f4"))
+
+
 class SynapseReader:
     """ Synapse Readers base class.
         Factory create() will instantiate a SONATA reader.
@@ -80,16 +149,29 @@ class SynapseReader:
     def __init__(self, src, population=None, *_, **kw):
         self._ca_concentration = kw.get("extracellular_calcium")
         self._syn_params = {}  # Parameters cache by post-gid (previously loadedMap)
+        if kw.get("compact_parameters") and self.Parameters is SynapseParameters:
+            self.Parameters = CompactSynapseParameters
+        self._index_cache_dir = kw.get("index_cache_dir")
+        self._node_shared_reads = kw.get("node_shared_reads", False)
+        self._node_reader = None  # Reads edge data once per node (see NodeSharedReader)
+        self._node_reader_active = False
+        self._threaded_reads = True  # Whether reads (possibly MPI) may run in another thread
         self._open_file(src, population, kw.get("verbose", False))
         # NOTE u_hill_coefficient and conductance_scale_factor are optional, BUT
         # while u_hill_coefficient can always be readif avail, conductance reader may not.
         self._uhill_property_avail = self.has_property("u_hill_coefficient")
         self._extra_fields = tuple()
         self._extra_scale_vars = []
+        self._params_cls = self.Parameters  # Parameters extended with the extra fields
 
     def preload_data(self, ids):
         pass
 
+    def preload_windows(self, ids, minimal_mode=False, prefetch=False):
+        """Preloads data in windows, yielding the ids of each. By default a single window"""
+        self.preload_data(ids)
+        yield ids
+
     def configure_override(self, mod_override):
         if not mod_override:
             return
@@ -105,6 +187,10 @@ class SynapseReader:
             )
             self._extra_fields = tuple(attr_names.split(";"))
 
+            class CustomSynapseParameters(self.Parameters):
+                _synapse_fields = self.Parameters._synapse_fields + self._extra_fields
+            self._params_cls = CustomSynapseParameters
+
         # Read attribute names with format "attr1;attr2;attr3"
         attr_names = getattr(Nd, override_helper + "_UHillScaleVariables", None)
         if attr_names:
@@ -116,14 +202,16 @@ class SynapseReader:
         syn_params = self._syn_params.get(gid)
         if syn_params is None:
             syn_params = self._load_synapse_parameters(gid)
-
-            # Modify parameters
-            self._patch_delay_fp_inaccuracies(syn_params)
-            if self._uhill_property_avail:
-                self._scale_U_param(syn_params, self._ca_concentration, self._extra_scale_vars)
+            self._correct_params(syn_params)
             self._syn_params[gid] = syn_params  # cache parameters
         return syn_params
 
+    def _correct_params(self, syn_params):
+        """Modify parameters (in-place). Being vectorized, may be applied to several gids"""
+        self._patch_delay_fp_inaccuracies(syn_params)
+        if self._uhill_property_avail:
+            self._scale_U_param(syn_params, self._ca_concentration, self._extra_scale_vars)
+
     @abstractmethod
     def _load_synapse_parameters(self, gid):
         """The low level reading of synapses subclasses must override"""
@@ -192,6 +280,132 @@ class SynapseReader:
             raise FormatNotSupported(f"File: {syn_src}. Please provide SONATA edges")
 
 
+class _EdgesIndex:
+    """A CSR-like index grouping edges by their lookup gid.
+
+    Edges are sorted (stable) once by gid, and `offsets` delimit the edges of each
+    of the unique `gids`, so that per-gid data are plain slices of the sorted columns.
+    """
+    __slots__ = ("order", "gids", "offsets")
+
+    def __init__(self, lookup_gids):
+        self.order = np.argsort(lookup_gids, kind="stable")
+        sorted_gids = lookup_gids[self.order]
+        self.gids, starts = np.unique(sorted_gids, return_index=True)
+        self.offsets = np.append(starts, len(sorted_gids))
+
+    def sort(self, data):
+        """Sorts a column of edge data by gid"""
+        return data[self.order]
+
+    def split(self, sorted_data):
+        """Splits a column of sorted edge data, returning a view for each gid"""
+        offsets = self.offsets
+        return (sorted_data[offsets[i]:offsets[i + 1]] for i in range(len(self.gids)))
+
+
+class EdgeIndexCache:
+    """An on-disk copy of the index of a SONATA edge population (node -> edge ranges).
+
+    Cache files are keyed by the edge file path, size and mtime, so they are invalidated
+    whenever the edge file changes. Once created they are memory-mapped, which avoids
+    repeated index queries and the reading of the node ids of the edges.
+    """
+
+    INDEX_DATASETS = ("node_id_to_ranges", "range_to_edge_id")
+
+    def __init__(self, node_to_ranges, range_to_edges):
+        self._node_to_ranges = node_to_ranges
+        self._range_to_edges = range_to_edges
+
+    @classmethod
+    def open(cls, cache_dir, edge_file, population, lookup_by_target=True):
+        """Memory-maps the index from the cache dir. Rank 0 creates the cache files if needed,
+        while the other ranks wait (collective). Returns None if the edge file has no index,
+        or the cache could not be created
+        """
+        index_name = "target_to_source" if lookup_by_target else "source_to_target"
+        stat = os.stat(edge_file)
+        key = hashlib.sha1("{}:{}:{}:{}:{}".format(
+            os.path.abspath(edge_file), stat.st_size, stat.st_mtime_ns, population, index_name
+        ).encode()).hexdigest()
+        cache_files = [os.path.join(cache_dir, "{}.{}.npy".format(key, name))
+                       for name in cls.INDEX_DATASETS]
+
+        status = 0  # 1: cache ready, 0: no index, -1: cache could not be created
+        if MPI.rank == 0:
+            try:
+                status = int(cls._create_cache(cache_files, edge_file, population, index_name))
+            except OSError as e:  # e.g. PermissionError, or failing to read the index
+                logging.warning("Could not create the edges index cache: %s", e)
+                status = -1
+        # Rank 0 decides. The reduction also ensures the files are ready for all ranks
+        status = MPI.allreduce(status, MPI.SUM)
+        if status <= 0:
+            if status == 0:
+                logging.warning("Edge population %s has no index. Cache disabled", population)
+            else:
+                logging.warning("Edges index cache of population %s disabled", population)
+            return None
+        log_verbose("Using edges index cache %s.*", key)
+        return cls(*(np.load(f, mmap_mode="r") for f in cache_files))
+
+    @classmethod
+    def _create_cache(cls, cache_files, edge_file, population, index_name):
+        """Writes the index cache files, unless present. Returns False if there is no index"""
+        if all(os.path.isfile(f) for f in cache_files):
+            return True
+        import h5py
+        with h5py.File(edge_file, "r") as f:
+            index_path = "edges/{}/indices/{}".format(population, index_name)
+            if index_path not in f:
+                return False
+            cache_dir = os.path.dirname(cache_files[0])
+            os.makedirs(cache_dir, exist_ok=True)
+            for name, cache_file in zip(cls.INDEX_DATASETS, cache_files):
+                # Unique temporary names: concurrent runs might be creating the same cache
+                with tempfile.NamedTemporaryFile(dir=cache_dir, suffix=".tmp",
+                                                 delete=False) as tmp_f:
+                    np.save(tmp_f, f[index_path][name][:])
+                os.replace(tmp_f.name, cache_file)  # atomic, concurrent runs might be reading
+        log_verbose("Created edges index cache %s", os.path.dirname(cache_files[0]))
+        return True
+
+    def _node_edge_ranges(self, node_ids):
+        """Retrieves the edge ranges of the given nodes, and how many belong to each node"""
+        node_ranges = self._node_to_ranges[node_ids]
+        ranges_count = (node_ranges[:, 1] - node_ranges[:, 0]).astype("int64")
+        # Expand each node [start, end) interval into the indices of its ranges
+        ranges_offsets = np.cumsum(ranges_count) - ranges_count
+        range_idx = (np.repeat(node_ranges[:, 0].astype("int64") - ranges_offsets, ranges_count)
+                     + np.arange(ranges_count.sum()))
+        return self._range_to_edges[range_idx], ranges_count
+
+    def node_edge_ranges(self, node_ids):
+        """Retrieves the (unsorted) edge ranges of the given nodes"""
+        return self._node_edge_ranges(np.asarray(node_ids, dtype="int64"))[0]
+
+    def edge_ranges(self, node_ids):
+        """Retrieves the (sorted) edge ranges of the given nodes, together with the node id
+        of each edge (in the same order)
+        """
+        node_ids = np.asarray(node_ids, dtype="int64")
+        edge_ranges, ranges_count = self._node_edge_ranges(node_ids)
+        order = np.argsort(edge_ranges[:, 0], kind="stable")
+        edge_ranges = edge_ranges[order]
+        range_nodes = np.repeat(node_ids, ranges_count)[order]
+        range_lengths = (edge_ranges[:, 1] - edge_ranges[:, 0]).astype("int64")
+        lookup_nodes = np.repeat(range_nodes, range_lengths)
+        return edge_ranges, lookup_nodes
+
+    def edge_counts(self, node_ids):
+        """Counts the edges of each of the given nodes"""
+        edge_ranges, ranges_count = self._node_edge_ranges(node_ids)
+        range_node_i = np.repeat(np.arange(len(node_ids)), ranges_count)
+        range_lengths = edge_ranges[:, 1] - edge_ranges[:, 0]
+        return np.bincount(range_node_i, range_lengths, len(node_ids)).astype("int64")
+
+
 class SonataReader(SynapseReader):
     """Reader for SONATA edge files.
 
@@ -200,15 +414,23 @@ class SonataReader(SynapseReader):
     to the 1-based convention in Neurodamus.
 
     Will read each attribute for multiple GIDs at once and cache read data in a columnar
-    fashion.
-
-    FIXME Remove the caching at the np.recarray level.
+    fashion. Synapse parameters of a whole chunk are then assembled (and corrected) into a
+    single record array, of which each gid gets a view.
     """
 
     SYNAPSE_INDEX_NAMES = ("synapse_index",)
     LOOKUP_BY_TARGET_IDS = True  # False to lookup by Source Ids
     Parameters = SynapseParameters  # By default we load synapses
     EMPTY_DATA = {}
+    EMPTY_COUNTS = (np.zeros(0, dtype="uint64"), np.zeros(0, dtype="int64"))
+
+    PRELOAD_BYTES_BUDGET = 2 * 1024**3
+    """Max bytes of edge attributes held at once by preload_windows(), per rank"""
+    PREFETCH_WINDOW_SIZE = 1000
+    """Max gids per window when prefetching, so that reads overlap with processing"""
+    MAX_READ_GAP = 4096
+    """Max gap (in edges) between ranges merged in a single read, unless ND_EDGES_READ_GAP"""
+    _warned_no_threaded_reads = False
 
     custom_parameters = {"isec", "ipt", "offset"}
     """Custom parameters are skipped from direct loading and trigger _load_params_custom()"""
@@ -227,8 +449,18 @@ class SonataReader(SynapseReader):
     def _open_file(self, src, population, _):
         try:
             from mpi4py import MPI
-            hdf5_reader = libsonata.make_collective_reader(MPI.COMM_WORLD, False, True)
+            if self._node_shared_reads:
+                # Only node leaders read edge data, hence no collective transfers
+                self._node_reader = NodeSharedReader(MPI.COMM_WORLD)
+                hdf5_reader = libsonata.Hdf5Reader()
+            else:
+                hdf5_reader = libsonata.make_collective_reader(MPI.COMM_WORLD, False, True)
+            # Reads in a background thread (prefetch) call MPI while the main thread may too
+            self._threaded_reads = MPI.Query_thread() >= MPI.THREAD_MULTIPLE
         except ModuleNotFoundError:
+            if self._node_shared_reads:
+                logging.warning("Node shared reads require mpi4py, which is not available. "
+                                "Each rank reads its own edge data")
             hdf5_reader = libsonata.Hdf5Reader()
 
         storage = libsonata.EdgeStorage(src, hdf5_reader=hdf5_reader)
@@ -236,9 +468,20 @@ class SonataReader(SynapseReader):
             assert len(storage.population_names) == 1, "Populations: %s" % storage.population_names
             population = next(iter(storage.population_names))
         self._population = storage.open_population(population)
+        # Edge ranges with smaller gaps are read at once. By default, reading up to the
+        # FS preferred I/O size extra (8-byte) data, but no more than MAX_READ_GAP
+        # (block sizes of parallel FS may be several MB, i.e. millions of edges)
+        self._read_gap = GlobalConfig.edges_read_gap
+        if self._read_gap is None:
+            self._read_gap = min(os.stat(src).st_blksize // 8, self.MAX_READ_GAP)
+        # Optional index (node -> edge ranges) memory-mapped from the cache dir
+        self._edge_index = self._index_cache_dir and EdgeIndexCache.open(
+            self._index_cache_dir, src, population, self.LOOKUP_BY_TARGET_IDS)
         # A cache which stores all the fields for each gid. E.g. {1: {"sgid": property_numpy}}
         self._data = {}
-        # A cache for connection counts, used mostly in dry run
+        # Synapse parameters of preloaded chunks pending correction: gid -> (params, views)
+        self._params_chunks = {}
+        # A cache for connection counts, used mostly in dry run: gid -> (sgids, syn_counts)
         self._counts = {}
 
     def has_nrrp(self):
@@ -260,8 +503,7 @@ class SonataReader(SynapseReader):
         Preload SONATA fields for the specified IDs.
         Set minimal_mode to True to read a single synapse per connection
         """
-        # TODO: limit the number of cells per chunk in production.
-        #       Ensuring the number of chunks must be the same in all ranks (collective)!
+        # NOTE: For bounding memory in production use preload_windows()
         CHUNK_SIZE = 1000
         if not minimal_mode or len(gids) < CHUNK_SIZE:
             return self._preload_data_chunk(gids, minimal_mode)
@@ -270,6 +512,117 @@ class SonataReader(SynapseReader):
         for start, end in ProgressBar.iter(ranges, name="Prefetching"):
             self._preload_data_chunk(gids[start:end], minimal_mode)
 
+    def preload_windows(self, gids, minimal_mode=False, prefetch=False):
+        """A generator preloading SONATA fields in windows bounded by PRELOAD_BYTES_BUDGET.
+
+        The number of windows is agreed among all ranks, so that reads remain collective.
+        Therefore the generator must be fully consumed in all ranks.
+        When several windows are required, the data of a window is released as soon as the
+        next one is requested. Otherwise data is kept in cache, as with preload_data().
+
+        Args:
+            gids: The gids to preload
+            minimal_mode: Read a single synapse per connection (single window)
+            prefetch: When several windows are needed, read the next window in a background
+                thread while the current one is consumed. Two windows are then held at once,
+                so each gets half the budget and at most PREFETCH_WINDOW_SIZE gids. Requires
+                MPI_THREAD_MULTIPLE support when reads use MPI, otherwise windows are read
+                synchronously.
+
+        Yields: The gids of each preloaded window
+        """
+        if minimal_mode:
+            self.preload_data(gids, minimal_mode)
+            yield gids
+            return
+
+        if prefetch and not self._threaded_reads:
+            if not SonataReader._warned_no_threaded_reads:
+                logging.warning("MPI thread support is below MPI_THREAD_MULTIPLE. "
+                                "Edge data is read without prefetching")
+                SonataReader._warned_no_threaded_reads = True
+            prefetch = False
+
+        # Whenever everything fits the budget, data is read at once and kept, as with
+        # preload_data(). Prefetching only applies when several windows are anyway needed
+        n_windows = self._count_preload_windows(gids, self.PRELOAD_BYTES_BUDGET)
+        n_windows = MPI.allreduce(n_windows, MPI.MAX)
+        if n_windows <= 1:
+            self._preload_window(gids)
+            yield gids
+            return
+
+        if prefetch:
+            n_windows = max(self._count_preload_windows(gids, self.PRELOAD_BYTES_BUDGET // 2),
+                            -(-len(gids) // self.PREFETCH_WINDOW_SIZE))
+            n_windows = MPI.allreduce(n_windows, MPI.MAX)
+
+        log_verbose("Streaming synapse data in %d windows (prefetch: %s)", n_windows, prefetch)
+        windows = np.array_split(np.asarray(gids), n_windows)
+        if not prefetch:
+            for window_gids in windows:
+                self._preload_window(window_gids)
+                yield window_gids
+                self.release_data(window_gids)
+            return
+
+        # NOTE: Only the background thread reads from the edge file (the main thread just
+        # consumes preloaded data), so reads remain serialized and in the same order.
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="EdgePrefetch") as executor:
+            next_window = executor.submit(self._preload_window, windows[0])
+            for window_i, window_gids in enumerate(windows):
+                next_window.result()  # Wait for data, re-raising read errors if any
+                if window_i + 1 < n_windows:
+                    next_window = executor.submit(self._preload_window, windows[window_i + 1])
+                yield window_gids
+                self.release_data(window_gids)
+
+    def _preload_window(self, gids):
+        """Preloads a window of gids. Windows are matched in all ranks, so reads may be shared
+        within the node. Read data is copied (sorted) in _populate, so buffers can be freed
+        """
+        if self._node_reader is None:
+            return self._preload_data_chunk(gids)
+        self._node_reader_active = True
+        try:
+            self._preload_data_chunk(gids)
+        finally:
+            self._node_reader_active = False
+            self._node_reader.free()
+
+    def _read_edges(self, read_f, selection):
+        """Reads edge data, once per node when within a preload window (node_shared_reads)"""
+        if self._read_gap > 0:
+            read_f = partial(_merged_read, read_f, max_gap=self._read_gap)
+        if self._node_reader_active:
+            return self._node_reader.read(read_f, selection)
+        return read_f(selection)
+
+    def _count_preload_windows(self, gids, bytes_budget):
+        """Estimates the number of windows required to preload the given gids"""
+        if not len(gids):
+            return 0
+        node_ids = np.asarray(gids, dtype="int64") - 1
+        if self._edge_index:
+            edge_ranges = self._edge_index.node_edge_ranges(node_ids)
+        elif self.LOOKUP_BY_TARGET_IDS:
+            edge_ranges = self._population.afferent_edges(node_ids).ranges
+        else:
+            edge_ranges = self._population.efferent_edges(node_ids).ranges
+        # Merged reads read more data (the gaps), account for it
+        edge_count = _merged_read_size(edge_ranges, max(self._read_gap, 0))
+        fields_count = (len(self.Parameters.load_fields) + len(self._extra_fields)
+                        + len(self.SYNAPSE_INDEX_NAMES) + 1)
+        est_bytes = edge_count * fields_count * 8  # all read as 8 byte numbers
+        return -(-est_bytes // bytes_budget)  # ceil
+
+    def release_data(self, gids):
+        """Drops the cached data of the given gids"""
+        for gid in gids:
+            self._data.pop(gid, None)
+            self._params_chunks.pop(gid, None)
+            self._syn_params.pop(gid, None)
+
     def _preload_data_chunk(self, gids, minimal_mode=False):
         """Preload all synapses for a number of gids, respecting Parameters and _extra_fields"""
         # NOTE: to disambiguate, gids are 1-based cell ids, while node_ids are 0-based sonata ids
@@ -280,6 +633,9 @@ class SonataReader(SynapseReader):
         def get_edge_and_lookup_gids(needed_gids: libsonata.Selection):
             """Retrieve edge and corresponding gid for """
             node_ids = np.array(needed_gids, dtype="int64") - 1
+            if self._edge_index:
+                edge_ranges, lookup_nodes = self._edge_index.edge_ranges(node_ids)
+                return libsonata.Selection(edge_ranges.tolist()), lookup_nodes + 1
             if self.LOOKUP_BY_TARGET_IDS:
                 edge_ids = self._population.afferent_edges(node_ids)
                 return edge_ids, self._population.target_nodes(edge_ids) + 1
@@ -287,31 +643,43 @@ class SonataReader(SynapseReader):
                 edge_ids = self._population.efferent_edges(node_ids)
                 return edge_ids, self._population.source_nodes(edge_ids) + 1
 
-        # NOTE: needed_edge_ids, lookup_gids are used in _populate and _read
+        # NOTE: needed_edge_ids, edges_index are used in _populate and _read
         needed_edge_ids, lookup_gids = get_edge_and_lookup_gids(needed_gids)
+        edges_index = _EdgesIndex(lookup_gids)
 
         # Find and exclude gids without data
-        different_gids_edge_i = np.diff(lookup_gids, prepend=np.nan).nonzero()[0]
-        needed_gids = sorted(lookup_gids[different_gids_edge_i])
+        needed_gids = edges_index.gids.tolist()
         for gid in (orig_needed_gids_set - set(needed_gids)):
             self._data.setdefault(gid, self.EMPTY_DATA)
 
         # In minimal mode read a single synapse (the first) of each target gid
         if minimal_mode:
-            needed_edge_ids = libsonata.Selection(needed_edge_ids.flatten()[different_gids_edge_i])
-            lookup_gids = lookup_gids[different_gids_edge_i]
+            first_edge_i = np.sort(edges_index.order[edges_index.offsets[:-1]])
+            needed_edge_ids = libsonata.Selection(needed_edge_ids.flatten()[first_edge_i])
+            edges_index = _EdgesIndex(lookup_gids[first_edge_i])
+
+        chunk_index = edges_index
+        chunk_columns = {}  # The whole chunk data, sorted by gid. For the parameters views
 
         def _populate(field, data):
             # Populate cache. Unavailable entries are stored as a plain -1
             if data is None:
                 data = -1
-            for gid in needed_gids:
-                existing_gid_data = self._data.setdefault(gid, {})
-                existing_gid_data[field] = data if np.isscalar(data) else data[lookup_gids == gid]
+            if np.isscalar(data):
+                for gid in needed_gids:
+                    self._data.setdefault(gid, {})[field] = data
+            else:
+                # Data is sorted once per field. Each gid then gets a view (slice) of it
+                data = edges_index.sort(data)
+                for gid, gid_data in zip(needed_gids, edges_index.split(data)):
+                    self._data.setdefault(gid, {})[field] = gid_data
+            if edges_index is chunk_index:
+                chunk_columns[field] = data
 
         def _read(attribute, optional=False):
             if attribute in self._population.attribute_names:
-                return self._population.get_attribute(attribute, needed_edge_ids)
+                return self._read_edges(partial(self._population.get_attribute, attribute),
+                                        needed_edge_ids)
             elif optional:
                 log_verbose("Defaulting to -1.0 for attribute %s", attribute)
                 return -1
@@ -320,9 +688,9 @@ class SonataReader(SynapseReader):
 
         # Populate the opposite node id
         if self.LOOKUP_BY_TARGET_IDS:
-            _populate("sgid", self._population.source_nodes(needed_edge_ids) + 1)
+            _populate("sgid", self._read_edges(self._population.source_nodes, needed_edge_ids) + 1)
         else:
-            _populate("tgid", self._population.target_nodes(needed_edge_ids) + 1)
+            _populate("tgid", self._read_edges(self._population.target_nodes, needed_edge_ids) + 1)
 
         # Make synapse index in the file explicit
         for name in sorted(self.SYNAPSE_INDEX_NAMES):
@@ -339,6 +707,7 @@ class SonataReader(SynapseReader):
                 _populate("isec", 0)
                 _populate("ipt", -1)
                 _populate("offset", 0)
+                self._create_params_views(chunk_index, chunk_columns)
                 return  # done! Skip extra fields
             self._load_params_custom(_populate, _read)
 
@@ -353,11 +722,31 @@ class SonataReader(SynapseReader):
                 if (data := self._data[gid]) is not self.EMPTY_DATA and field not in data
             ))
             if needed_gids != now_needed_gids:
-                needed_gids = now_needed_gids
-                needed_edge_ids, lookup_gids = get_edge_and_lookup_gids(needed_gids)
+                needed_edge_ids, lookup_gids = get_edge_and_lookup_gids(now_needed_gids)
+                edges_index = _EdgesIndex(lookup_gids)
+                needed_gids = edges_index.gids.tolist()
             sonata_attr = self.parameter_mapping.get(field, field)
             _populate(field, _read(sonata_attr))
 
+        self._create_params_views(chunk_index, chunk_columns)
+
+    def _create_params_views(self, edges_index, columns):
+        """Assembles the parameters of a whole chunk in a single array, handing out views.
+        If some field is missing (e.g. loaded in a separate chunk) gids use the fallback.
+        """
+        fields = self.Parameters.load_fields.union(self._extra_fields)
+        if not len(edges_index.gids) or not fields.issubset(columns):
+            return
+        params = self._params_cls.create_array(edges_index.offsets[-1])
+        for name in fields:
+            params[name] = columns[name]
+        offsets = edges_index.offsets
+        views = {gid: params[offsets[i]:offsets[i + 1]]
+                 for i, gid in enumerate(edges_index.gids.tolist())}
+        chunk = (params, views)
+        for gid in views:
+            self._params_chunks[gid] = chunk
+
     def _load_params_custom(self, _populate, _read):
         # Position of the synapse
         if self.has_property("afferent_section_id"):
@@ -397,23 +786,40 @@ class SonataReader(SynapseReader):
                 _populate("ipt", _read("morpho_segment_id_post"))
                 _populate("offset", _read("morpho_offset_segment_post"))
 
+    def get_synapse_parameters(self, gid):
+        """Obtains the synapse parameters record for a given gid.
+        For preloaded chunks, parameters are corrected for all the chunk gids at once.
+        """
+        if (syn_params := self._syn_params.get(gid)) is not None:
+            return syn_params
+        if gid not in self._data:
+            self._preload_data_chunk([gid])  # lazy load, as a single gid chunk
+        if (chunk := self._params_chunks.get(gid)) is not None:
+            # Chunks are corrected exactly once, then handed out only from _syn_params
+            params, views = chunk
+            self._correct_params(params)
+            self._syn_params.update(views)
+            for chunk_gid in views:
+                self._params_chunks.pop(chunk_gid, None)
+            return views[gid]
+        return super().get_synapse_parameters(gid)
+
     def _load_synapse_parameters(self, gid):
+        """Assembles the (uncorrected) parameters of a gid. See get_synapse_parameters()"""
         data = self._data.get(gid)
         if data is None:  # not in _data
             self._preload_data_chunk([gid])
+            self._params_chunks.pop(gid, None)  # parameters are assembled below instead
             data = self._data[gid]
 
         if not data:
             return self.Parameters.empty  # disconnected cell
 
-        edge_count = len(next(iter(data.values())))
+        if (chunk := self._params_chunks.get(gid)) is not None:
+            return chunk[1][gid]  # uncorrected view, the chunk remains pending correction
 
-        if self._extra_fields:
-            class CustomSynapseParameters(self.Parameters):
-                _synapse_fields = self.Parameters._synapse_fields + self._extra_fields
-            conn_syn_params = CustomSynapseParameters.create_array(edge_count)
-        else:
-            conn_syn_params = self.Parameters.create_array(edge_count)
+        edge_count = len(next(iter(data.values())))
+        conn_syn_params = self._params_cls.create_array(edge_count)
 
         for name in self.Parameters.load_fields:
             conn_syn_params[name] = data[name]
@@ -427,6 +833,9 @@ class SonataReader(SynapseReader):
         Counts synapses for the given target neuron ids. Returns a dict
         """
         node_ids = tgids - 1
+        if self._edge_index and self.LOOKUP_BY_TARGET_IDS:
+            counts = self._edge_index.edge_counts(node_ids)
+            return dict(zip(tgids, counts))
         edge_ids = self._population.afferent_edges(node_ids)
         target_nodes = self._population.target_nodes(edge_ids)
         unique_nodes, counts = np.unique(target_nodes, return_counts=True)
@@ -439,12 +848,32 @@ class SonataReader(SynapseReader):
     def get_conn_counts(self, tgids):
         """
         Counts synapses per connetion for all the given target neuron ids.
-        Returns a dict whose value is a numpy stuctured array
+        Returns a dict whose value is a dict of synapse counts per sgid
         """
+        self._load_conn_counts(tgids)
+        return {tgid: dict(zip(*self._counts[tgid])) for tgid in tgids}
+
+    def get_conn_counts_arrays(self, tgids):
+        """
+        Counts synapses per connetion for all the given target neuron ids, as arrays.
+        Returns a tuple of arrays (sgids, syn_counts, conn_counts): the source gid and
+        synapse count of every connection, grouped by tgid (in the given order),
+        and the number of connections of each tgid.
+        """
+        self._load_conn_counts(tgids)
+        tgids_counts = [self._counts[tgid] for tgid in tgids]
+        if not tgids_counts:
+            return self.EMPTY_COUNTS + (np.zeros(0, dtype="int64"),)
+        return (np.concatenate([c[0] for c in tgids_counts]),
+                np.concatenate([c[1] for c in tgids_counts]),
+                np.fromiter((len(c[0]) for c in tgids_counts), "int64", len(tgids_counts)))
+
+    def _load_conn_counts(self, tgids):
+        """Reads, at once, the connection counts of the tgids not in cache yet"""
         if missing_gids := set(tgids) - set(self._counts):
             missing_gids = np.fromiter(missing_gids, dtype="uint32")
             missing_gids.sort()
-            missing_nodes = missing_gids  - 1
+            missing_nodes = missing_gids - 1
             edge_ids = self._population.afferent_edges(missing_nodes)
             target_nodes = self._population.target_nodes(edge_ids)
             source_nodes = self._population.source_nodes(edge_ids)
@@ -453,15 +882,12 @@ class SonataReader(SynapseReader):
             connections["f1"] = source_nodes + 1
 
             tgt_src_pairs, counts = np.unique(connections, return_counts=True)
-            pairs_start_i = np.diff(tgt_src_pairs["f0"], prepend=np.nan, append=np.nan).nonzero()[0]
-
-            for conn_i, start_i in enumerate(pairs_start_i[:-1]):
-                end_i = pairs_start_i[conn_i+1]
-                tgid = tgt_src_pairs["f0"][start_i]
-                tgid_counts = {tgt_src_pairs["f1"][j]: counts[j] for j in range(start_i, end_i)}
-                self._counts[tgid] = tgid_counts
-
-        return {tgid: self._counts.get(tgid, self.EMPTY_DATA) for tgid in tgids}
+            tgids_found, pairs_start_i = np.unique(tgt_src_pairs["f0"], return_index=True)
+            sgids_split = np.split(tgt_src_pairs["f1"], pairs_start_i[1:])
+            counts_split = np.split(counts, pairs_start_i[1:])
+            self._counts.update(zip(tgids_found.tolist(), zip(sgids_split, counts_split)))
+            for gid in missing_gids.tolist():
+                self._counts.setdefault(gid, self.EMPTY_COUNTS)
 
 
 class FormatNotSupported(Exception):
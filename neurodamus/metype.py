@@ -148,6 +148,14 @@ class Cell_V6(METype):
         detailed_axon = circuit_conf.DetailedAxon
         super().__init__(gid, mepath, meinfo.emodel_tpl, morpho_path, meinfo, detailed_axon)
 
+    @classmethod
+    def morphology_file(cls, meinfo, circuit_conf):
+        """The morphology file of a cell, if read via MorphIO (h5). Otherwise None"""
+        if cls.morpho_extension.lower() != "h5":
+            return None
+        return ospath.join(circuit_conf.MorphologyPath,
+                           meinfo.morph_name + "." + cls.morpho_extension)
+
     def _instantiate_cell(self, gid, etype_path, emodel, morpho_path, meinfos_v6, detailed_axon):
         """Instantiates a SSCx v6 cell
         """
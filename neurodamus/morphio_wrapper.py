@@ -4,9 +4,15 @@ features on top of MorphIO basic morphology handling.
 """
 import os
 import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from numpy.linalg import eig, norm
 
+from .core.configuration import GlobalConfig, SimConfig
+from .io.morphology_store import MorphologyStore
+
 
 '''
     [START] Implementations retrieved from nse/morph-tool (!= hpc/morpho-tool !!!)
@@ -181,6 +187,18 @@ class MorphIOWrapper:
     section_index2name_dict = property(lambda self: self._sec_idx2names)
     section_typeid_distrib = property(lambda self: self._sec_typeid_distrib)
 
+    _cache = OrderedDict()
+    """Parsed morphologies by (file, options), the least recently used first. See load()"""
+    _prefetched = {}
+    """Futures of morphologies being read in the background, see prefetch_iter()"""
+    _read_lock = threading.Lock()
+    """MorphIO (HDF5) reads are serialized, as the main thread might read concurrently"""
+
+    PREFETCH_DEPTH = 8
+    """Max number of morphologies read ahead of their instantiation"""
+    _store = None
+    """The MorphologyStore in use (--morphology-store), opened on first use"""
+
     def __init__(self, input_file, options=0):
         self._collection_dir, self._morph_name, self._morph_ext = split_morphology_path(input_file)
         self._options = options
@@ -188,6 +206,29 @@ class MorphIOWrapper:
         self._sec_idx2names = {}
         self._build_sec_idx2names()
         self._build_sec_typeid_distrib()
+        self._topology = None
+        self._hoc_points = None
+
+    @classmethod
+    def load(cls, input_file, options=0):
+        """ Retrieves the wrapper of a morphology file, parsing it only if not cached.
+        Wrappers are never modified, therefore cells sharing a morphology can share them.
+        The cache keeps up to GlobalConfig.morphology_cache_size of the most recently used.
+        """
+        key = cls._cache_key(input_file, options)
+        wrapper = cls._cache.get(key)
+        if wrapper is not None:
+            cls._cache.move_to_end(key)
+            return wrapper
+        future = cls._prefetched.pop(key, None)
+        wrapper = future.result() if future is not None else cls._read(input_file, options)
+        max_size = GlobalConfig.morphology_cache_size
+        if max_size <= 0:
+            return wrapper
+        cls._cache[key] = wrapper
+        while len(cls._cache) > max_size:
+            cls._cache.popitem(last=False)
+        return wrapper
 
     def _build_morph(self):
         """ Build immutable morphology, going trough mutable and applying neuron adjustemnts """
@@ -201,7 +242,8 @@ class MorphIOWrapper:
 
         collection = Collection(self._collection_dir, extensions=[self._morph_ext])
         options = self._options | Option.nrn_order
-        self._morph = collection.load(self._morph_name, options, mutable=True)
+        with self._read_lock:
+            self._morph = collection.load(self._morph_name, options, mutable=True)
 
         # Re-compute the soma points as they are computed in import3d_gui.hoc
         if self._morph.soma_type not in {SomaType.SOMA_SINGLE_POINT, SomaType.SOMA_SIMPLE_CONTOUR}:
@@ -268,11 +310,16 @@ class MorphIOWrapper:
                    [(3, 2724)]],
                   dtype={'names':['type_id','start_id'],....}
         '''
-        self._sec_typeid_distrib = np.dstack(np.unique(self._morph.section_types,
-                                                       return_counts=True,
-                                                       return_index=True))[0]
-        self._sec_typeid_distrib = np.concatenate(([(1, -1, 1)], self._sec_typeid_distrib), axis=0)
-        self._sec_typeid_distrib.dtype = [('type_id', '<i8'), ('start_id', '<i8'), ('count', '<i8')]
+        self._sec_typeid_distrib = self._typeid_distrib(self._morph.section_types)
+
+    @staticmethod
+    def _typeid_distrib(section_types):
+        typeid_distrib = np.dstack(np.unique(section_types,
+                                             return_counts=True,
+                                             return_index=True))[0]
+        typeid_distrib = np.concatenate(([(1, -1, 1)], typeid_distrib), axis=0).astype('<i8')
+        typeid_distrib.dtype = [('type_id', '<i8'), ('start_id', '<i8'), ('count', '<i8')]
+        return typeid_distrib
 
     def morph_as_hoc(self):
         """ Uses morphio object to read and generate hoc commands just like import3d_gui.hoc """
@@ -330,6 +377,166 @@ class MorphIOWrapper:
 
         return cmds
 
+    def instantiate(self, cell):
+        """ Creates the morphology in a (hoc) cell, like executing morph_as_hoc() commands.
+        Sections are connected and their 3D points added in bulk via NEURON's Python API,
+        avoiding the formatting and interpretation of a hoc command per point.
+        """
+        from neuron import h
+
+        # Create sections and subsets. There's only a few of these commands, one per type
+        for [(type_id, count)] in self._sec_typeid_distrib[['type_id', 'count']]:
+            type_name = self.type2name(type_id)
+            h.execute("create {}[{}]".format(type_name, count), cell)
+            h.execute(self.mksubset(type_id, count, type_name), cell)
+        h.execute("forall all.append", cell)
+
+        xyz, diameters, soma_xyz, soma_diameters = self._get_hoc_points()
+        section_types, section_parents, offsets = self._get_topology()
+
+        soma = cell.soma[0]
+        h.pt3dadd(*(h.Vector(coords) for coords in soma_xyz), h.Vector(soma_diameters), sec=soma)
+
+        # Section indexes restart with each type, see _build_sec_idx2names
+        type_arrays = {type_id: (getattr(cell, self.type2name(type_id)), start_id)
+                       for [(type_id, start_id)]
+                       in self._sec_typeid_distrib[1:][['type_id', 'start_id']]}
+        hoc_sections = []
+        for i, type_id in enumerate(section_types.tolist()):
+            hoc_array, start_id = type_arrays[type_id]
+            hoc_sections.append(hoc_array[i - start_id])
+
+        for i, parent_id in enumerate(section_parents.tolist()):
+            hoc_sec = hoc_sections[i]
+            if parent_id >= 0:
+                hoc_sec.connect(hoc_sections[parent_id](1), 0)
+            else:
+                hoc_sec.connect(soma(0.5), 0)
+
+            start, end = offsets[i], offsets[i + 1]
+            h.pt3dadd(*(h.Vector(coords[start:end]) for coords in xyz),
+                      h.Vector(diameters[start:end]), sec=hoc_sec)
+
+    @staticmethod
+    def _cache_key(input_file, options):
+        return os.path.normpath(input_file), int(options)
+
+    @classmethod
+    def _read(cls, input_file, options):
+        """ Reads a morphology, taking it from the morphology store when it's there """
+        store = cls._get_store()
+        if store is not None and not options:
+            morph_arrays = store.get_file(input_file)
+            if morph_arrays is not None:
+                return StoredMorphology(morph_arrays)
+        return cls(input_file, options)
+
+    @classmethod
+    def _get_store(cls):
+        store_file = SimConfig.cli_options and SimConfig.cli_options.morphology_store
+        if not store_file:
+            return None
+        if cls._store is None or cls._store.filename != store_file:
+            cls._store = MorphologyStore(store_file)
+            logging.info("Using morphology store %s (%d morphologies)",
+                         store_file, len(cls._store))
+        return cls._store
+
+    @classmethod
+    def _prefetch(cls, input_file, options):
+        wrapper = cls._read(input_file, options)
+        wrapper._get_hoc_points()
+        return wrapper
+
+    @classmethod
+    def prefetch_iter(cls, items, morphology_file_f, options=0, max_workers=2):
+        """ Iterates over items, reading their morphologies ahead in a pool of threads.
+
+        Up to PREFETCH_DEPTH morphologies of the upcoming items are read and prepared in the
+        background, while the current item is processed. load() then picks them up.
+
+        Args:
+            items: The items to iterate over, e.g. (gid, cell_info) tuples
+            morphology_file_f: A function returning the morphology file of an item, or None
+                if it's not read via MorphIO
+            options: The MorphIO options the morphologies will be loaded with
+            max_workers: The number of threads reading morphologies
+        """
+        def submit(item):
+            morph_file = morphology_file_f(item)
+            if morph_file is not None:
+                key = cls._cache_key(morph_file, options)
+                if key not in cls._cache and key not in cls._prefetched:
+                    cls._prefetched[key] = executor.submit(cls._prefetch, morph_file, options)
+            upcoming.append(item)
+
+        items = iter(items)
+        upcoming = deque()
+        with ThreadPoolExecutor(max_workers, thread_name_prefix="MorphPrefetch") as executor:
+            try:
+                for item in items:
+                    submit(item)
+                    if len(upcoming) > cls.PREFETCH_DEPTH:
+                        yield upcoming.popleft()
+                while upcoming:
+                    yield upcoming.popleft()
+            finally:
+                for future in cls._prefetched.values():  # Not loaded, e.g. on errors
+                    future.cancel()
+                cls._prefetched.clear()
+
+    def _get_topology(self):
+        """ The sections (types, parent index or -1 for roots, and the offsets of their points)
+        """
+        if self._topology is None:
+            parents = [-1 if sec.is_root else sec.parent.id for sec in self._morph.sections]
+            self._topology = (self._morph.section_types,
+                              np.array(parents, dtype="i4"),
+                              self._morph.section_offsets)
+        return self._topology
+
+    def store_arrays(self):
+        """ The arrays of the morphology, as kept in a MorphologyStore
+        """
+        section_types, section_parents, offsets = self._get_topology()
+        xyz, diameters, soma_xyz, soma_diameters = self._get_hoc_points()
+        return dict(section_types=section_types, section_parents=section_parents,
+                    section_offsets=offsets[:-1],
+                    x=xyz[0], y=xyz[1], z=xyz[2], diameters=diameters,
+                    soma_x=soma_xyz[0], soma_y=soma_xyz[1], soma_z=soma_xyz[2],
+                    soma_diameters=soma_diameters)
+
+    def _get_hoc_points(self):
+        """ The 3D points (xyz, diameters) of the sections and of the soma, ready for pt3dadd.
+        Computed on first use, and kept along with the (cached) morphology.
+        """
+        if self._hoc_points is None:
+            # Same precision as the hoc commands, so that results are identical
+            # Coordinates are transposed so that each (section) slice is contiguous
+            soma = self._morph.soma
+            self._hoc_points = (
+                np.ascontiguousarray(self._hoc_precision(self._morph.points).T),
+                self._hoc_precision(self._morph.diameters),
+                # Order is reversed wrt NEURON's soma points
+                np.ascontiguousarray(self._hoc_precision(soma.points[::-1]).T),
+                self._hoc_precision(soma.diameters[::-1]),
+            )
+        return self._hoc_points
+
+    @staticmethod
+    def _hoc_precision(values, digits=8):
+        """ Rounds values to the given significant digits, as hoc commands formatted with
+        '{:.8g}' do, and converts them to double.
+        """
+        values = np.asarray(values, dtype="d")
+        magnitude = np.floor(np.log10(np.abs(np.where(values == 0, 1, values))))
+        decimals = digits - 1 - magnitude
+        # Powers of 10 are only exact for non-negative exponents, hence the two branches
+        scale = 10.0 ** np.abs(decimals)
+        return np.where(decimals >= 0,
+                        np.rint(values * scale) / scale,
+                        np.rint(values / scale) * scale)
+
     '''
          [START] Python versions of import3d_gui.hoc helper functions
          Note: nrn function names will be kept for reference
@@ -380,3 +587,58 @@ class MorphIOWrapper:
     '''
         [END] Python versions of import3d_gui.hoc helper functions
     '''
+
+
+class StoredMorphology(MorphIOWrapper):
+    """
+        A morphology from a MorphologyStore, ready to be instantiated. Its arrays are views
+        of the (memory-mapped) store. Without a MorphIO object, it only supports instantiate()
+        and morph_as_hoc()
+    """
+
+    def __init__(self, morph_arrays):
+        self._morph = None
+        self._sec_idx2names = None
+        self._sec_typeid_distrib = self._typeid_distrib(morph_arrays["section_types"])
+        self._topology = (
+            morph_arrays["section_types"],
+            morph_arrays["section_parents"],
+            np.append(morph_arrays["section_offsets"], len(morph_arrays["diameters"])),
+        )
+        self._hoc_points = (
+            (morph_arrays["x"], morph_arrays["y"], morph_arrays["z"]),
+            morph_arrays["diameters"],
+            (morph_arrays["soma_x"], morph_arrays["soma_y"], morph_arrays["soma_z"]),
+            morph_arrays["soma_diameters"],
+        )
+
+    def morph_as_hoc(self):
+        """ Generates the hoc commands of the morphology, as MorphIOWrapper.morph_as_hoc(),
+        from the stored arrays (which already have the precision of the commands)
+        """
+        cmds = []
+        for [(type_id, count)] in self._sec_typeid_distrib[['type_id', 'count']]:
+            tstr = self.type2name(type_id)
+            cmds.append("create {}[{}]".format(tstr, count))
+            cmds.append(self.mksubset(type_id, count, tstr))
+        cmds.append("forall all.append")
+
+        xyz, diameters, soma_xyz, soma_diameters = self._hoc_points
+        cmds.extend("soma {{ pt3dadd({:.8g}, {:.8g}, {:.8g}, {:.8g}) }}".format(*point)
+                    for point in zip(*(coords.tolist() for coords in soma_xyz),
+                                     soma_diameters.tolist()))
+
+        section_types, section_parents, offsets = self._topology
+        start_ids = {type_id: start_id for [(type_id, start_id)]
+                     in self._sec_typeid_distrib[1:][['type_id', 'start_id']]}
+        names = [self.name(type_id, i - start_ids[type_id])
+                 for i, type_id in enumerate(section_types.tolist())]
+        points = list(zip(*(coords.tolist() for coords in xyz), diameters.tolist()))
+        for i, parent_id in enumerate(section_parents.tolist()):
+            if parent_id >= 0:
+                cmds.append("{} connect {}(0), 1".format(names[parent_id], names[i]))
+            else:
+                cmds.append("soma connect {}(0), 0.5".format(names[i]))
+            cmds.extend("{} {{ pt3dadd({:.8g}, {:.8g}, {:.8g}, {:.8g}) }}".format(names[i], *point)
+                        for point in points[offsets[i]:offsets[i + 1]])
+        return cmds
@@ -13,6 +13,8 @@ from os import path as ospath
 from collections import namedtuple, defaultdict
 from contextlib import contextmanager
 
+import numpy
+
 from .core import MPI, mpi_no_errors, return_neuron_timings, run_only_rank0, SimulationProgress
 from .core import NeurodamusCore as Nd
 from .core.configuration import CircuitConfig, Feature, GlobalConfig, SimConfig
@@ -22,6 +24,7 @@ from .core.configuration import ConfigurationError, find_input_file, get_debug_c
 from .core.nodeset import PopulationNodes
 from .cell_distributor import CellDistributor, VirtualCellPopulation, GlobalCellManager
 from .cell_distributor import LoadBalance, LoadBalanceMode
+from .connection import Connection, ReplaySources
 from .connection_manager import SynapseRuleManager, edge_node_pop_names
 from .gap_junction import GapJunctionManager
 from .replay import MissingSpikesPopulationError, SpikeManager
@@ -307,6 +310,7 @@ class Node:
         self._stim_manager = None
         self._sim_ready = False
         self._jumpstarters = []
+        self._replay_streams = []  # tuples of (sources, spike_manager, sgid_offset, start_delay)
         self._cell_state_dump_t = None
         self._bbss = Nd.BBSaveState()
 
@@ -762,10 +766,20 @@ class Node:
         if SimConfig.restore_coreneuron:
             pop_offsets, alias_pop = CircuitManager.read_population_offsets(read_virtual_pop=True)
 
+        streaming = SimConfig.cli_options.streaming_replay
+        if streaming and SimConfig.use_coreneuron:
+            logging.warning("Streaming replay is only available with NEURON. Loading all spikes")
+            streaming = False
+
         for src_pop in src_target.population_names:
+            # Each rank loads only the spikes of the sources of its local connections
+            src_gids = None if SimConfig.restore_coreneuron \
+                else self._replay_source_gids(src_pop, dst_target, ptype_cls)
             try:
                 log_verbose("Loading replay spikes for population '%s'", src_pop)
-                spike_manager = SpikeManager(spike_filepath, tshift, src_pop)  # Disposable
+                spike_manager = SpikeManager(spike_filepath, tshift, src_pop,  # Disposable
+                                             src_gids, SimConfig.cli_options.spikes_cache,
+                                             streaming)
             except MissingSpikesPopulationError:
                 logging.info("  > No replay for src population: '%s'", src_pop)
                 continue
@@ -785,7 +799,22 @@ class Node:
 
                 logging.info("=> Population pathway %s -> %s. Source offset: %d",
                              src_pop_str, dst_pop_str, src_pop_offset)
-                conn_manager.replay(spike_manager, source, target, delay)
+                if streaming:
+                    # Spikes are fed to the sources in time windows, see _psolve_loop
+                    stream = ReplaySources(streaming=True)
+                    conn_manager.replay(spike_manager, source, target, delay, stream=stream)
+                    self._replay_streams.append((stream, spike_manager, src_pop_offset, delay))
+                else:
+                    conn_manager.replay(spike_manager, source, target, delay)
+
+    def _replay_source_gids(self, src_pop, dst_target, ptype_cls):
+        """Get the raw gids of src_pop connected locally to any population of dst_target"""
+        conn_managers = (self._circuits.get_edge_manager(src_pop, dst_pop, ptype_cls)
+                         for dst_pop in dst_target.population_names)
+        src_gids = [conn_manager.get_source_gids()
+                    for conn_manager in conn_managers if conn_manager]
+        return numpy.unique(numpy.concatenate(src_gids)) if src_gids \
+            else numpy.empty(0, "uint32")
 
     # -
     @mpi_no_errors
@@ -1432,10 +1461,16 @@ class Node:
         buffer_t = SimConfig.buffer_time
         for _ in range(math.ceil((tstop - cur_t) / buffer_t)):
             next_flush = min(tstop, cur_t + buffer_t)
+            self._stream_replays(cur_t, next_flush)
             self._pc.psolve(next_flush)
             cur_t = next_flush
         Nd.t = cur_t
 
+    def _stream_replays(self, tstart, tstop):
+        """Feeds the streamed replays with the spikes of the upcoming window [tstart, tstop)"""
+        for stream, spike_manager, sgid_offset, start_delay in self._replay_streams:
+            stream.play_window(spike_manager, max(tstart, start_delay), tstop, sgid_offset)
+
     # -
     @mpi_no_errors
     def clear_model(self, avoid_creating_objs=False, avoid_clearing_queues=True):
@@ -1453,7 +1488,10 @@ class Node:
                 if self._sonatareport_helper:
                     self._sonatareport_helper.clear()
 
+        # Streamed replays hold the spike readers and the sources of the cleared connections
+        self._replay_streams.clear()
         Node.__init__(self, None, None)  # Reset vars
+        Connection.clear_cache()
 
         # Clear BBSaveState
         self._bbss.ignore()
@@ -2,9 +2,13 @@
 Stimulus implementation where incoming synaptic events are replayed for a single gid
 """
 from __future__ import absolute_import
+import hashlib
+import itertools
 import os
 import logging
+import tempfile
 import numpy
+from .core import MPI
 from .utils.logging import log_verbose
 from .utils.multimap import GroupedMultiMap
 from .utils.timeit import timeit
@@ -20,59 +24,110 @@ class SpikeManager:
     Internally the spikes are stored in a :py:class:`neurodamus.utils.multimap.GroupedMultiMap`
     """
     _ascii_spike_dtype = [('time', 'double'), ('gid', 'uint32')]
+    _read_chunk_size = 1 << 20  # Events (or lines) to filter at a time when reading a subset
+    _ascii_sidecar_arrays = ("gids", "times", "offsets")
 
     @timeit(name="Replay init")
-    def __init__(self, spike_filename, delay=0, population=None):
+    def __init__(self, spike_filename, delay=0, population=None, gids=None, cache_dir=None,
+                 streaming=False):
         """Constructor for SynapseReplay.
 
         Args:
             spike_filename: path to spike out file.
                 if ext is .bin, interpret as binary file; otherwise, interpret as ascii
             delay: delay to apply to spike times
+            population: the spikes population (SONATA files only)
+            gids: if given, load only the spikes of these (raw) gids, e.g. the sources
+                of the connections instantiated in this rank. Default: load all
+            cache_dir: directory for the binary sidecar of ascii files. Default: next to them
+            streaming: load the spikes of SONATA files in time windows, see get_window().
+                Other formats are fully loaded (ascii ones being memory-mapped)
         """
         self._gid_fire_events = None
+        self._window_source = None  # (spikes population, node_ids, delay) when streaming
+        self._window = None
         # Nd.distributedSpikes = 0  # Wonder the effects of this
-        self.open_spike_file(spike_filename, delay, population)
+        self.open_spike_file(spike_filename, delay, population, gids, cache_dir, streaming)
 
     #
-    def open_spike_file(self, filename, delay, population=None):
+    def open_spike_file(self, filename, delay, population=None, gids=None, cache_dir=None,
+                        streaming=False):
         """Opens a given spike file.
 
         Args:
             filename: path to spike out file. Interpret as binary or ascii according to extension
             delay: delay to apply to spike times
+            population: the spikes population (SONATA files only)
+            gids: the (raw) gids whose spikes shall be loaded. Default: all
+            cache_dir: directory for the binary sidecar of ascii files. Default: next to them
+            streaming: load the spikes of SONATA files in time windows, given gids
         """
         # determine if we have binary or ascii file
         # TODO: filename should be able to handle relative paths,
         # using the Run.CurrentDir as an initial path
         # _read_spikes_xxx shall return numpy arrays
+        if gids is not None:
+            gids = numpy.unique(numpy.asarray(gids, dtype="uint32"))
+        if filename.endswith(".h5") and streaming and gids is not None:
+            # Only the spikes of the current window are held, see get_window()
+            spikes = self._open_sonata_population(filename, population)
+            self._window_source = (spikes, (gids.astype("uint64") - 1).tolist(), delay)
+            self._gid_fire_events = GroupedMultiMap.from_groups(gids, [()] * len(gids))
+            return
         if filename.endswith(".h5"):
-            tvec, gidvec = self._read_spikes_sonata(filename, population)
+            tvec, gidvec = self._read_spikes_sonata(filename, population, gids)
         elif filename.endswith(".bin"):
-            tvec, gidvec = self._read_spikes_binary(filename)
+            tvec, gidvec = self._read_spikes_binary(filename, gids)
         else:
-            tvec, gidvec = self._read_spikes_ascii(filename)
+            # Text files are converted once to a binary sidecar, which is then memory-mapped
+            sidecar = self._open_ascii_sidecar(filename, cache_dir)
+            if sidecar is not None:
+                self._store_grouped_events(*sidecar, delay, gids)
+                return
+            tvec, gidvec = self._read_spikes_ascii(filename, gids)
 
         if delay:
             tvec += delay
 
         self._store_events(tvec, gidvec)
 
-    @classmethod
-    def _read_spikes_sonata(cls, filename, population):
+    @staticmethod
+    def _open_sonata_population(filename, population):
         import libsonata
         spikes_file = libsonata.SpikeReader(filename)
         if population not in spikes_file.get_population_names():
             raise MissingSpikesPopulationError("Spikes population not found: " + population)
-        spikes = spikes_file[population]
-        spike_dict = spikes.get_dict()
+        return spikes_file[population]
+
+    @classmethod
+    def _read_spikes_sonata(cls, filename, population, gids=None):
+        spikes = cls._open_sonata_population(filename, population)
+        if gids is None:
+            spike_dict = spikes.get_dict()
+        else:
+            # Only the requested node_ids (0-based) are read, not the whole dataset
+            spike_dict = spikes.get_dict(node_ids=(gids.astype("uint64") - 1).tolist())
         return spike_dict["timestamps"], spike_dict["node_ids"] + 1
 
     @classmethod
-    def _read_spikes_ascii(cls, filename):
+    def _read_spikes_ascii(cls, filename, gids=None):
         log_verbose("Reading ascii spike file %s", filename)
-        # first line is '/scatter'
-        spikes = numpy.loadtxt(filename, dtype=cls._ascii_spike_dtype, skiprows=1, ndmin=1)
+        if gids is None:
+            # first line is '/scatter'
+            spikes = numpy.loadtxt(filename, dtype=cls._ascii_spike_dtype, skiprows=1, ndmin=1)
+        else:
+            # Parse the file in chunks, keeping only the events of the requested gids
+            chunks = []
+            with open(filename) as spikes_file:
+                next(spikes_file, None)  # first line is '/scatter'
+                while True:
+                    lines = list(itertools.islice(spikes_file, cls._read_chunk_size))
+                    if not lines:
+                        break
+                    chunk = numpy.loadtxt(lines, dtype=cls._ascii_spike_dtype, ndmin=1)
+                    chunks.append(chunk[numpy.isin(chunk["gid"], gids)])
+            spikes = (numpy.concatenate(chunks) if chunks
+                      else numpy.empty(0, dtype=cls._ascii_spike_dtype))
 
         if len(spikes) > 0:
             log_verbose("Loaded %d spikes", len(spikes))
@@ -81,17 +136,73 @@ class SpikeManager:
 
         return spikes["time"], spikes["gid"]
 
-    @staticmethod
-    def _read_spikes_binary(filename):
+    @classmethod
+    def _open_ascii_sidecar(cls, filename, cache_dir=None):
+        """Memory-maps the binary sidecar of an ascii spike file, creating it if needed (rank 0).
+
+        The sidecar holds the unique (sorted) gids, the spike times sorted by gid and time,
+        and the offsets of the times of each gid. Files are keyed by the spike file path, size
+        and mtime, so they are recreated whenever the spike file changes.
+
+        Args:
+            filename: the ascii spike file
+            cache_dir: directory where to keep the sidecar. Default: next to the spike file
+
+        Returns:
+            A tuple (gids, times, offsets) of read-only arrays, or None if the sidecar could
+            not be created, e.g. in a read-only location.
+        """
+        stat = os.stat(filename)
+        key = hashlib.sha1("{}:{}:{}".format(
+            os.path.abspath(filename), stat.st_size, stat.st_mtime_ns
+        ).encode()).hexdigest()
+        prefix = filename if cache_dir is None \
+            else os.path.join(cache_dir, os.path.basename(filename))
+        sidecar_files = ["{}.{}.{}.npy".format(prefix, key[:12], name)
+                         for name in cls._ascii_sidecar_arrays]
+
+        available = 0
+        if MPI.rank == 0:
+            try:
+                cls._create_ascii_sidecar(filename, sidecar_files)
+                available = 1
+            except OSError as e:  # e.g. PermissionError
+                logging.warning("Could not create spikes sidecar, reading text file: %s", e)
+        # Rank 0 decides. The reduction also ensures the files are ready for all ranks
+        if not MPI.allreduce(available, MPI.SUM):
+            return None
+
+        log_verbose("Mapping spikes sidecar of %s", filename)
+        return tuple(numpy.load(f, mmap_mode="r") for f in sidecar_files)
+
+    @classmethod
+    def _create_ascii_sidecar(cls, filename, sidecar_files):
+        """Writes the sidecar files of an ascii spike file, unless present"""
+        if all(os.path.isfile(f) for f in sidecar_files):
+            return
+        tvec, gidvec = cls._read_spikes_ascii(filename)
+        order = numpy.lexsort((tvec, gidvec))
+        gids, starts = numpy.unique(gidvec[order], return_index=True)
+        offsets = numpy.append(starts, len(order)).astype("int64")
+        sidecar_dir = os.path.dirname(sidecar_files[0]) or "."
+        os.makedirs(sidecar_dir, exist_ok=True)
+        for data, sidecar_file in zip((gids, tvec[order], offsets), sidecar_files):
+            # Unique temporary names: concurrent runs might be creating the same sidecar
+            with tempfile.NamedTemporaryFile(dir=sidecar_dir, suffix=".tmp",
+                                             delete=False) as tmp_f:
+                numpy.save(tmp_f, data)
+            os.replace(tmp_f.name, sidecar_file)  # atomic, concurrent runs might be reading
+        log_verbose("Created spikes sidecar for %s", filename)
+
+    @classmethod
+    def _read_spikes_binary(cls, filename, gids=None):
         """Read in the binary file with spike events.
 
         Format notes: The first half of file is interpreted as double precision time values
         followed by an equal number of double precision gid values.
         File must be produced on the same architecture where NEURON will run (i.e. no byte-swapping)
-        Read the data on the root node, broadcasting info - This is fine as long as the entire data
-        set fits in a single node's memory. Should it become significantly larger, this could be
-        replaced with a distributed model where each node loads a portion of the file, and exchanges
-        with other nodes so as to ultimately hold data for local gids.
+        When gids are given, the file is memory-mapped and filtered chunk-wise, so that each
+        rank only keeps the events of its own gids.
         """
         log_verbose("Reading Binary spike file %s", filename)
         # there *should* be a number of doubles (8 bytes) such that
@@ -102,9 +213,23 @@ class SpikeManager:
         if not filesize % 16:
             logging.warning("File size doesn't conform to have same number of gids and times")
 
-        with open(filename, "rb") as reader:
-            tvec = numpy.fromfile(reader, "d", n_events)
-            gidvec = numpy.fromfile(reader, "d", n_events).astype("uint32")
+        if gids is None:
+            with open(filename, "rb") as reader:
+                tvec = numpy.fromfile(reader, "d", n_events)
+                gidvec = numpy.fromfile(reader, "d", n_events).astype("uint32")
+        elif n_events == 0:
+            tvec, gidvec = numpy.empty(0, "d"), numpy.empty(0, "uint32")
+        else:
+            tvec_all = numpy.memmap(filename, "d", "r", shape=(n_events,))
+            gidvec_all = numpy.memmap(filename, "d", "r", offset=n_events * 8, shape=(n_events,))
+            tvec_parts, gidvec_parts = [], []
+            for start in range(0, n_events, cls._read_chunk_size):
+                chunk_gids = gidvec_all[start:start + cls._read_chunk_size].astype("uint32")
+                mask = numpy.isin(chunk_gids, gids)
+                gidvec_parts.append(chunk_gids[mask])
+                tvec_parts.append(tvec_all[start:start + cls._read_chunk_size][mask])
+            tvec, gidvec = numpy.concatenate(tvec_parts), numpy.concatenate(gidvec_parts)
+            del tvec_all, gidvec_all
 
         log_verbose("Replay: Loaded %d spikes", len(tvec))
 
@@ -114,9 +239,31 @@ class SpikeManager:
     def _store_events(self, tvec, gidvec):
         """Stores the events in the _gid_fire_events GroupedMultiMap.
 
-        tvec and gidvec arguments should be numpy arrays
+        tvec and gidvec arguments should be numpy arrays.
+        Events are sorted by gid and then time, so that the spikes of each gid are sorted
+        """
+        order = numpy.lexsort((tvec, gidvec))
+        self._store_map(GroupedMultiMap(gidvec[order], tvec[order], presorted=True))
+
+    def _store_grouped_events(self, all_gids, times, offsets, delay=0, gids=None):
+        """Stores events already grouped by gid, as in the ascii sidecar.
+
+        The spikes of each gid are views of times, so mapped data is not copied, unless
+        there is a delay to apply.
         """
-        spike_map = GroupedMultiMap(gidvec, tvec)
+        idx = numpy.arange(len(all_gids))
+        if gids is not None:
+            idx = numpy.searchsorted(all_gids, gids)
+            found = idx < len(all_gids)
+            idx, gids = idx[found], gids[found]
+            idx = idx[all_gids[idx] == gids]
+        groups = [times[offsets[i]:offsets[i + 1]] for i in idx.tolist()]
+        if delay:
+            groups = [spikes + delay for spikes in groups]
+        log_verbose("Loaded %d spikes", sum(len(spikes) for spikes in groups))
+        self._store_map(GroupedMultiMap.from_groups(numpy.asarray(all_gids[idx]), groups))
+
+    def _store_map(self, spike_map):
         if self._gid_fire_events is None:
             self._gid_fire_events = spike_map
         else:
@@ -132,9 +279,39 @@ class SpikeManager:
         return gid in self._gid_fire_events
 
     def get_map(self):
-        """Returns the :py:class:`GroupedMultiMap` with all the spikes."""
+        """Returns the :py:class:`GroupedMultiMap` with all the spikes.
+
+        When streaming, it holds the spikes of the last window, with all the given gids as keys
+        """
         return self._gid_fire_events
 
+    def get_window(self, gid, tstart, tstop):
+        """Retrieves the (sorted) spike times of a gid within [tstart, tstop)
+
+        When streaming, the spikes of all gids within the window are read at the first call
+        for the window, releasing those of the previous one.
+        """
+        if self._window_source is not None and self._window != (tstart, tstop):
+            self._load_window(tstart, tstop)
+        times = self._gid_fire_events.get(gid)
+        if not len(times):
+            return numpy.empty(0)
+        return times[numpy.searchsorted(times, tstart):numpy.searchsorted(times, tstop)]
+
+    def _load_window(self, tstart, tstop):
+        spikes, node_ids, delay = self._window_source
+        spike_dict = spikes.get_dict(node_ids=node_ids, tstart=tstart - delay,
+                                     tstop=tstop - delay)
+        tvec, gidvec = spike_dict["timestamps"], spike_dict["node_ids"] + 1
+        if delay:
+            tvec += delay
+        mask = (tvec >= tstart) & (tvec < tstop)  # whatever the bounds handling of the reader
+        order = numpy.lexsort((tvec[mask], gidvec[mask]))
+        self._gid_fire_events = GroupedMultiMap(gidvec[mask][order], tvec[mask][order],
+                                                presorted=True)
+        self._window = (tstart, tstop)
+        log_verbose("Replay: Loaded %d spikes within [%g, %g)", len(order), tstart, tstop)
+
     def filter_map(self, pre_gids):
         """Returns a raw dict of pre_gid->spikes for the given pre gids."""
         return {key: self._gid_fire_events[key] for key in pre_gids}
@@ -269,45 +269,75 @@ class TargetManager:
         :param offset: Offset distance beyond the ipt (microns)
         :return: List with 1 item, where the synapse should go
         """
-        # Soma connection, just zero it
-        if offset < 0:
-            offset = 0
-
+        sections, distances = self.locations_to_points(gid, [isec], [ipt], [offset])
         result_point = TPointList(gid)
+        result_point.append(sections[0], distances[0] if sections[0] is not None else -1)
+        return result_point
+
+    def locations_to_points(self, gid, isec, ipt, offset):
+        """
+        Batched version of location_to_point, resolving all the locations of a cell at once.
+        Sections are looked up once per distinct isec, and distances are computed
+        with numpy from the (cached) section arc-length tables.
+
+        :param gid: GID of the cell
+        :param isec: Array of section indices
+        :param ipt: Array of segment ids (-1 when offset is a precomputed distance)
+        :param offset: Array of offset distances beyond the ipt (microns)
+        :return: A tuple (sections, distances): a list of SectionRef objects (None when
+            the section is not available, e.g. LoadBalance, or deleted) and a numpy array
+        """
         cell_sections = self.gid_to_sections(gid)
         if not cell_sections:
             raise Exception("Getting locations for non-bg sims is not implemented yet...")
 
-        if isec >= cell_sections.num_sections:
-            raise Exception(f"Error: section {isec} out of bounds ({cell_sections.num_sections} "
-                            "total). Morphology section count is low, is this a good morphology?")
-
-        distance = 0.5
-        tmp_section = cell_sections.isec2sec[int(isec)]
-
-        if tmp_section is None:  # Assume we are in LoadBalance mode
-            result_point.append(None, -1)
-        elif ipt == -1:
-            # Sonata spec have a pre-calculated distance field.
-            # In such cases, segment (ipt) is -1 and offset is that distance.
-            offset = max(min(offset, 0.9999999), 0.0000001)
-            result_point.append(tmp_section, offset)
-        else:
-            # Adjust for section orientation and calculate distance
-            section = tmp_section.sec
-            if section.orientation() == 1:
-                ipt = section.n3d() - 1 - ipt
-                offset = -offset
-
-            if ipt < section.n3d():
-                distance = (section.arc3d(int(ipt)) + offset) / section.L
-                distance = max(min(distance, 0.9999999), 0.0000001)
-
-            if section.orientation() == 1:
-                distance = 1 - distance
-
-            result_point.append(tmp_section, distance)
-        return result_point
+        isec = numpy.asarray(isec, dtype="int64")
+        ipt = numpy.asarray(ipt, dtype="int64")
+        offset = numpy.maximum(numpy.asarray(offset, dtype="float64"), 0)  # Soma: zero it
+        distances = numpy.full(len(isec), 0.5)
+        sections = [None] * len(isec)
+        if not len(isec):
+            return sections, distances
+
+        max_isec = isec.max()
+        if max_isec >= cell_sections.num_sections:
+            raise Exception(f"Error: section {max_isec} out of bounds "
+                            f"({cell_sections.num_sections} total). "
+                            "Morphology section count is low, is this a good morphology?")
+
+        for sec_i in numpy.unique(isec):
+            tmp_section = cell_sections.isec2sec[sec_i]
+            if tmp_section is None or not tmp_section.exists():
+                continue  # Assume we are in LoadBalance mode
+            idx = numpy.flatnonzero(isec == sec_i)
+            for i in idx:
+                sections[i] = tmp_section
+            distances[idx] = self._section_distances(
+                cell_sections.arc_table(sec_i), ipt[idx], offset[idx])
+
+        return sections, distances
+
+    @staticmethod
+    def _section_distances(arc_table, ipt, offset):
+        """Computes the normalized distances of (ipt, offset) points in a section"""
+        arc3d, length, reversed_ = arc_table
+        distance = numpy.full(len(ipt), 0.5)
+        # Sonata spec have a pre-calculated distance field.
+        # In such cases, segment (ipt) is -1 and offset is that distance.
+        precomputed = ipt == -1
+        distance[precomputed] = offset[precomputed]
+        # Otherwise adjust for section orientation and calculate distance
+        segmented = ~precomputed
+        n3d = len(arc3d)
+        if reversed_:
+            ipt = n3d - 1 - ipt
+            offset = -offset
+        valid = segmented & (ipt >= 0) & (ipt < n3d)
+        distance[valid] = (arc3d[ipt[valid]] + offset[valid]) / length
+        distance = numpy.clip(distance, 0.0000001, 0.9999999)
+        if reversed_:
+            distance[segmented] = 1 - distance[segmented]
+        return distance
 
 
 class NodeSetReader:
@@ -601,6 +631,8 @@ class SerializedSections:
         self.isec2sec = [None] * self.num_sections
         # Flag to control warning message display
         self._serialized_sections_warned = False
+        # Lazily computed (arc3d, L, reversed) tables of each section
+        self._arc_tables = {}
 
         index = 0
         for sec in cell.all:
@@ -619,6 +651,19 @@ class SerializedSections:
                 self.isec2sec[int(v_value)] = Nd.SectionRef(sec=sec)
             index += 1
 
+    def arc_table(self, isec):
+        """Retrieves the arc-length table of a section, as a tuple (arc3d, L, reversed),
+        where arc3d is a numpy array with the arc length of each 3D point.
+        """
+        table = self._arc_tables.get(isec)
+        if table is None:
+            section = self.isec2sec[isec].sec
+            arc3d = numpy.fromiter((section.arc3d(i) for i in range(int(section.n3d()))),
+                                   dtype="float64")
+            table = (arc3d, section.L, section.orientation() == 1)
+            self._arc_tables[isec] = table
+        return table
+
 
 class TPointList:
     def __init__(self, gid):
@@ -110,6 +110,15 @@ class GroupedMultiMap(MultiMap):
         MultiMap.__init__(self, np_keys, values, presorted)
         self._keys, self._values = self._duplicates_to_list(self._keys, self._values)
 
+    @classmethod
+    def from_groups(cls, np_keys, groups):
+        """Creates a map from unique, sorted keys and their respective groups of values.
+        The groups are kept as given (e.g. views of a larger array), without copies.
+        """
+        obj = cls.__new__(cls)
+        MultiMap.__init__(obj, np_keys, groups, presorted=True)
+        return obj
+
     @staticmethod
     def _duplicates_to_list(np_keys, values):
         np_keys, indexes = np.unique(np_keys, return_index=True)
@@ -39,6 +39,29 @@ def test_morphio_read(morphologies_root, Cell):
     assert len(list(c.h.axonal)) == 3
 
 
+def test_morphio_instantiate(morphologies_root, Cell):
+    from neuron import h
+    from neurodamus.morphio_wrapper import MorphIOWrapper
+    morphology_path = str(morphologies_root / "C060114A7.h5")
+    c = Cell(1, morphology_path)  # bulk instantiation
+    c_hoc = Cell(2)
+    h.execute_commands_from_pylist(c_hoc.h, MorphIOWrapper(morphology_path).morph_as_hoc())
+
+    sections, hoc_sections = list(c.all), list(c_hoc.all)
+    assert len(sections) == len(hoc_sections) == 325
+    for sec, hoc_sec in zip(sections, hoc_sections):
+        assert sec.name().split(".")[-1] == hoc_sec.name().split(".")[-1]
+        assert sec.n3d() == hoc_sec.n3d()
+        for i in range(sec.n3d()):
+            assert (sec.x3d(i), sec.y3d(i), sec.z3d(i), sec.diam3d(i)) == \
+                (hoc_sec.x3d(i), hoc_sec.y3d(i), hoc_sec.z3d(i), hoc_sec.diam3d(i))
+        parent, hoc_parent = sec.parentseg(), hoc_sec.parentseg()
+        assert (parent is None) == (hoc_parent is None)
+        if parent is not None:
+            assert parent.sec.name().split(".")[-1] == hoc_parent.sec.name().split(".")[-1]
+            assert parent.x == hoc_parent.x
+
+
 def test_create_cell(Cell):
     builder = Cell.Builder
     c = (builder
@@ -0,0 +1,41 @@
+import numpy.testing as npt
+import unittest.mock
+
+
+class DummyNeurodamus:
+    """ Fake Neurodamus core, recording the emodel templates loaded
+    """
+    EModelA_NeededAttributes = "AIS_scaler;soma_scaler"
+    EModelB_NeededAttributes = "soma_scaler"
+
+    def __init__(self):
+        self.h = unittest.mock.Mock()
+
+
+class DummyDynamicsReader:
+    """ Fake libsonata node population, recording the dynamics attributes read
+    """
+    _dynamics = {"AIS_scaler": [1., 2., 3., 4.], "soma_scaler": [10., 20., 30., 40.]}
+
+    def __init__(self):
+        self.read_attrs = []
+
+    def get_dynamics_attribute(self, name, selection):
+        self.read_attrs.append(name)
+        return [self._dynamics[name][i] for i in selection]
+
+
+def test_get_needed_attributes():
+    from neurodamus.io.cell_readers import _getNeededAttributes
+    node_reader = DummyDynamicsReader()
+    fake_nd = DummyNeurodamus()
+    emodels = ["EModelA", "EModelB", "EModelC", "EModelA"]
+
+    with unittest.mock.patch("neurodamus.io.cell_readers.Nd", fake_nd):
+        add_params_list = _getNeededAttributes(node_reader, "/emodels", emodels, [0, 1, 2, 3])
+
+    assert add_params_list == [[1., 10.], [20.], [], [4., 40.]]
+    # Templates loaded and attributes read only once
+    npt.assert_equal([call.args[0] for call in fake_nd.h.load_file.call_args_list],
+                     ["/emodels/EModelA.hoc", "/emodels/EModelB.hoc", "/emodels/EModelC.hoc"])
+    assert node_reader.read_attrs == ["AIS_scaler", "soma_scaler"]
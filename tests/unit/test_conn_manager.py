@@ -137,3 +137,153 @@ def test_population_ids_match():
     assert not pop.ids_match(1, 1)
     assert not pop.ids_match(1, None)
     assert not pop.ids_match(None, 1)
+
+
+def test_population_sgids_cache():
+    pop = _create_population([(1, 0), (3, 0), (5, 0)])
+    # Absent sgids are not matched, and deleting them leaves the population intact
+    assert [c.sgid for c in pop.get_connections(0, [2, 3, 6])] == [3]
+    pop.delete_group(0, [2, 4])
+    assert pop.count() == 3
+    # Cached sgids follow modifications
+    pop.store_connection(_FakeConn(2, 0))
+    assert [c.sgid for c in pop.get_connections(0, [2, 3])] == [2, 3]
+    pop.delete(3, 0)
+    assert [c.sgid for c in pop.get_connections(0, [2, 3])] == [2]
+
+
+def test_population_get_create_conns_bulk():
+    pop = _create_population([(1, 0), (5, 0)])
+    pop._conn_factory = lambda sgid, tgid, *_, **kw: _FakeConn(sgid, tgid)
+    conns = pop.get_or_create_connections([3, 1, 3, 7], 0)
+    assert [c.sgid for c in conns] == [3, 1, 3, 7]
+    assert conns[0] is conns[2]
+    assert conns[1] is pop.get_connection(1, 0)
+    assert [c.sgid for c in pop[0]] == [1, 3, 5, 7]
+    assert pop.count() == 4
+    # Per-connection kwargs are taken from the first occurrence of each new sgid
+    pop._conn_factory = mock.Mock(side_effect=lambda sgid, tgid, *_, **kw: _FakeConn(sgid, tgid))
+    pop.get_or_create_connections([9, 9, 1], 2, {"synapses_offset": [10, 20, 30]}, weight=2)
+    assert pop._conn_factory.call_args_list == [
+        mock.call(1, 2, 0, 0, weight=2, synapses_offset=30),
+        mock.call(9, 2, 0, 0, weight=2, synapses_offset=10),
+    ]
+
+
+@pytest.mark.parametrize(("test_input", "expected"), [
+    (([1],), [(1, 0), (1, 1), (1, 2)]),
+    (([0, 1],), [(0, 0), (1, 0), (0, 1), (1, 1), (1, 2)]),
+    (([1, 5], [2, 1]), [(1, 1), (1, 2)]),
+    (([5],), []),
+    (([], [0]), []),
+])
+def test_population_get_connections_from(test_input, expected):
+    pop = _create_population([(1, 0), (1, 2), (1, 1), (0, 0), (0, 1)])
+    conns = pop.get_connections_from(*test_input)
+    assert [(conn.sgid, conn.tgid) for conn in conns] == expected
+    # Index is rebuilt after modifications
+    pop.store_connection(_FakeConn(5, 0))
+    assert len(pop.get_connections_from([5])) == 1
+
+
+def test_population_sgid_index_incremental(monkeypatch):
+    import numpy
+    pop = ConnectionSet(0, 0, conn_factory=_FakeTableConn)
+    n_tgids, n_sgids = 20, 64
+    for tgid in range(n_tgids):
+        sgids = numpy.arange(n_sgids)
+        pop.add_pending_connections(tgid, sgids, sgids, sgids + 1, numpy.arange(n_sgids),
+                                    _add_fake_synapses)
+    sorted_count = []
+    sorted_index_run = ConnectionSet._sorted_index_run
+    monkeypatch.setattr(ConnectionSet, "_sorted_index_run", staticmethod(
+        lambda conns, *args: sorted_count.append(len(conns)) or sorted_index_run(conns, *args)))
+
+    # Each call creates the connections from a few more sources
+    index = None
+    for sgid in range(n_sgids):
+        conns = pop.get_connections_from([sgid])
+        assert [(c.sgid, c.tgid) for c in conns] == [(sgid, tgid) for tgid in range(n_tgids)]
+        index = index or pop._sgid_index
+        assert pop._sgid_index is index  # never rebuilt, only extended
+    assert len(index) <= numpy.log2(n_tgids * n_sgids) + 1
+    # Amortized sorting (binary counter merges), not a full index rebuild per call
+    assert sum(sorted_count) <= n_tgids * n_sgids * (numpy.log2(n_sgids) + 2)
+    assert sum(sorted_count) < n_tgids * n_sgids * n_sgids // 4
+    assert pop.source_gids().tolist() == list(range(n_sgids))
+    conns = pop.get_connections_from([3, 7], [2, 5])
+    assert [(c.sgid, c.tgid) for c in conns] == [(3, 2), (7, 2), (3, 5), (7, 5)]
+
+    # Deleting connections drops the index
+    pop.delete_group([2], [3])
+    assert pop._sgid_index is None
+    assert [c.tgid for c in pop.get_connections_from([3])] == [t for t in range(n_tgids) if t != 2]
+
+
+class _FakeTableConn(_FakeConn):
+    def __init__(self, sgid, tgid, _src_id, _dst_id, weight_factor=1.0, synapses_offset=0):
+        super().__init__(sgid, tgid)
+        self.weight_factor = weight_factor
+        self.synapses_offset = synapses_offset
+        self.locked = False
+        self.synapses = []
+        self.configurations = []
+
+
+def _add_fake_synapses(conn, syns_params, syn_type_restrict=None, base_id=0):
+    conn.synapses.extend(syns_params.tolist())
+
+
+def test_population_pending_connections():
+    import numpy
+    pop = ConnectionSet(0, 0, conn_factory=_FakeTableConn)
+    pop.add_pending_connections(0, [1, 3, 5], [0, 2, 3], [2, 3, 5], numpy.arange(5),
+                                _add_fake_synapses, synapses_offsets=numpy.array([10, 20, 30]),
+                                weight_factor=2)
+    assert pop.count() == 3
+    assert 0 in pop
+    assert list(pop.target_gids()) == [0]
+    assert pop.source_gids().tolist() == [1, 3, 5]
+    assert not pop._connections_map  # nothing created so far
+
+    conn = pop.get_connection(3, 0)
+    assert (conn.synapses, conn.weight_factor, conn.synapses_offset) == ([2], 2.0, 20)
+    assert len(pop._connections_map[0]) == 1
+
+    # Configuration of pending connections is applied on creation
+    n_configured = pop.configure([0], [3, 5], {"weight_factor": 3, "minis_spont_rate": .1},
+                                 lambda conn: conn.configurations.append("cfg"))
+    assert n_configured == 2
+    conns = list(pop.all_connections())
+    assert [c.sgid for c in conns] == [1, 3, 5]
+    assert [c.weight_factor for c in conns] == [2.0, 3, 3.0]
+    assert conns[0].synapses == [0, 1] and conns[2].synapses == [3, 4]
+    assert not hasattr(conns[0], "minis_spont_rate")
+    assert conns[1].minis_spont_rate == conns[2].minis_spont_rate == .1
+    assert [c.configurations for c in conns] == [[], ["cfg"], ["cfg"]]
+    assert pop.count() == 3
+
+
+def test_population_pending_lock_delete():
+    import numpy
+    pop = ConnectionSet(0, 0, conn_factory=_FakeTableConn)
+    params = numpy.arange(10)
+    pop.add_pending_connections(0, [1, 2], [0, 1], [1, 2], params, _add_fake_synapses, lock=True)
+    # Synapses are not added to locked connections, which get created
+    pop.add_pending_connections(0, [2, 4], [2, 3], [3, 4], params, _add_fake_synapses, lock=True)
+    assert [c.sgid for c in pop._connections_map[0]] == [2]
+    assert pop.count() == 3
+    pop.delete_group(0, [1])
+    assert pop.count() == 2
+    assert pop._connections_map[0][0].synapses == [1]
+
+    pop.unlock_all()
+    pop.add_pending_connections(0, [4], [5], [6], params, _add_fake_synapses, lock=True)
+    # Unsorted sgids are created straight away
+    pop.add_pending_connections(1, [3, 2], [6, 7], [7, 8], params, _add_fake_synapses)
+    assert [c.sgid for c in pop._connections_map[1]] == [2, 3]
+    assert [(c.sgid, c.synapses, c.locked) for c in pop[0]] == [(2, [1], False),
+                                                                (4, [3, 5], True)]
+    assert pop.count() == 4
+    pop.delete(4, 0)
+    assert pop.count() == 3
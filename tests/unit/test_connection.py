@@ -0,0 +1,217 @@
+import pytest
+from types import SimpleNamespace
+
+
+@pytest.mark.parametrize(("config", "expected"), [
+    ("%s.NMDA_ratio = 1.22", [("NMDA_ratio", "=", 1.22)]),
+    ("%s.e_GABAA = -80.0 %s.Use *= 0.5", [("e_GABAA", "=", -80.), ("Use", "*=", .5)]),
+    ("%s.tau_d_AMPA=1e1; %s.u0 += .1;", [("tau_d_AMPA", "=", 10.), ("u0", "+=", .1)]),
+    ("", []),
+    ("%s.Use = %s.Use * 2", None),
+    ("cao_CR_GluSynapse = 1.2", None),
+    ("%s.Use = 1 %s.u0 = 2 * 2", None),
+])
+def test_compile_configuration(config, expected):
+    from neurodamus.connection import Connection
+    statements = Connection._compile_configuration(config)
+    if expected is None:
+        assert statements is None
+    else:
+        ops = Connection._config_operators
+        assert statements == [(attr, ops[op], value) for attr, op, value in expected]
+
+
+def test_configure_compiled():
+    from neurodamus.connection import Connection
+    from neurodamus.core.configuration import ConfigurationError
+    conn = Connection.__new__(Connection)
+    conn._synapses = []
+    synapses = [SimpleNamespace(Use=0.5, u0=0.), SimpleNamespace(Use=0.25, u0=1.)]
+    conn._configure(synapses, "%s.Use *= 2 %s.u0 = 3")
+    assert [(syn.Use, syn.u0) for syn in synapses] == [(1., 3.), (.5, 3.)]
+
+    with pytest.raises(ConfigurationError):
+        conn._configure(synapses, "%s.tau_r_GABAA *= 2")
+
+
+def test_create_synapse_helpers(monkeypatch):
+    import numpy
+    from neurodamus.connection import Connection
+    monkeypatch.setattr(Connection, "_synapse_has_conductance_cache", {})
+
+    class _Helper:
+        def __init__(self, tgid, params, x, syn_id, base_seed, *add_params):
+            self.synapse = SimpleNamespace(conductance=0., NMDA_ratio=0., GABAB_ratio=0.)
+            self.args = (tgid, x, syn_id, base_seed, add_params)
+
+    class _InhHelper(_Helper):
+        pass
+
+    conn = Connection.__new__(Connection)
+    conn._synapses = []
+    conn.tgid = 2
+    conn._src_pop_id, conn._dst_pop_id = 0, 1
+    conn._mod_override = None
+    monkeypatch.setattr(Connection, "_AMPANMDA_Helper", _Helper)
+    monkeypatch.setattr(Connection, "_GABAAB_Helper", _InhHelper)
+    cell = SimpleNamespace(CellRef=SimpleNamespace(synHelperList=[], synlist=[]))
+    params = numpy.rec.fromarrays([[10, 120], [.5, .7], [1.5, -1]],
+                                  names="synType,weight,conductance_ratio")
+
+    helpers = conn._synapse_helpers()
+    syn_inh = conn._create_synapse(cell, params[0], .5, 7, 0, helpers)
+    syn_exc = conn._create_synapse(cell, params[1], .5, 8, 0, helpers)
+    assert [type(h) for h in cell.CellRef.synHelperList] == [_InhHelper, _Helper]
+    assert cell.CellRef.synHelperList[0].args == (2, .5, 7, 0, (0, 1))
+    assert cell.CellRef.synlist == [syn_inh, syn_exc]
+    assert (syn_inh.conductance, syn_inh.GABAB_ratio) == (.5, 1.5)
+    assert (syn_exc.conductance, syn_exc.NMDA_ratio) == (.7, 0.)  # negative ratio: not set
+    assert Connection._synapse_has_conductance_cache == {"GABAABHelper": True,
+                                                         "AMPANMDAHelper": True}
+    Connection.clear_cache()
+    assert Connection._synapse_has_conductance_cache == {}
+
+
+def test_attach_source_cells(monkeypatch):
+    import numpy
+    from neurodamus.connection import Connection
+    monkeypatch.setattr(Connection, "netcon_set_type", classmethod(lambda *_: None))
+    monkeypatch.setattr(Connection, "_pc", SimpleNamespace(
+        gid_connect=lambda sgid, syn: SimpleNamespace(sgid=sgid, syn=syn, weight=[0.])),
+        raising=False)
+    conn = Connection.__new__(Connection)
+    conn._synapses = []
+    conn.sgid = 4
+    conn.weight_factor = 2.
+    conn.syndelay_override = None
+    conn._netcons = []
+    conn._synapse_params = numpy.rec.fromarrays([[.5, .7, .9], [1., 2., 3.]],
+                                                names="weight,delay")
+    conn._attach_source_cells(["syn0", "syn2"], [0, 2])
+    assert [(nc.sgid, nc.syn, nc.delay, nc.weight[0]) for nc in conn._netcons] == [
+        (4, "syn0", 1., 1.), (4, "syn2", 3., 1.8)]
+
+
+def test_add_synapses_compact(monkeypatch):
+    import numpy
+    from neurodamus.connection import Connection
+    monkeypatch.setattr(Connection, "_init_hmod", classmethod(lambda cls: None))
+    monkeypatch.setattr("neurodamus.connection.Nd", SimpleNamespace(Vector=lambda: None))
+
+    class _SectionRef:
+        def __init__(self, name):
+            self.sec = name
+
+        def exists(self):
+            return True
+
+    cell_sections = SimpleNamespace(isec2sec=[_SectionRef("soma"), _SectionRef("dend")])
+    target_manager = SimpleNamespace(
+        gid_to_sections=lambda gid: cell_sections,
+        locations_to_points=lambda gid, isec, ipt, offset: (
+            [cell_sections.isec2sec[i] if i < 2 else None for i in isec], [.1, .5, .3][:len(isec)]
+        ),
+    )
+    params = numpy.rec.fromarrays([[1, 2, 0], [0, 0, 0], [0., 0., 0.], [0., 0., 0.]],
+                                  names="isec,ipt,offset,location")
+    conn = Connection(1, 2)
+    assert conn._synapse_sections is None and conn._configurations is None
+    conn.add_synapses(target_manager, params, base_id=10)
+    # The skipped synapse on a non-existing section is dropped
+    assert conn._synapse_sections is None
+    assert list(conn.sections_with_synapses) == [(0, "dend"), (1, "soma")]
+    numpy.testing.assert_allclose(conn.synapse_points_x, [.1, .3])
+    numpy.testing.assert_equal(conn._synapse_ids, [10, 12])
+
+    conn = Connection(1, 2)
+    conn.add_synapses(target_manager, params[[0, 2]], base_id=0)
+    assert conn._synapse_ids == range(0, 2)
+
+
+def test_replay_shared_sources(monkeypatch):
+    import numpy
+    from unittest.mock import MagicMock, Mock
+    from neurodamus.connection import ArtificialStim, ReplaySources, ReplayStim
+    monkeypatch.setattr(ArtificialStim, "_bbss", Mock())
+    monkeypatch.setattr("neurodamus.connection.Nd", SimpleNamespace(
+        Vector=list, VecStim=lambda sec=None: Mock(), NetCon=lambda *_, **kw: MagicMock()))
+
+    sources = ReplaySources()
+    stims = [ReplayStim(sources) for _ in range(3)]
+    stims[0].add_spikes(numpy.array([5., 1.]))
+    stims[1].add_spikes(numpy.array([1.]))
+    stims[1].add_spikes(numpy.array([5.]))
+    stims[2].add_spikes(numpy.array([1., 5.]))
+    conns = [SimpleNamespace(sgid=sgid, tgid=10, syndelay_override=None, weight_factor=1.,
+                             netcon_set_type=Mock()) for sgid in (1, 1, 2)]
+    syn_params = SimpleNamespace(delay=.1, weight=1.)
+    for stim, conn in zip(stims, conns):
+        for _ in range(2):  # two synapses
+            stim.create_on(conn, None, Mock(), syn_params)
+
+    assert len(sources) == 2
+    assert stims[0]._vecstim is stims[1]._vecstim
+    assert stims[0]._vecstim is not stims[2]._vecstim
+    assert all(len(stim.netcons) == 2 and not stim.netstims for stim in stims)
+    assert all(stim._spikes is None and stim.time_vec == [1., 5.] for stim in stims)
+    assert stims[0].time_vec is stims[1].time_vec  # a single Vector, no per-connection copy
+    assert all(len(key[2]) == 20 for key in sources._vecstims)  # keyed by times digest
+    sources.restart_events()
+    assert stims[0]._vecstim.restartEvent.call_count == 1
+
+    # Without a pool, the stim holds its own Vector (VecStim only keeps a pointer)
+    stim = ReplayStim()
+    stim.add_spikes(numpy.array([3., 2.]))
+    stim.create_on(conns[0], None, Mock(), syn_params)
+    stim.create_on(conns[0], None, Mock(), syn_params)
+    assert stim.netstims == [stim._vecstim]
+    stim._vecstim.play.assert_called_once_with(stim.time_vec)
+    assert stim.time_vec == [2., 3.] and len(stim) == 2
+
+
+def test_replay_streaming_sources(monkeypatch):
+    import numpy
+    from unittest.mock import MagicMock, Mock
+    from neurodamus.connection import ArtificialStim, ReplaySources, ReplayStim
+    from neurodamus.replay import SpikeManager
+
+    class _Vector(list):
+        size = list.__len__
+
+        def from_python(self, arr):
+            self[:] = arr.tolist()
+
+    monkeypatch.setattr(ArtificialStim, "_bbss", Mock())
+    monkeypatch.setattr("neurodamus.connection.Nd", SimpleNamespace(
+        Vector=_Vector, VecStim=lambda sec=None: Mock(), NetCon=lambda *_, **kw: MagicMock()))
+
+    spike_manager = SpikeManager.__new__(SpikeManager)
+    spike_manager._gid_fire_events = None
+    spike_manager._window_source = None
+    spike_manager._store_events(numpy.array([30., 5., 12., 1., 26.]),
+                                numpy.array([1, 1, 1, 2, 2], dtype="uint32"))
+    assert spike_manager.get_window(1, 0, 25).tolist() == [5., 12.]
+    assert len(spike_manager.get_window(3, 0, 25)) == 0
+
+    sources = ReplaySources(streaming=True)
+    stims = [ReplayStim(sources) for _ in range(3)]
+    for stim in stims:
+        stim.add_spikes(numpy.empty(0))
+    conns = [SimpleNamespace(sgid=sgid, tgid=10, syndelay_override=None, weight_factor=1.,
+                             netcon_set_type=Mock()) for sgid in (101, 101, 102)]
+    syn_params = SimpleNamespace(delay=.1, weight=1.)
+    for stim, conn in zip(stims, conns):
+        stim.create_on(conn, None, Mock(), syn_params)
+    assert len(sources) == 2
+    assert stims[0]._vecstim is stims[1]._vecstim
+
+    tvecs = {sgid: tvec for sgid, (_, tvec) in sources._vecstims.items()}
+    sources.play_window(spike_manager, 0, 25, sgid_offset=100)
+    assert tvecs == {101: [5., 12.], 102: [1.]}
+    sources.play_window(spike_manager, 25, 50, sgid_offset=100)
+    assert tvecs == {101: [30.], 102: [26.]}
+    assert stims[0]._vecstim.restartEvent.call_count == 2
+    sources.play_window(spike_manager, 50, 75, sgid_offset=100)
+    assert tvecs == {101: [], 102: []}
+    sources.play_window(spike_manager, 75, 100, sgid_offset=100)  # nothing to update
+    assert stims[2]._vecstim.restartEvent.call_count == 3
@@ -0,0 +1,127 @@
+import numpy
+import pytest
+
+
+@pytest.mark.parametrize("dtype", ["f", "d"])
+def test_hoc_precision(dtype):
+    from neurodamus.morphio_wrapper import MorphIOWrapper
+    rng = numpy.random.default_rng(0)
+    values = numpy.concatenate([
+        rng.uniform(-500, 500, 10000),
+        rng.uniform(0, 5, 10000),
+        [0., 1e-9, -3.25e-4, 123456789.5, 1.5e12]
+    ]).astype(dtype)
+    expected = [float("{:.8g}".format(v)) for v in values.tolist()]
+    numpy.testing.assert_array_equal(MorphIOWrapper._hoc_precision(values), expected)
+
+
+def test_morphology_cache(monkeypatch, tmp_path):
+    from neurodamus.core.configuration import GlobalConfig
+    from neurodamus.morphio_wrapper import MorphIOWrapper
+    for build_f in ("_build_morph", "_build_sec_idx2names", "_build_sec_typeid_distrib"):
+        monkeypatch.setattr(MorphIOWrapper, build_f, lambda self: None)
+    monkeypatch.setattr(MorphIOWrapper, "_cache", type(MorphIOWrapper._cache)())
+    monkeypatch.setattr(GlobalConfig, "morphology_cache_size", 2)
+    morph_a, morph_b, morph_c = (str(tmp_path / name) for name in ("a.h5", "b.h5", "c.h5"))
+
+    wrapper_a = MorphIOWrapper.load(morph_a)
+    assert MorphIOWrapper.load(morph_a) is wrapper_a
+    assert MorphIOWrapper.load(morph_a, options=1) is not wrapper_a  # options are part of key
+    assert MorphIOWrapper.load(morph_a) is wrapper_a  # a is now the most recently used
+    wrapper_b = MorphIOWrapper.load(morph_b)  # evicts (a, 1)
+    assert list(MorphIOWrapper._cache) == [(morph_a, 0), (morph_b, 0)]
+    MorphIOWrapper.load(morph_a)
+    MorphIOWrapper.load(morph_c)  # evicts b
+    assert list(MorphIOWrapper._cache) == [(morph_a, 0), (morph_c, 0)]
+    assert MorphIOWrapper.load(morph_b) is not wrapper_b
+
+    monkeypatch.setattr(GlobalConfig, "morphology_cache_size", 0)
+    assert MorphIOWrapper.load(morph_a) is not MorphIOWrapper.load(morph_a)
+
+
+def test_morphology_prefetch(monkeypatch):
+    from neurodamus.morphio_wrapper import MorphIOWrapper
+    read_files = []
+
+    def _prefetch(cls, morph_file, options):
+        read_files.append(morph_file)
+        return (morph_file, options)
+
+    monkeypatch.setattr(MorphIOWrapper, "_prefetch", classmethod(_prefetch))
+    monkeypatch.setattr(MorphIOWrapper, "_cache", type(MorphIOWrapper._cache)())
+    monkeypatch.setattr(MorphIOWrapper, "PREFETCH_DEPTH", 2)
+    items = [(gid, "morph%d.h5" % (gid % 3) if gid != 4 else None) for gid in range(10)]
+
+    loaded = []
+    for gid, morph_file in MorphIOWrapper.prefetch_iter(items, lambda item: item[1]):
+        # Items ahead are being read (and wont be read again)
+        assert len(MorphIOWrapper._prefetched) <= 3
+        if morph_file is not None:
+            loaded.append(MorphIOWrapper.load(morph_file))
+    assert loaded == [("morph%d.h5" % (gid % 3), 0) for gid, _ in items if gid != 4]
+    assert sorted(read_files) == ["morph0.h5", "morph1.h5", "morph2.h5"]
+    assert not MorphIOWrapper._prefetched
+
+
+def _store_arrays(n_sections, n_points):
+    rng = numpy.random.default_rng(n_sections)
+    section_types = numpy.repeat([2, 3], [n_sections - n_sections // 2, n_sections // 2])
+    return dict(
+        section_types=section_types,
+        section_parents=numpy.arange(n_sections) - 1,
+        section_offsets=numpy.arange(n_sections) * (n_points // n_sections),
+        x=rng.uniform(size=n_points), y=rng.uniform(size=n_points),
+        z=rng.uniform(size=n_points), diameters=rng.uniform(size=n_points),
+        soma_x=[0., 1., 2.], soma_y=[0., 1., 2.], soma_z=[0., 1., 2.],
+        soma_diameters=[1., 2., 3.],
+    )
+
+
+def test_morphology_store(monkeypatch, tmp_path):
+    from neurodamus.core.configuration import SimConfig, CliOptions
+    from neurodamus.io.morphology_store import MorphologyStore
+    from neurodamus.morphio_wrapper import MorphIOWrapper, StoredMorphology
+    morphologies = {"morph_a": _store_arrays(3, 12), "morph_b": _store_arrays(5, 10)}
+    store_file = str(tmp_path / "morphologies.ndmorph")
+    assert MorphologyStore.create(store_file, morphologies.items(), "/circuit/h5v1") == 2
+
+    store = MorphologyStore(store_file)
+    assert len(store) == 2 and "morph_b" in store and "morph_c" not in store
+    assert store.get("morph_c") is None
+    for name, morph_arrays in morphologies.items():
+        stored_arrays = store.get(name)
+        assert stored_arrays.keys() == morph_arrays.keys()
+        for array_name, values in morph_arrays.items():
+            numpy.testing.assert_array_equal(stored_arrays[array_name], values)
+
+    morph = StoredMorphology(store.get("morph_b"))
+    section_types, section_parents, offsets = morph._get_topology()
+    numpy.testing.assert_array_equal(section_types, [2, 2, 2, 3, 3])
+    numpy.testing.assert_array_equal(section_parents, [-1, 0, 1, 2, 3])
+    numpy.testing.assert_array_equal(offsets, [0, 2, 4, 6, 8, 10])
+    xyz, diameters, soma_xyz, _ = morph._get_hoc_points()
+    numpy.testing.assert_array_equal(xyz[1], morphologies["morph_b"]["y"])
+    numpy.testing.assert_array_equal(soma_xyz[2], [0., 1., 2.])
+    assert morph.section_typeid_distrib.tolist() == [[(1, -1, 1)], [(2, 0, 3)], [(3, 3, 2)]]
+
+    cmds = morph.morph_as_hoc()
+    assert cmds[:7] == ["create soma[1]", 'forsec "soma" somatic.append',
+                        "create axon[3]", 'forsec "axon" axonal.append',
+                        "create dend[2]", 'forsec "dend" basal.append', "forall all.append"]
+    assert cmds[7:10] == ["soma { pt3dadd(%d, %d, %d, %d) }" % (i, i, i, i + 1) for i in range(3)]
+    assert [cmd for cmd in cmds if "connect" in cmd] == [
+        "soma connect axon[0](0), 0.5", "axon[0] connect axon[1](0), 1",
+        "axon[1] connect axon[2](0), 1", "axon[2] connect dend[0](0), 1",
+        "dend[0] connect dend[1](0), 1"]
+    x, y, z, d = (morphologies["morph_b"][name][9] for name in ("x", "y", "z", "diameters"))
+    assert cmds[-1] == "dend[1] { pt3dadd(%.8g, %.8g, %.8g, %.8g) }" % (x, y, z, d)
+    assert len(cmds) == 25
+
+    monkeypatch.setattr(type(SimConfig), "cli_options", CliOptions(morphology_store=store_file))
+    monkeypatch.setattr(MorphIOWrapper, "_store", None)
+    assert isinstance(MorphIOWrapper._read("/circuit/h5v1/morph_a.h5", 0), StoredMorphology)
+    # Only morphologies from the source folder are taken from the store
+    assert store.get_file("/circuit/h5v1/morph_a.h5") is not None
+    assert store.get_file("/circuit/ascii/morph_a.h5") is None
+    assert store.get_file("/circuit/h5v1/morph_c.h5") is None
+    assert MorphIOWrapper._get_store().filename == store_file
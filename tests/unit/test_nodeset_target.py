@@ -19,3 +19,56 @@ def test_get_local_gids():
     numpy.testing.assert_array_equal(t2.get_local_gids(), [1002])
     numpy.testing.assert_array_equal(t2.get_local_gids(raw_gids=True), [2])
     numpy.testing.assert_array_equal(t_empty.get_local_gids(), [])
+
+
+def test_locations_to_points():
+    from neurodamus.target_manager import SerializedSections, TargetManager
+
+    class _FakeSection:
+        def __init__(self, arc3d, orientation=0):
+            self._arc3d = arc3d
+            self.L = arc3d[-1]
+            self._orientation = orientation
+
+        def arc3d(self, i):
+            return self._arc3d[i]
+
+        def n3d(self):
+            return len(self._arc3d)
+
+        def orientation(self):
+            return self._orientation
+
+    class _FakeSectionRef:
+        def __init__(self, sec, exists=True):
+            self.sec = sec
+            self.exists = lambda: exists
+
+    cell_sections = SerializedSections.__new__(SerializedSections)
+    cell_sections.num_sections = 4
+    cell_sections._arc_tables = {}
+    cell_sections.isec2sec = [
+        _FakeSectionRef(_FakeSection([0., 10.])),
+        _FakeSectionRef(_FakeSection([0., 2., 4., 10.])),
+        _FakeSectionRef(_FakeSection([0., 2., 4., 10.], orientation=1)),
+        None,
+    ]
+    target_manager = TargetManager.__new__(TargetManager)
+    target_manager._section_access = {1: cell_sections}
+
+    isec = [1, 1, 2, 0, 1, 3]
+    ipt = [1, -1, 1, 7, 2, 0]
+    offset = [1., 0.25, 1., 1., -3., 1.]
+    sections, distances = target_manager.locations_to_points(1, isec, ipt, offset)
+    assert sections[:5] == [cell_sections.isec2sec[i] for i in isec[:5]]
+    assert sections[5] is None
+    # Reversed sections count from the other end: 1 - (arc3d[2] - 1) / L
+    numpy.testing.assert_allclose(distances, [0.3, 0.25, 0.7, 0.5, 0.4, 0.5])
+    assert list(cell_sections._arc_tables) == [0, 1, 2]
+
+    point = target_manager.location_to_point(1, 1, 1, 1.)
+    assert point.sclst == [cell_sections.isec2sec[1]]
+    assert point.x == [pytest.approx(0.3)]
+
+    with pytest.raises(Exception, match="out of bounds"):
+        target_manager.locations_to_points(1, [4], [0], [0.])
@@ -17,3 +17,90 @@ def test_replay_manager_sonata():
     # We do an internal assertion when the population doesnt exist. Verify it works as expected
     with pytest.raises(MissingSpikesPopulationError, match="Spikes population not found"):
         SpikeManager._read_spikes_sonata(spikes_sonata, "wont-exist")
+
+
+@pytest.mark.forked
+def test_replay_manager_gids_subset(tmp_path, monkeypatch):
+    import numpy
+    from neurodamus.replay import SpikeManager
+    spikes_sonata = SAMPLE_DATA_DIR / "out.h5"
+    all_t, all_gids = SpikeManager._read_spikes_sonata(spikes_sonata, "NodeA")
+    gids = numpy.array([1, 3], dtype="uint32")
+    mask = numpy.isin(all_gids, gids)
+
+    timestamps, spike_gids = SpikeManager._read_spikes_sonata(spikes_sonata, "NodeA", gids)
+    order = numpy.lexsort((timestamps, spike_gids))
+    expected_order = numpy.lexsort((all_t[mask], all_gids[mask]))
+    npt.assert_allclose(timestamps[order], all_t[mask][expected_order])
+    npt.assert_equal(spike_gids[order], all_gids[mask][expected_order])
+
+    # Legacy formats are filtered chunk-wise. Use a tiny chunk to cover several chunks
+    ascii_file = tmp_path / "out.dat"
+    with open(ascii_file, "w") as f:
+        f.write("/scatter\n")
+        f.writelines("%f\t%d\n" % (t, gid) for t, gid in zip(all_t, all_gids))
+    bin_file = tmp_path / "out.bin"
+    numpy.concatenate([all_t, all_gids.astype("d")]).tofile(bin_file)
+
+    monkeypatch.setattr(SpikeManager, "_read_chunk_size", 3)
+    for reader, filename in ((SpikeManager._read_spikes_ascii, ascii_file),
+                             (SpikeManager._read_spikes_binary, bin_file)):
+        timestamps, spike_gids = reader(str(filename), gids)
+        npt.assert_allclose(timestamps, all_t[mask], rtol=1e-6)
+        npt.assert_equal(spike_gids, all_gids[mask])
+
+
+def test_replay_manager_ascii_sidecar(tmp_path, monkeypatch):
+    import numpy
+    from neurodamus.replay import SpikeManager
+    ascii_file = tmp_path / "out.dat"
+    ascii_file.write_text("/scatter\n5.0\t3\n1.5\t1\n2.0\t3\n0.5\t3\n7.25\t2\n")
+
+    spikes = SpikeManager(str(ascii_file), delay=1, gids=[3, 1, 4])
+    assert sorted(spikes.get_map().keys()) == [1, 3]
+    npt.assert_allclose(spikes[3], [1.5, 3., 6.])
+    sidecars = sorted(f.name.split(".")[-2] for f in tmp_path.glob("out.dat.*.npy"))
+    assert sidecars == ["gids", "offsets", "times"]
+
+    # Later runs map the existing sidecar. Its spikes are views of the mapped data
+    read_ascii = SpikeManager._read_spikes_ascii
+    monkeypatch.setattr(SpikeManager, "_read_spikes_ascii", None)
+    spikes = SpikeManager(str(ascii_file))
+    assert list(spikes.get_map().keys()) == [1, 2, 3]
+    npt.assert_allclose(spikes[3], [0.5, 2., 5.])
+    assert isinstance(spikes[2].base, numpy.memmap)
+    monkeypatch.setattr(SpikeManager, "_read_spikes_ascii", read_ascii)
+
+    # The sidecar might be kept in a separate cache dir
+    cache_dir = tmp_path / "cache"
+    spikes = SpikeManager(str(ascii_file), gids=[2], cache_dir=str(cache_dir))
+    npt.assert_allclose(spikes[2], [7.25])
+    assert len(list(cache_dir.glob("out.dat.*.npy"))) == 3
+    assert not list(cache_dir.glob("*.tmp"))
+
+    # Failing to write the sidecar (e.g. read-only dir) falls back to parsing the text
+    def deny(*_):
+        raise PermissionError("read-only")
+    monkeypatch.setattr(SpikeManager, "_create_ascii_sidecar", deny)
+    spikes = SpikeManager(str(ascii_file), gids=[1], cache_dir=str(tmp_path / "denied"))
+    npt.assert_allclose(spikes[1], [1.5])
+    assert not isinstance(spikes[1].base, numpy.memmap)
+
+
+@pytest.mark.forked
+def test_replay_manager_sonata_windows():
+    from neurodamus.replay import SpikeManager
+    spikes_sonata = str(SAMPLE_DATA_DIR / "out.h5")
+    all_spikes = SpikeManager(spikes_sonata, delay=1, population="NodeA", gids=[1, 3])
+    spikes = SpikeManager(spikes_sonata, delay=1, population="NodeA", gids=[1, 3],
+                          streaming=True)
+    assert sorted(spikes.get_map().keys()) == [1, 3]
+    assert not spikes.get_map().size()  # Nothing read until a window is requested
+
+    for tstart, tstop in ((0, 3.275), (3.275, 5.35), (5.35, 1000)):
+        for gid in (1, 3):
+            npt.assert_allclose(spikes.get_window(gid, tstart, tstop),
+                                all_spikes.get_window(gid, tstart, tstop))
+        assert len(spikes.get_window(2, tstart, tstop)) == 0
+        # Only the spikes of the current window are held
+        assert all(tstart <= t < tstop for t in spikes.get_map().flat_values())
@@ -46,6 +46,11 @@ def test_syn_read_counts():
     assert len(conn_counts) == 1
     assert conn_counts[2] == {1: 2}  # [0->1] 2 synapses
 
+    sgids, syn_counts, conn_counts = reader.get_conn_counts_arrays(np.array([2, 3, 1]))
+    npt.assert_equal(sgids, [1, 2])
+    npt.assert_equal(syn_counts, [2, 2])
+    npt.assert_equal(conn_counts, [1, 0, 1])
+
 
 def test_conn_manager_syn_stats():
     """Test _get_conn_stats in isolation using a mocked instance of SynapseRuleManager
@@ -88,3 +93,304 @@ def test_conn_manager_syn_stats():
     assert total_synapses == total_synapses_metype_x + additional_synapses
     assert stats.metype_cell_syn_average["metype-x"] == 1
     assert stats.metype_cell_syn_average["metype-y"] == 2
+
+
+def test_sonata_preload_grouping():
+    from neurodamus.io.synapse_reader import SonataReader
+    sonata_file = str(SIM_DIR / "usecase3/local_edges_A.h5")
+    reader = SonataReader(sonata_file, "NodeA__NodeA__chemical")
+    reader.preload_data([1, 2, 3])
+    assert reader._data[3] is reader.EMPTY_DATA
+
+    population = reader._population
+    for gid in (1, 2):
+        edge_ids = population.afferent_edges([gid - 1])
+        npt.assert_equal(reader.get_property(gid, "synapse_index"), edge_ids.flatten())
+        npt.assert_equal(reader.get_property(gid, "sgid"), population.source_nodes(edge_ids) + 1)
+        npt.assert_allclose(reader.get_property(gid, "weight"),
+                            population.get_attribute("conductance", edge_ids))
+        npt.assert_allclose(reader.get_property(gid, "isec"),
+                            population.get_attribute("afferent_section_id", edge_ids))
+
+
+def test_sonata_preload_windows():
+    from neurodamus.io.synapse_reader import SonataReader
+    sonata_file = str(SIM_DIR / "usecase3/local_edges_A.h5")
+    reader = SonataReader(sonata_file, "NodeA__NodeA__chemical")
+    windows = [list(w) for w in reader.preload_windows([1, 2, 3])]
+    assert windows == [[1, 2, 3]]
+    assert len(reader.get_property(1, "sgid")) == 2  # single window remains cached
+
+    reader = SonataReader(sonata_file, "NodeA__NodeA__chemical")
+    reader.PRELOAD_BYTES_BUDGET = 100  # a few edges per window
+    for window in reader.preload_windows([1, 2, 3]):
+        assert set(reader._data) == set(window)
+        for gid in window:
+            assert reader._data[gid] is reader.EMPTY_DATA or len(reader.get_property(gid, "sgid"))
+    assert not reader._data  # released
+
+
+def test_sonata_preload_windows_prefetch():
+    from neurodamus.io.synapse_reader import SonataReader
+    sonata_file = str(SIM_DIR / "usecase3/local_edges_A.h5")
+    reader = SonataReader(sonata_file, "NodeA__NodeA__chemical")
+    reader.PREFETCH_WINDOW_SIZE = 1
+    windows = [list(w) for w in reader.preload_windows([1, 2, 3], prefetch=True)]
+    assert windows == [[1, 2, 3]]  # Everything fits the budget, no need to prefetch
+    assert len(reader.get_property(1, "sgid")) == 2  # single window remains cached
+
+    reader = SonataReader(sonata_file, "NodeA__NodeA__chemical")
+    reader.PREFETCH_WINDOW_SIZE = 1
+    reader.PRELOAD_BYTES_BUDGET = 400  # not all edges fit at once
+    windows = []
+    for window in reader.preload_windows([1, 2, 3], prefetch=True):
+        windows.append(list(window))
+        assert all(gid in reader._data for gid in window)
+        if window[0] == 1:
+            npt.assert_equal(reader.get_property(1, "sgid"), [2, 2])
+    assert windows == [[1], [2], [3]]
+    assert not reader._data
+
+
+def test_sonata_preload_windows_no_threaded_reads(monkeypatch, caplog):
+    from neurodamus.io.synapse_reader import SonataReader
+    monkeypatch.setattr(SonataReader, "_warned_no_threaded_reads", False)
+    sonata_file = str(SIM_DIR / "usecase3/local_edges_A.h5")
+    reader = SonataReader(sonata_file, "NodeA__NodeA__chemical")
+    reader.PREFETCH_WINDOW_SIZE = 1
+    reader._threaded_reads = False  # e.g. MPI without MPI_THREAD_MULTIPLE support
+    windows = [list(w) for w in reader.preload_windows([1, 2, 3], prefetch=True)]
+    assert windows == [[1, 2, 3]]  # Read synchronously, in a single window
+    assert "Edge data is read without prefetching" in caplog.text
+
+
+def test_sonata_params_views():
+    from neurodamus.io.synapse_reader import SonataReader, CompactSynapseParameters
+    sonata_file = str(SIM_DIR / "usecase3/local_edges_A.h5")
+    reader = SonataReader(sonata_file, "NodeA__NodeA__chemical")
+    reader.preload_data([1, 2])
+    params1 = reader._load_synapse_parameters(1)
+    params2 = reader._load_synapse_parameters(2)
+    assert params1.base is params2.base  # views of the same chunk array
+    assert all(params1.dtype[name] == np.float64 for name in SonataReader.Parameters.dtype.names)
+    npt.assert_equal(params1.sgid, reader.get_property(1, "sgid"))
+    npt.assert_allclose(params2.weight, reader.get_property(2, "weight"))
+    npt.assert_equal(params2.location, 0.5)
+
+    reader = SonataReader(sonata_file, "NodeA__NodeA__chemical", compact_parameters=True)
+    assert reader.Parameters is CompactSynapseParameters
+    params1_compact = reader._load_synapse_parameters(1)
+    assert params1_compact.dtype["sgid"] == np.int64
+    assert params1_compact.dtype["synType"] == np.int16
+    assert params1_compact.dtype["U"] == np.float32
+    npt.assert_allclose(params1_compact.U, params1.U, rtol=1e-6)
+    # Integer fields behave as the double ones in the arithmetic of connections
+    npt.assert_equal(params1_compact.synType < 100, params1.synType < 100)
+    npt.assert_equal(params1_compact.isec, params1.isec)
+    sgids, sgids_compact = params1.sgid.copy(), params1_compact.sgid.copy()
+    sgids += 1000
+    sgids_compact += 1000
+    npt.assert_equal(sgids_compact, sgids)
+
+
+def test_sonata_edges_index_cache(tmp_path):
+    from neurodamus.io.synapse_reader import SonataReader
+    sonata_file = str(SIM_DIR / "usecase3/local_edges_A.h5")
+    reader = SonataReader(sonata_file, "NodeA__NodeA__chemical")
+    reader.preload_data([1, 2, 3])
+    for _ in range(2):  # Create and then reuse (memory-map) the cache
+        cached_reader = SonataReader(sonata_file, "NodeA__NodeA__chemical",
+                                     index_cache_dir=str(tmp_path))
+        assert len(list(tmp_path.glob("*.npy"))) == 2
+        assert not list(tmp_path.glob("*.tmp"))
+        assert isinstance(cached_reader._edge_index._range_to_edges, np.memmap)  # even 1st
+        cached_reader.preload_data([1, 2, 3])
+        assert cached_reader._data[3] is cached_reader.EMPTY_DATA
+        for gid in (1, 2):
+            for field in ("sgid", "synapse_index", "weight"):
+                npt.assert_equal(cached_reader.get_property(gid, field),
+                                 reader.get_property(gid, field))
+        counts = cached_reader.get_counts(np.array([1, 2, 3], dtype=int))
+        assert counts == {1: 2, 2: 2, 3: 0}
+
+
+def test_sonata_edges_index_cache_error(tmp_path, monkeypatch, caplog):
+    from neurodamus.io.synapse_reader import EdgeIndexCache, SonataReader
+
+    def deny(*_):
+        raise PermissionError("read-only")
+    monkeypatch.setattr(EdgeIndexCache, "_create_cache", deny)
+    sonata_file = str(SIM_DIR / "usecase3/local_edges_A.h5")
+    reader = SonataReader(sonata_file, "NodeA__NodeA__chemical", index_cache_dir=str(tmp_path))
+    assert not reader._edge_index  # reads go through the edge file index
+    assert "Could not create the edges index cache: read-only" in caplog.text
+    reader.preload_data([1, 2, 3])
+    assert len(reader.get_property(1, "sgid")) == 2
+
+
+def test_sonata_params_chunk_correction(monkeypatch):
+    from types import SimpleNamespace
+    from neurodamus.io import synapse_reader
+    from neurodamus.io.synapse_reader import SonataReader, _constrained_hill
+    monkeypatch.setattr(synapse_reader, "Nd", SimpleNamespace(dt=0.025))
+    sonata_file = str(SIM_DIR / "usecase3/local_edges_A.h5")
+    reader = SonataReader(sonata_file, "NodeA__NodeA__chemical", extracellular_calcium=1.2)
+    reader.preload_data([1, 2])
+    raw_params = reader._load_synapse_parameters(1).copy()
+
+    params = reader.get_synapse_parameters(1)
+    assert set(reader._syn_params) == {1, 2}  # whole chunk corrected at once
+    assert not reader._params_chunks
+    assert reader.get_synapse_parameters(2).base is params.base
+    npt.assert_allclose(params.U, raw_params.U * _constrained_hill(raw_params.u_hill_coefficient,
+                                                                   1.2))
+    npt.assert_allclose(params.delay / 0.025, np.round(params.delay / 0.025))
+
+
+def test_merged_read():
+    import libsonata
+    from neurodamus.io.synapse_reader import _merged_read
+    data = np.arange(100) * 10
+    reads = []
+
+    def read_f(selection):
+        reads.append(selection.ranges)
+        return data[selection.flatten()]
+
+    selection = libsonata.Selection([(50, 52), (0, 3), (5, 6), (60, 61), (4, 5)])
+    npt.assert_equal(_merged_read(read_f, selection, max_gap=2), data[selection.flatten()])
+    assert reads[-1] == [(0, 6), (50, 52), (60, 61)]
+    npt.assert_equal(_merged_read(read_f, selection, max_gap=10), data[selection.flatten()])
+    assert reads[-1] == [(0, 6), (50, 61)]
+    npt.assert_equal(_merged_read(read_f, selection, max_gap=0), data[selection.flatten()])
+    assert reads[-1] == [(0, 3), (4, 6), (50, 52), (60, 61)]  # only adjacent
+
+
+def test_sonata_params_lazy_correction(monkeypatch):
+    from types import SimpleNamespace
+    from neurodamus.io import synapse_reader
+    from neurodamus.io.synapse_reader import SonataReader
+    monkeypatch.setattr(synapse_reader, "Nd", SimpleNamespace(dt=0.025))
+    sonata_file = str(SIM_DIR / "usecase3/local_edges_A.h5")
+    reader = SonataReader(sonata_file, "NodeA__NodeA__chemical", extracellular_calcium=1.2)
+    params = reader.get_synapse_parameters(1)  # not preloaded: loaded lazily
+    U, delay = params.U.copy(), params.delay.copy()
+    assert not reader._params_chunks
+
+    params_again = reader.get_synapse_parameters(1)
+    npt.assert_equal(params_again.U, U)  # corrected only once
+    npt.assert_equal(params_again.delay, delay)
+
+    ref_reader = SonataReader(sonata_file, "NodeA__NodeA__chemical", extracellular_calcium=1.2)
+    ref_reader.preload_data([1, 2])
+    npt.assert_equal(ref_reader.get_synapse_parameters(1).U, U)
+
+
+def test_preload_windows_merged_size():
+    from neurodamus.io.synapse_reader import SonataReader, _merged_read_size
+    ranges = [(50, 52), (0, 3), (5, 6), (60, 61), (4, 5)]
+    assert _merged_read_size(ranges, max_gap=0) == 8  # no gaps read
+    assert _merged_read_size(ranges, max_gap=2) == 9
+    assert _merged_read_size(ranges, max_gap=10) == 17
+    assert _merged_read_size([], max_gap=10) == 0
+
+    sonata_file = str(SIM_DIR / "usecase3/local_edges_A.h5")
+    reader = SonataReader(sonata_file, "NodeA__NodeA__chemical")
+    assert reader._read_gap <= SonataReader.MAX_READ_GAP
+    bytes_per_edge = (len(reader.Parameters.load_fields) + 2) * 8
+    population = reader._population
+    merged_edges = _merged_read_size(population.afferent_edges([0, 1]).ranges, reader._read_gap)
+    assert merged_edges >= population.afferent_edges([0, 1]).flat_size
+    # Windows are sized with the merged (read) edges
+    assert reader._count_preload_windows([1, 2], merged_edges * bytes_per_edge) == 1
+    assert reader._count_preload_windows([1, 2], merged_edges * bytes_per_edge - 1) == 2
+
+
+class _FakeNodeComm:
+    """A node communicator among threads, each being a rank"""
+    def __init__(self, rank, state):
+        self.rank = rank
+        self.state = state
+
+    def _exchange(self, obj, root):
+        state = self.state
+        if self.rank == root:
+            state.value = obj
+        state.barrier.wait()
+        value = state.value
+        state.barrier.wait()
+        return value
+
+    def gather(self, obj, root=0):
+        self.state.gathered[self.rank] = obj
+        self.state.barrier.wait()
+        result = list(self.state.gathered) if self.rank == root else None
+        self.state.barrier.wait()
+        return result
+
+    def bcast(self, obj, root=0):
+        return self._exchange(obj, root)
+
+    def Barrier(self):
+        self.state.barrier.wait()
+
+
+def test_node_shared_reader():
+    import libsonata
+    import threading
+    from types import SimpleNamespace
+    from neurodamus.core._shmutils import NodeSharedReader
+    rank_ranges = [[(0, 4), (10, 12)], [(2, 6)], [(10, 12), (20, 21)], [], [(4, 6), (2, 4)]]
+    n_ranks = len(rank_ranges)
+    data = np.arange(100) * 10
+    state = SimpleNamespace(barrier=threading.Barrier(n_ranks), gathered=[None] * n_ranks)
+    leader_reads = []
+    results = [None] * n_ranks
+
+    def read_f(selection):
+        leader_reads.append(selection.ranges)
+        return np.concatenate([data[start:end] for start, end in selection.ranges])
+
+    class _Window:
+        def __init__(self, comm, nbytes):
+            if comm.rank == 0:
+                state.buffer = bytearray(nbytes)
+            comm.Barrier()
+
+        def Shared_query(self, _rank):
+            return state.buffer, 1
+
+    def run_rank(rank):
+        comm = _FakeNodeComm(rank, state)
+        reader = NodeSharedReader.__new__(NodeSharedReader)
+        reader._MPI = SimpleNamespace(Win=SimpleNamespace(
+            Allocate_shared=lambda nbytes, _unit, comm: _Window(comm, nbytes)))
+        reader._node_comm = comm
+        reader.node_rank = rank
+        reader.is_leader = rank == 0
+        reader._windows = []
+        results[rank] = reader.read(read_f, libsonata.Selection(rank_ranges[rank]))
+
+    threads = [threading.Thread(target=run_rank, args=(rank,)) for rank in range(n_ranks)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # The leader reads the union of the ranges once
+    assert leader_reads == [[(0, 6), (10, 12), (20, 21)]]
+    for ranges, result in zip(rank_ranges, results):
+        expected = [data[start:end] for start, end in ranges]
+        npt.assert_equal(result, np.concatenate(expected) if expected else [])
+    assert not results[1].flags.writeable  # contiguous: a view of the shared data
+
+
+def test_node_shared_reads_no_mpi4py(caplog):
+    import importlib.util
+    import pytest
+    from neurodamus.io.synapse_reader import SonataReader
+    if importlib.util.find_spec("mpi4py"):
+        pytest.skip("mpi4py is available")
+    sonata_file = str(SIM_DIR / "usecase3/local_edges_A.h5")
+    SonataReader(sonata_file, "NodeA__NodeA__chemical", node_shared_reads=True)
+    assert "Node shared reads require mpi4py" in caplog.text